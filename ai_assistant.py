@@ -1,30 +1,102 @@
-import requests
 import json
 import os
-from typing import List, Dict, Any
+import time
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+from plan_cache import PlanCache, normalize_assessment_results
+from utils.lazy_import import lazy_import
+
+# requests 在创建第一个 AIFitnessAssistant 时才导入，不影响应用启动
+requests = lazy_import('requests')
+
+
+DEFAULT_BASE_URL = "https://api.deepseek.com/v1"
+DEFAULT_TIMEOUT = (5.0, 60.0)  # (连接超时, 读取超时)，单位秒
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_BACKOFF = 30.0  # 单次重试最长等待时间（秒）
+SSE_DONE = "[DONE]"
+
+
+def iter_sse_data(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """
+    解析服务器发送事件（SSE）流
+    
+    Args:
+        lines: 按行拆分的响应内容（不含换行符）
+        
+    Yields:
+        str: 每个事件的 data 字段（多行 data 以换行连接）
+    """
+    data = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line:
+            # 空行表示一个事件结束
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+        # 以冒号开头的注释行（keep-alive）和其他字段忽略
+    if data:
+        yield "\n".join(data)
 
 
 class AIFitnessAssistant:
     """
     AI助手类，负责与DeepSeek API通信，构建提示词并解析响应
     生成个性化训练方案
+    
+    所有请求共用一个 requests.Session（连接池 + keep-alive），只有第一次请求需要
+    DNS解析和TCP/TLS握手。遇到429和5xx响应或连接失败时按带随机抖动的指数退避重试。
+    generate_personalized_plan_async 在后台线程执行请求并返回 Future，可在UI线程中使用。
+    iter_personalized_plan / generate_personalized_plan_stream 使用流式接口（SSE），
+    在推理模型生成过程中逐段得到文本。
+    提供 cache（PlanCache）时，相同输入的训练方案直接从缓存返回。
     """
     
-    def __init__(self, api_key: str = None, model: str = "deepseek-reasoner"):
+    def __init__(self, api_key: str = None, model: str = "deepseek-reasoner",
+                 base_url: Optional[str] = None,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 max_retries: int = 3, backoff_factor: float = 0.5,
+                 pool_maxsize: int = 4, session: Optional['requests.Session'] = None,
+                 cache: Optional[PlanCache] = None):
         """
         初始化AI助手
         
         Args:
             api_key (str, optional): DeepSeek API密钥
             model (str): 使用的模型，默认为deepseek-reasoner
+            base_url (str, optional): API地址，默认读取DEEPSEEK_BASE_URL环境变量，否则为官方地址
+            timeout: (连接超时, 读取超时) 秒数，或同时用于两者的单个数值
+            max_retries (int): 429/5xx响应或连接失败时的最大重试次数
+            backoff_factor (float): 退避基数，第n次重试前随机等待 [0, backoff_factor * 2^n] 秒
+            pool_maxsize (int): 连接池中保持的最大连接数
+            session (requests.Session, optional): 外部提供的会话，None表示自行创建
+            cache (PlanCache, optional): 训练方案缓存，None表示不缓存
         """
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
         self.model = model
-        self.base_url = "https://api.deepseek.com/v1"
+        self.base_url = (base_url or os.getenv("DEEPSEEK_BASE_URL") or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.cache = cache
         
         # 检查API密钥
         if not self.api_key:
             raise ValueError("未提供DeepSeek API密钥，请设置DEEPSEEK_API_KEY环境变量或在初始化时传入api_key参数")
+            
+        # 会话在首次请求时创建（见 session 属性），构造助手时不导入requests
+        self._session = session
+        self._session_lock = threading.Lock()
+        self._executor = None
     
     def _build_prompt(self, user_profile: Dict[str, Any], assessment_results: List[Dict]) -> str:
         """
@@ -95,37 +167,112 @@ FMS评估结果：
         
         return prompt
     
-    def _send_request(self, prompt: str) -> str:
+    def _cache_key(self, user_profile: Dict[str, Any], assessment_results: List[Dict]) -> str:
         """
-        发送请求到DeepSeek API
+        计算训练方案的缓存键
+        
+        用规范化的评估结果（角度按名称排序，近似重复模式下按步长取整）重新构建提示词，
+        再与模型名称一起计算哈希。
+        """
+        normalized = normalize_assessment_results(assessment_results, self.cache.angle_step)
+        return self.cache.key_for(self.model, self._build_prompt(user_profile, normalized))
+        
+    @property
+    def session(self) -> 'requests.Session':
+        """HTTP会话，首次访问时创建"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+        
+    def _create_session(self) -> 'requests.Session':
+        """创建带连接池的HTTP会话"""
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        # 重试由 _post 自行处理（urllib3默认不重试POST）
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+        
+    def _backoff_delay(self, attempt: int, response: Optional['requests.Response'] = None) -> float:
+        """
+        计算第attempt次重试前的等待时间
+        
+        优先使用响应中的Retry-After（秒），否则使用全抖动指数退避。
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(max(float(retry_after), 0.0), MAX_BACKOFF)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff_factor * (2 ** attempt)))
+        
+    def _post(self, path: str, payload: Dict[str, Any], stream: bool = False) -> 'requests.Response':
+        """
+        发送POST请求，对429/5xx响应和连接失败进行重试
+        
+        读取超时不重试：服务端可能仍在生成，重试只会让等待时间成倍增加。
         
         Args:
-            prompt (str): 发送给AI的提示词
+            path (str): 相对于base_url的路径
+            payload (dict): JSON请求体
+            stream (bool): 是否在收到响应头后立即返回、按需读取响应体
             
         Returns:
-            str: AI返回的响应内容
+            requests.Response: 最后一次请求的响应
         """
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-        
-        data = {
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, headers=headers, json=payload, timeout=self.timeout,
+                                             stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+            attempt += 1
+    
+    def _build_payload(self, prompt: str, stream: bool = False) -> Dict[str, Any]:
+        """构建聊天补全接口的请求体"""
+        return {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": "你是一个专业的运动康复和体能训练专家。"},
                 {"role": "user", "content": prompt}
             ],
-            "stream": False
+            "stream": stream
         }
+    
+    def _send_request(self, prompt: str) -> str:
+        """
+        发送请求到DeepSeek API
+        
+        Args:
+            prompt (str): 发送给AI的提示词
+            
+        Returns:
+            str: AI返回的响应内容
+        """
+        data = self._build_payload(prompt)
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=60
-            )
+            response = self._post("chat/completions", data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -140,6 +287,127 @@ FMS评估结果：
         except KeyError as e:
             raise Exception(f"响应格式错误: {str(e)}")
     
+    def _stream_request(self, prompt: str) -> Iterator[str]:
+        """
+        以流式方式发送请求到DeepSeek API
+        
+        只输出正文增量；推理模型的思考过程（reasoning_content）不输出。
+        
+        Args:
+            prompt (str): 发送给AI的提示词
+            
+        Yields:
+            str: 收到的文本增量
+        """
+        try:
+            response = self._post("chat/completions", self._build_payload(prompt, stream=True), stream=True)
+            with response:
+                if response.status_code != 200:
+                    raise Exception(f"API请求失败: {response.status_code} - {response.text}")
+                # chunk_size=None: 每收到一块数据就处理，不等待凑满固定字节数
+                for data in iter_sse_data(response.iter_lines(chunk_size=None)):
+                    if data == SSE_DONE:
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+                        
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"网络请求错误: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"响应解析错误: {str(e)}")
+        except (KeyError, IndexError) as e:
+            raise Exception(f"响应格式错误: {str(e)}")
+    
+    def iter_personalized_plan(self, user_profile: Dict[str, Any],
+                               assessment_results: List[Dict]) -> Iterator[str]:
+        """
+        流式生成个性化训练方案
+        
+        命中缓存时一次输出完整方案；完整接收后写入缓存。
+        
+        Args:
+            user_profile (dict): 用户信息
+            assessment_results (list): FMS评估结果列表
+            
+        Yields:
+            str: 训练方案的文本增量
+            
+        Raises:
+            Exception: 请求或解析失败
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_profile, assessment_results)
+            plan = self.cache.get(cache_key)
+            if plan is not None:
+                yield plan
+                return
+        
+        parts = []
+        for delta in self._stream_request(self._build_prompt(user_profile, assessment_results)):
+            parts.append(delta)
+            yield delta
+        
+        if cache_key is not None and parts:
+            self.cache.put(cache_key, "".join(parts), self.model)
+    
+    def generate_personalized_plan_stream(self, user_profile: Dict[str, Any], assessment_results: List[Dict],
+                                          on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """
+        流式生成个性化训练方案，每收到一段文本调用一次 on_delta
+        
+        Args:
+            user_profile (dict): 用户信息
+            assessment_results (list): FMS评估结果列表
+            on_delta (callable, optional): 文本增量回调（在调用线程中执行）
+            
+        Returns:
+            str: 完整的训练方案；出错时为已收到的内容加错误说明
+        """
+        parts = []
+        try:
+            for delta in self.iter_personalized_plan(user_profile, assessment_results):
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        except Exception as e:
+            error = f"生成训练方案时出错: {str(e)}"
+            return "".join(parts) + "\n\n" + error if parts else error
+        return "".join(parts)
+    
+    def request_personalized_plan(self, user_profile: Dict[str, Any],
+                                  assessment_results: List[Dict]) -> str:
+        """
+        生成个性化训练方案，失败时抛出异常（供批量生成等需要区分成功和失败的调用方使用）
+        
+        Args:
+            user_profile (dict): 用户信息
+            assessment_results (list): FMS评估结果列表
+            
+        Returns:
+            str: 个性化训练方案
+            
+        Raises:
+            Exception: 请求或解析失败
+        """
+        # 查询缓存
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_profile, assessment_results)
+            plan = self.cache.get(cache_key)
+            if plan is not None:
+                return plan
+        
+        # 构建提示词，发送请求并获取响应
+        prompt = self._build_prompt(user_profile, assessment_results)
+        plan = self._send_request(prompt)
+        
+        # 只缓存成功生成的方案
+        if cache_key is not None:
+            self.cache.put(cache_key, plan, self.model)
+        return plan
+    
     def generate_personalized_plan(self, user_profile: Dict[str, Any], 
                                  assessment_results: List[Dict]) -> str:
         """
@@ -152,16 +420,32 @@ FMS评估结果：
         Returns:
             str: 个性化训练方案
         """
-        # 构建提示词
-        prompt = self._build_prompt(user_profile, assessment_results)
-        
-        # 发送请求并获取响应
         try:
-            plan = self._send_request(prompt)
-            return plan
+            return self.request_personalized_plan(user_profile, assessment_results)
         except Exception as e:
             return f"生成训练方案时出错: {str(e)}"
     
+    def generate_personalized_plan_async(self, user_profile: Dict[str, Any], assessment_results: List[Dict],
+                                         on_delta: Optional[Callable[[str], None]] = None) -> Future:
+        """
+        在后台线程中生成个性化训练方案
+        
+        Args:
+            user_profile (dict): 用户信息
+            assessment_results (list): FMS评估结果列表
+            on_delta (callable, optional): 提供时使用流式接口，在后台线程中逐段回调文本增量
+            
+        Returns:
+            Future: 结果为训练方案文本（出错时为错误说明，与 generate_personalized_plan 相同）
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_maxsize,
+                                                thread_name_prefix="ai-assistant")
+        if on_delta is not None:
+            return self._executor.submit(self.generate_personalized_plan_stream,
+                                         user_profile, assessment_results, on_delta)
+        return self._executor.submit(self.generate_personalized_plan, user_profile, assessment_results)
+    
     def set_api_key(self, api_key: str):
         """
         设置API密钥
@@ -169,4 +453,19 @@ FMS评估结果：
         Args:
             api_key (str): DeepSeek API密钥
         """
-        self.api_key = api_key
\ No newline at end of file
+        self.api_key = api_key
+    
+    def close(self):
+        """关闭后台线程和连接池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
\ No newline at end of file
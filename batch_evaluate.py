@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+离线视频批量评估工具
+
+把目录中的评估录像分发到多个工作进程（每个进程一个MediaPipe Pose实例），
+逐帧执行关键点提取和角度计算，结果按批写入数据库。支持计数的动作按重复次数分割，
+每一次动作单独评分，视频评分取各次中的最高分；没有完整动作时按全部帧评分，
+偶发的噪声帧不计入评分。
+
+动作和视图默认从文件名推断（例如 squat_front_001.mp4、hurdle_step-side.avi），
+推断不到时使用 --action / --view 指定的值。
+
+用法:
+    python batch_evaluate.py 录像目录 [--workers 4] [--action squat] [--view front]
+                             [--frame_step 1] [--db_path squat_evaluation.db] [--user_id 1]
+
+会话需要关联到用户（--user_id）才能被 batch_plan_generation.py 用于生成训练方案。
+"""
+
+import sys
+import os
+import time
+import argparse
+import contextlib
+import multiprocessing
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager import DatabaseManager
+from fms_assessors import ASSESSORS, get_assessor
+from utils.lazy_import import lazy_import
+from utils.movement_analysis import analyze_movement_stream
+
+cv2 = lazy_import('cv2')
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm')
+VIEWS = ('front', 'side', '45')
+
+# 工作进程内的姿态估计器（由 _init_worker 创建，每个进程一个）
+_estimator = None
+
+
+def list_videos(video_dir, extensions=VIDEO_EXTENSIONS, recursive=False):
+    """
+    列出目录中的视频文件
+
+    Args:
+        video_dir: 视频目录
+        extensions: 视频文件扩展名
+        recursive: 是否包含子目录
+
+    Returns:
+        按路径排序的视频文件列表
+    """
+    videos = []
+    for root, dirs, files in os.walk(video_dir):
+        videos.extend(os.path.join(root, name) for name in files if name.lower().endswith(extensions))
+        if not recursive:
+            break
+    return sorted(videos)
+
+
+def infer_action_view(path, default_action='squat', default_view='front'):
+    """
+    从文件名推断动作键和视图
+
+    Args:
+        path: 视频文件路径
+        default_action: 推断不到时使用的动作键
+        default_view: 推断不到时使用的视图
+
+    Returns:
+        (动作键, 视图)
+    """
+    stem = os.path.splitext(os.path.basename(path))[0].lower().replace('-', '_')
+    tokens = stem.split('_')
+
+    action = default_action
+    # 优先匹配较长的动作键（如 hurdle_step 由两个词组成）
+    for key in sorted(ASSESSORS, key=len, reverse=True):
+        if key in stem:
+            action = key
+            break
+
+    view = next((token for token in tokens if token in VIEWS), default_view)
+    return action, view
+
+
+def _init_worker(filter_mode):
+    """工作进程初始化：创建本进程的姿态估计器"""
+    global _estimator
+    from pose_estimator import PoseEstimator
+    # 角度历史不限容量，作为单个视频的列式结果缓冲区；批处理只需要角度，不绘制骨架
+    _estimator = PoseEstimator(filter_mode=filter_mode, history_capacity=None, overlay='off')
+
+
+def evaluate_video(task):
+    """
+    在工作进程中评估一个视频
+
+    Args:
+        task: (视频路径, 动作键, 视图, 帧间隔, 最大处理帧数)
+
+    Returns:
+        dict: 评估结果，包括逐帧角度矩阵、完成次数、评估结果和耗时；失败时包含 'error'
+    """
+    path, action, view, frame_step, max_frames = task
+    start = time.perf_counter()
+    result = {
+        'video': path, 'action': action, 'view': view, 'worker': os.getpid(),
+        'frames': 0, 'detected': 0, 'reps': 0, 'elapsed': 0.0, 'error': None
+    }
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        result['error'] = "无法打开视频文件"
+        return result
+
+    try:
+        _estimator.set_action(action)
+        _estimator.set_view(view)
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        base_time = os.path.getmtime(path)  # 以视频文件修改时间作为时间戳起点
+        timestamps = []
+        index = 0
+        while max_frames is None or result['frames'] < max_frames:
+            if index % frame_step:
+                # 跳过的帧只解码不处理
+                if not capture.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = capture.read()
+            if not ok:
+                break
+            offset = index / fps
+            _, angles = _estimator.process_frame(frame, draw=False, timestamp=offset)
+            if angles is not None:
+                timestamps.append(base_time + offset)
+            index += 1
+            result['frames'] += 1
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        capture.release()
+
+    history = _estimator.angle_history
+    names = history.names
+    matrix = history.matrix()
+    # 姿态估计器在处理过程中已把每次完成的动作分割为窗口
+    reps = list(_estimator.rep_segmenter.reps) if _estimator.rep_segmenter else []
+    result.update(names=names, timestamps=timestamps, matrix=matrix, detected=len(timestamps), reps=len(reps))
+
+    if len(matrix):
+        chunks = [(names, timestamps, matrix)]
+        if reps:
+            assessment = get_assessor(action).assess_reps(reps)
+        else:
+            assessment = get_assessor(action).assess_stream(chunks)
+        result['evaluation'] = {
+            'score': assessment['score'],
+            'reason': '；'.join(assessment['reasons']),
+            'similarity': assessment['similarity'],
+            'compensations': assessment['compensations'],
+            'metrics': {
+                'assessment': assessment['parameters'],
+                'movement': analyze_movement_stream(chunks)
+            }
+        }
+    else:
+        result['evaluation'] = None
+
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(videos, action='squat', view='front', workers=None, db_path="squat_evaluation.db",
+              frame_step=1, max_frames=None, filter_mode=None, commit_every=16, user_id=None):
+    """
+    批量评估视频并写入数据库
+
+    Args:
+        videos: 视频文件列表
+        action: 文件名推断不到时使用的动作键
+        view: 文件名推断不到时使用的视图
+        workers: 工作进程数，None表示CPU核数，1表示在当前进程中处理
+        db_path: 数据库文件路径
+        frame_step: 每隔多少帧处理一帧
+        max_frames: 每个视频最多处理的帧数，None表示全部
+        filter_mode: 关键点滤波模式
+        commit_every: 每累计多少个视频写入一次数据库
+        user_id: 会话所属用户ID
+
+    Returns:
+        dict: {工作进程ID: {'videos', 'frames', 'elapsed'}}
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, *infer_action_view(path, action, view), frame_step, max_frames) for path in videos]
+    db = DatabaseManager(db_path)
+    pending = []
+    worker_stats = {}
+    failed = 0
+    start = time.perf_counter()
+
+    if workers == 1:
+        # 单进程时直接在当前进程中处理，省去启动工作进程的开销
+        _init_worker(filter_mode)
+        pool = contextlib.nullcontext()
+        results = map(evaluate_video, tasks)
+    else:
+        # spawn方式启动：每个工作进程独立初始化MediaPipe，避免fork继承父进程状态
+        pool = multiprocessing.get_context('spawn').Pool(workers, initializer=_init_worker,
+                                                          initargs=(filter_mode,))
+        results = pool.imap_unordered(evaluate_video, tasks)
+    with pool:
+        for i, result in enumerate(results, 1):
+            name = os.path.basename(result['video'])
+            if result['error']:
+                failed += 1
+                print(f"[{i}/{len(tasks)}] {name} 失败: {result['error']}")
+                continue
+
+            stats = worker_stats.setdefault(result['worker'], {'videos': 0, 'frames': 0, 'elapsed': 0.0})
+            stats['videos'] += 1
+            stats['frames'] += result['frames']
+            stats['elapsed'] += result['elapsed']
+
+            evaluation = result['evaluation']
+            score = evaluation['score'] if evaluation else '-'
+            fps = result['frames'] / result['elapsed'] if result['elapsed'] > 0 else 0.0
+            print(f"[{i}/{len(tasks)}] {name} 动作:{result['action']} 视图:{result['view']} "
+                  f"帧数:{result['frames']} 检出:{result['detected']} 次数:{result['reps']} 评分:{score} "
+                  f"{fps:.1f} 帧/秒 (进程 {result['worker']})")
+
+            pending.append({
+                'action_type': result['action'], 'view_type': result['view'], 'user_id': user_id,
+                'names': result['names'], 'timestamps': result['timestamps'], 'matrix': result['matrix'],
+                'evaluation': evaluation
+            })
+            if len(pending) >= commit_every:
+                db.save_session_results(pending)
+                pending = []
+
+    if pending:
+        db.save_session_results(pending)
+    db.close()
+
+    elapsed = time.perf_counter() - start
+    total_frames = sum(stats['frames'] for stats in worker_stats.values())
+    print(f"\n完成：{len(tasks) - failed}/{len(tasks)} 个视频，共 {total_frames} 帧，"
+          f"耗时 {elapsed:.1f} 秒，总吞吐 {total_frames / elapsed if elapsed > 0 else 0:.1f} 帧/秒")
+    print(f"{'进程':<10}{'视频数':>8}{'帧数':>10}{'耗时(秒)':>10}{'帧/秒':>10}")
+    for pid, stats in sorted(worker_stats.items()):
+        fps = stats['frames'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+        print(f"{pid:<10}{stats['videos']:>8}{stats['frames']:>10}{stats['elapsed']:>10.1f}{fps:>10.1f}")
+
+    return worker_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线视频批量FMS评估")
+    parser.add_argument("video_dir", help="包含评估录像的目录")
+    parser.add_argument("--action", default="squat", choices=list(ASSESSORS),
+                        help="文件名中没有动作名称时使用的动作")
+    parser.add_argument("--view", default="front", choices=VIEWS,
+                        help="文件名中没有视图名称时使用的视图")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument("--db_path", default="squat_evaluation.db", help="数据库文件路径")
+    parser.add_argument("--frame_step", type=int, default=1, help="每隔多少帧处理一帧")
+    parser.add_argument("--max_frames", type=int, default=None, help="每个视频最多处理的帧数")
+    parser.add_argument("--filter_mode", choices=['moving_average', 'one_euro'], default=None,
+                        help="关键点滤波模式")
+    parser.add_argument("--commit_every", type=int, default=16, help="每累计多少个视频写入一次数据库")
+    parser.add_argument("--recursive", action="store_true", help="包含子目录中的视频")
+    parser.add_argument("--user_id", type=int, default=None, help="会话所属用户ID（批量生成训练方案时按用户读取评估结果）")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.video_dir):
+        print(f"错误：视频目录 '{args.video_dir}' 不存在")
+        sys.exit(1)
+
+    videos = list_videos(args.video_dir, recursive=args.recursive)
+    if not videos:
+        print(f"目录 '{args.video_dir}' 中没有视频文件")
+        return
+
+    print(f"找到 {len(videos)} 个视频文件")
+    run_batch(videos, action=args.action, view=args.view, workers=args.workers, db_path=args.db_path,
+              frame_step=max(1, args.frame_step), max_frames=args.max_frames,
+              filter_mode=args.filter_mode, commit_every=args.commit_every, user_id=args.user_id)
+
+
+if __name__ == "__main__":
+    main()
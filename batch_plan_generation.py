@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量训练方案生成工具
+
+团体筛查时为多名用户生成个性化训练方案：从数据库读取用户信息和每个动作最近一次的评估结果，
+用有上限的线程池并发调用AI接口，令牌桶限制请求速率，生成的方案按批写回数据库。
+
+进度保存在检查点文件中（每批方案写入数据库后更新），任务中断后用相同参数重新运行
+会跳过已完成的用户；生成失败的用户会在下次运行时重试。没有评估结果的用户不发送请求，
+只在汇总中列出。检查点记录数据库路径和生成方案时
+每个用户最新的评估ID，换用其他数据库或用户有了新的评估结果时会重新生成；全部用户成功后
+删除检查点文件。
+
+用法:
+    python batch_plan_generation.py [--db_path squat_evaluation.db] [--users 1 2 3]
+                                    [--concurrency 4] [--rate 1.0] [--burst 4]
+                                    [--checkpoint plan_batch_checkpoint.json]
+                                    [--import_profiles profiles.json]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager import DatabaseManager
+
+# 动作键到提示词中动作名称的映射（与 PoseEstimator.ACTIONS 对应）
+ACTION_NAMES = {
+    'squat': '深蹲',
+    'hurdle_step': '前后过栏架步',
+    'split_squat': '分腿蹲',
+    'shoulder_flex': '肩部柔韧',
+    'active_leg_raise': '主动直膝抬腿',
+    'push_up': '俯卧撑',
+    'trunk_rotation': '体旋',
+}
+
+
+class TokenBucket:
+    """线程安全的令牌桶限速器"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（即平均请求速率）
+            capacity: 桶容量（允许的突发请求数）
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取出一个令牌，没有令牌时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Checkpoint:
+    """
+    批量任务的进度记录（JSON文件）
+
+    completed 记录 {用户ID: 生成方案时该用户最新的评估ID}，只有评估ID相同时才算已完成；
+    检查点属于另一个数据库时视为空。
+    """
+
+    def __init__(self, path, db_path=None):
+        self.path = path
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self.completed = {}
+        self.failed = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            completed = state.get('completed')
+            # 其他数据库的检查点或旧格式（只有用户ID列表）不能判断输入是否变化，直接忽略
+            if state.get('db_path') == self.db_path and isinstance(completed, dict):
+                self.completed = {int(user_id): key for user_id, key in completed.items()}
+                self.failed = {int(user_id): error for user_id, error in state.get('failed', {}).items()}
+
+    def is_completed(self, user_id, evaluation_key):
+        """用户是否已经用同样的评估结果生成过方案"""
+        return user_id in self.completed and self.completed[user_id] == evaluation_key
+
+    def save(self):
+        """写入检查点文件（先写临时文件再替换，中断时不会留下不完整的文件）"""
+        if not self.path:
+            return
+        state = {
+            'db_path': self.db_path,
+            'completed': {str(k): v for k, v in sorted(self.completed.items())},
+            'failed': {str(k): v for k, v in self.failed.items()}
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        """删除检查点文件（全部用户完成后调用，下次运行从头开始）"""
+        self.completed.clear()
+        self.failed.clear()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def evaluation_key(evaluations):
+    """用户评估结果的标识：最新的评估ID（有新评估时改变），没有评估时为None"""
+    return max((evaluation['evaluation_id'] for evaluation in evaluations), default=None)
+
+
+def build_assessment_results(evaluations):
+    """
+    把数据库中的评估记录转换为 AIFitnessAssistant 使用的评估结果格式
+
+    Args:
+        evaluations: DatabaseManager.get_latest_evaluations 的返回值
+
+    Returns:
+        list: [{'movement_name', 'score', 'feedback', 'angles'}, ...]
+    """
+    results = []
+    for evaluation in evaluations:
+        metrics = evaluation['metrics'] if isinstance(evaluation['metrics'], dict) else {}
+        angles = metrics.get('angles')
+        if not isinstance(angles, dict):
+            # 没有单独的角度字段时取指标中的数值项
+            angles = {name: value for name, value in metrics.items()
+                      if isinstance(value, (int, float)) and not isinstance(value, bool)}
+        results.append({
+            'movement_name': ACTION_NAMES.get(evaluation['action_type'], evaluation['action_type']),
+            'score': evaluation['score'],
+            'feedback': evaluation['compensations'],
+            'angles': angles
+        })
+    return results
+
+
+def generate_plans(db, assistant, user_ids=None, concurrency=4, rate=1.0, burst=None,
+                   checkpoint_path=None, write_every=10, progress=print):
+    """
+    批量生成训练方案并写入数据库
+
+    Args:
+        db: DatabaseManager实例
+        assistant: AIFitnessAssistant实例（需提供 request_personalized_plan）
+        user_ids: 用户ID列表，None表示所有有用户信息的用户（没有评估结果的用户跳过并列出）
+        concurrency: 同时进行的请求数上限
+        rate: 平均每秒发起的请求数
+        burst: 令牌桶容量，None表示与并发数相同
+        checkpoint_path: 检查点文件路径，None表示不记录进度；全部用户成功后删除该文件
+        write_every: 每累计多少个方案写入一次数据库
+        progress: 进度输出函数，None表示不输出
+
+    Returns:
+        dict: {'generated', 'skipped', 'failed': {用户ID: 错误}, 'no_evaluations': [用户ID], 'elapsed'}
+    """
+    checkpoint = Checkpoint(checkpoint_path, db.db_path)
+    profiles = db.get_user_profiles(user_ids)
+    # 在主线程中读取全部输入，工作线程只负责请求
+    evaluations = {user_id: db.get_latest_evaluations(user_id) for user_id in profiles}
+    keys = {user_id: evaluation_key(evaluations[user_id]) for user_id in profiles}
+    # 没有评估结果时无法生成个性化方案，不必花费一次付费请求
+    no_evaluations = [user_id for user_id in profiles if keys[user_id] is None]
+    if progress and no_evaluations:
+        progress(f"跳过 {len(no_evaluations)} 个没有评估结果的用户: {', '.join(map(str, no_evaluations))}")
+    pending_users = [user_id for user_id in profiles
+                     if keys[user_id] is not None and not checkpoint.is_completed(user_id, keys[user_id])]
+    skipped = len(profiles) - len(no_evaluations) - len(pending_users)
+    tasks = {user_id: (profiles[user_id], build_assessment_results(evaluations[user_id]))
+             for user_id in pending_users}
+
+    bucket = TokenBucket(rate, burst or concurrency)
+    model = getattr(assistant, 'model', None)
+    buffered = []
+    generated = 0
+    start = time.perf_counter()
+
+    def work(user_id):
+        bucket.acquire()
+        profile, results = tasks[user_id]
+        return assistant.request_personalized_plan(profile, results)
+
+    def write_buffered():
+        # 先写数据库再更新检查点：中断时最多重复生成一批，不会丢失已记录完成的方案
+        db.save_training_plans([(user_id, model, plan) for user_id, plan in buffered])
+        for user_id, _ in buffered:
+            checkpoint.completed[user_id] = keys[user_id]
+            checkpoint.failed.pop(user_id, None)
+        checkpoint.save()
+        buffered.clear()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="plan-batch") as executor:
+        futures = {executor.submit(work, user_id): user_id for user_id in pending_users}
+        for i, future in enumerate(as_completed(futures), 1):
+            user_id = futures[future]
+            try:
+                plan = future.result()
+            except Exception as e:
+                checkpoint.failed[user_id] = str(e)
+                checkpoint.save()
+                if progress:
+                    progress(f"[{i}/{len(futures)}] 用户 {user_id} 失败: {e}")
+                continue
+            buffered.append((user_id, plan))
+            generated += 1
+            if progress:
+                progress(f"[{i}/{len(futures)}] 用户 {user_id} 完成 ({len(plan)} 字)")
+            if len(buffered) >= write_every:
+                write_buffered()
+
+    if buffered:
+        write_buffered()
+    failed = dict(checkpoint.failed)
+    if not failed:
+        checkpoint.remove()
+    return {
+        'generated': generated,
+        'skipped': skipped,
+        'failed': failed,
+        'no_evaluations': no_evaluations,
+        'elapsed': time.perf_counter() - start
+    }
+
+
+def import_profiles(db, path):
+    """
+    从JSON文件导入用户信息
+
+    文件内容为列表，每项包含 username 和 UserProfile.get_profile() 的字段。
+
+    Returns:
+        list: 导入的用户ID
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    user_ids = []
+    for entry in entries:
+        entry = dict(entry)
+        user_id = db.add_user(entry.pop('username'))
+        db.save_user_profile(user_id, entry)
+        user_ids.append(user_id)
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量生成个性化训练方案")
+    parser.add_argument("--db_path", default="squat_evaluation.db", help="数据库文件路径")
+    parser.add_argument("--users", type=int, nargs="*", default=None, help="用户ID（默认全部有用户信息的用户）")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时进行的请求数上限")
+    parser.add_argument("--rate", type=float, default=1.0, help="平均每秒请求数")
+    parser.add_argument("--burst", type=int, default=None, help="允许的突发请求数（默认等于并发数）")
+    parser.add_argument("--checkpoint", default="plan_batch_checkpoint.json", help="检查点文件路径")
+    parser.add_argument("--write_every", type=int, default=10, help="每累计多少个方案写入一次数据库")
+    parser.add_argument("--import_profiles", default=None, help="先从JSON文件导入用户信息")
+    parser.add_argument("--model", default="deepseek-reasoner", help="使用的模型")
+    parser.add_argument("--api_key", default=None, help="API密钥（默认读取DEEPSEEK_API_KEY环境变量）")
+    parser.add_argument("--base_url", default=None, help="API地址")
+    args = parser.parse_args()
+
+    from ai_assistant import AIFitnessAssistant
+
+    db = DatabaseManager(args.db_path)
+    if args.import_profiles:
+        imported = import_profiles(db, args.import_profiles)
+        print(f"已导入 {len(imported)} 个用户信息")
+
+    with AIFitnessAssistant(api_key=args.api_key, model=args.model, base_url=args.base_url,
+                            pool_maxsize=args.concurrency) as assistant:
+        summary = generate_plans(db, assistant, user_ids=args.users, concurrency=args.concurrency,
+                                 rate=args.rate, burst=args.burst, checkpoint_path=args.checkpoint,
+                                 write_every=args.write_every)
+    db.close()
+
+    print(f"\n完成：生成 {summary['generated']} 个方案，跳过 {summary['skipped']} 个已完成用户，"
+          f"失败 {len(summary['failed'])} 个，没有评估结果 {len(summary['no_evaluations'])} 个，"
+          f"耗时 {summary['elapsed']:.1f} 秒")
+    for user_id, error in summary['failed'].items():
+        print(f"  用户 {user_id}: {error}")
+    for user_id in summary['no_evaluations']:
+        print(f"  用户 {user_id}: 没有评估结果，未生成方案")
+
+
+if __name__ == "__main__":
+    main()
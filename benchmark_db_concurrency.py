@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+数据库并发读写基准测试
+
+在 squat_evaluation.db 的临时副本上，一个线程持续写入帧数据，同时多个读线程
+查询会话历史和会话帧数据，比较两种配置的吞吐量：
+
+- legacy: 回滚日志(journal_mode=DELETE) + synchronous=FULL，每帧提交一次
+- wal: WAL + synchronous=NORMAL + 按线程分配连接，帧数据经后台批量写入器写入
+
+用法:
+    python benchmark_db_concurrency.py [--frames 2000] [--readers 2] [--db squat_evaluation.db]
+"""
+
+import sys
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import argparse
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager import DatabaseManager
+
+LEGACY_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+}
+
+SAMPLE_FRAME = {
+    'left_knee_angle': 95.0, 'right_knee_angle': 93.5,
+    'left_hip_angle': 80.2, 'right_hip_angle': 81.0,
+    'trunk_angle': 12.3, 'knee_valgus': 0.02,
+}
+
+
+def reader_loop(db, session_id, stop_event, counters):
+    """读线程：循环查询会话历史和会话帧数据"""
+    while not stop_event.is_set():
+        try:
+            db.get_session_history(limit=20)
+            db.get_session_data(session_id)
+            counters['reads'] += 1
+        except sqlite3.OperationalError:
+            counters['errors'] += 1
+    db.release_connection()
+
+
+def run(mode, source_db, frames, readers):
+    """在数据库副本上运行一种配置"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        if os.path.exists(source_db):
+            shutil.copy(source_db, db_path)
+
+        db = DatabaseManager(db_path, pragmas=LEGACY_PRAGMAS if mode == 'legacy' else None)
+        session_id = db.start_session("squat", "front")
+
+        stop_event = threading.Event()
+        counters = {'reads': 0, 'errors': 0}
+        threads = [threading.Thread(target=reader_loop, args=(db, session_id, stop_event, counters))
+                   for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            if mode == 'legacy':
+                db.log_frame_data(session_id, SAMPLE_FRAME)
+            else:
+                db.log_frame_data_async(session_id, SAMPLE_FRAME)
+        db.stop_session(session_id)
+        elapsed = time.perf_counter() - start
+
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        db.close()
+
+    return {
+        'write_fps': frames / elapsed,
+        'read_qps': counters['reads'] / elapsed,
+        'read_errors': counters['errors'],
+        'elapsed': elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite并发读写吞吐量基准测试")
+    parser.add_argument("--frames", type=int, default=2000, help="写入帧数")
+    parser.add_argument("--readers", type=int, default=2, help="读线程数")
+    parser.add_argument("--db", default="squat_evaluation.db", help="作为初始数据的数据库文件（不会被修改）")
+    args = parser.parse_args()
+
+    print(f"写入 {args.frames} 帧, {args.readers} 个读线程, 初始数据: {args.db}")
+    print(f"{'配置':<10}{'写入(帧/秒)':>14}{'读取(次/秒)':>14}{'读取失败':>10}{'耗时(秒)':>10}")
+    for mode in ('legacy', 'wal'):
+        result = run(mode, args.db, args.frames, args.readers)
+        print(f"{mode:<10}{result['write_fps']:>14.0f}{result['read_qps']:>14.1f}"
+              f"{result['read_errors']:>10d}{result['elapsed']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+关键点滤波器基准测试
+
+使用合成的深蹲轨迹（静止 -> 多次深蹲 -> 静止，叠加高斯噪声）比较
+移动平均与One Euro滤波的滞后、抖动和每帧耗时：
+
+- 静止抖动：静止阶段滤波结果相对真实位置的RMS误差
+- 运动误差：运动阶段滤波结果相对真实位置的RMS误差
+- 平均滞后：运动阶段滤波结果与真实轨迹互相关最大时的帧偏移
+- 最低点延迟：每次深蹲最低点的检测时间相对真实最低点的平均延迟（帧）
+
+用法:
+    python benchmark_landmark_filter.py [--noise 0.004] [--fps 30]
+"""
+
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.landmark_filter import LandmarkFilter, ONE_EURO_PRESETS
+
+
+def synthesize_squat(fps=30.0, reps=5, period=2.0, rest=2.0, depth=0.25, noise=0.004, seed=0):
+    """
+    生成合成深蹲关键点序列
+
+    Returns:
+        (带噪声的关键点数组 (T, 33, 3), 真实关键点数组 (T, 33, 3), 运动阶段掩码 (T,), 真实最低点帧索引列表)
+    """
+    rng = np.random.default_rng(seed)
+    rest_frames = int(rest * fps)
+    rep_frames = int(period * fps)
+    total = rest_frames * 2 + rep_frames * reps
+
+    # 每次深蹲的下降量为升余弦曲线，最低点位于周期中点
+    offset = np.zeros(total)
+    phase = np.arange(rep_frames) / rep_frames
+    for r in range(reps):
+        start = rest_frames + r * rep_frames
+        offset[start:start + rep_frames] = depth * 0.5 * (1 - np.cos(2 * np.pi * phase))
+
+    base = rng.random((33, 3)) * 0.5 + 0.25
+    truth = np.repeat(base[None], total, axis=0)
+    # 所有关键点随身体上下移动，下肢关键点移动幅度较小
+    weights = np.linspace(1.0, 0.3, 33)
+    truth[:, :, 1] += offset[:, None] * weights[None, :]
+
+    noisy = truth + rng.normal(0, noise, truth.shape)
+    moving = offset > 0
+    bottoms = [rest_frames + r * rep_frames + rep_frames // 2 for r in range(reps)]
+    return noisy, truth, moving, bottoms, rep_frames
+
+
+def measure(landmark_filter, noisy, truth, moving, bottoms, rep_frames, fps):
+    """对滤波器运行一遍序列并统计指标"""
+    landmark_filter.reset()
+    filtered = np.empty_like(noisy)
+    start = time.perf_counter()
+    for t, frame in enumerate(noisy):
+        filtered[t] = landmark_filter.filter(frame, timestamp=t / fps)
+    per_frame_us = (time.perf_counter() - start) / len(noisy) * 1e6
+
+    error = filtered - truth
+    static_jitter = np.sqrt(np.mean(error[~moving] ** 2))
+    moving_error = np.sqrt(np.mean(error[moving] ** 2))
+
+    # 以鼻子（0号关键点）的y坐标估计滞后
+    signal = filtered[:, 0, 1] - filtered[:, 0, 1].mean()
+    reference = truth[:, 0, 1] - truth[:, 0, 1].mean()
+    lags = np.arange(0, 16)
+    correlation = [np.dot(signal[lag:], reference[:len(reference) - lag]) for lag in lags]
+    lag = int(lags[int(np.argmax(correlation))])
+
+    # 最低点（y最大）检测延迟
+    delays = []
+    for bottom in bottoms:
+        window = slice(bottom - rep_frames // 2, bottom + rep_frames // 2)
+        detected = window.start + int(np.argmax(filtered[window, 0, 1]))
+        delays.append(detected - bottom)
+
+    return {
+        'static_jitter': static_jitter,
+        'moving_error': moving_error,
+        'lag_frames': lag,
+        'bottom_delay': float(np.mean(delays)),
+        'per_frame_us': per_frame_us
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键点滤波器滞后与抖动基准测试")
+    parser.add_argument("--noise", type=float, default=0.004, help="关键点噪声标准差（归一化坐标）")
+    parser.add_argument("--fps", type=float, default=30.0, help="帧率")
+    args = parser.parse_args()
+
+    noisy, truth, moving, bottoms, rep_frames = synthesize_squat(fps=args.fps, noise=args.noise)
+
+    candidates = [
+        ("无滤波(moving_average, window=1)", LandmarkFilter(window_size=1)),
+        ("moving_average, window=5", LandmarkFilter(window_size=5)),
+        ("moving_average, window=9", LandmarkFilter(window_size=9)),
+    ]
+    for action in ('squat', 'hurdle_step', 'shoulder_flex'):
+        params = ONE_EURO_PRESETS[action]
+        candidates.append((f"one_euro[{action}] {params}",
+                           LandmarkFilter.for_action(action, frequency=args.fps)))
+
+    print(f"合成深蹲序列: {len(noisy)} 帧, 噪声 {args.noise}, 帧率 {args.fps}")
+    print(f"{'滤波器':<70}{'静止抖动':>10}{'运动误差':>10}{'滞后(帧)':>10}{'最低点延迟':>12}{'耗时(us)':>10}")
+    for name, landmark_filter in candidates:
+        result = measure(landmark_filter, noisy, truth, moving, bottoms, rep_frames, args.fps)
+        print(f"{name:<70}{result['static_jitter']:>10.5f}{result['moving_error']:>10.5f}"
+              f"{result['lag_frames']:>10d}{result['bottom_delay']:>12.1f}{result['per_frame_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预览纹理上传基准测试
+
+比较Kivy预览的两种显示路径每帧的内存分配和耗时：
+
+- legacy: process_frame 中 BGR→RGB→BGR 两次转换，cv2.flip 翻转后 tostring()，
+          每帧 Texture.create 新建纹理
+- reuse:  process_frame 只做一次 BGR→RGB 转换（output_format='rgb'），
+          PreviewTexture 复用纹理并直接从数组上传
+
+纹理用内存缓冲区模拟（创建时分配与GPU纹理同样大小的存储，上传时复制数据），
+因此可以在没有窗口和OpenGL上下文的环境中运行；没有安装cv2时用numpy完成翻转和颜色转换。
+
+用法:
+    python benchmark_preview_texture.py [--frames 300] [--width 640] [--height 480]
+"""
+
+import sys
+import os
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from preview_texture import PreviewTexture
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+class MemoryTexture:
+    """用内存缓冲区模拟的纹理"""
+
+    created = 0
+
+    def __init__(self, size, colorfmt):
+        width, height = size
+        self.storage = np.empty(width * height * 3, dtype=np.uint8)
+        MemoryTexture.created += 1
+
+    def flip_vertical(self):
+        pass
+
+    def blit_buffer(self, buffer, colorfmt='rgb', bufferfmt='ubyte'):
+        self.storage[:] = np.frombuffer(buffer, dtype=np.uint8)
+
+
+def swap_channels(image):
+    """BGR与RGB互相转换"""
+    if cv2 is not None:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(image[..., ::-1])
+
+
+def flip_rows(image):
+    """上下翻转图像"""
+    if cv2 is not None:
+        return cv2.flip(image, 0)
+    return np.ascontiguousarray(image[::-1])
+
+
+def legacy_frame(frame, _state):
+    """原来的显示路径"""
+    image = swap_channels(frame)  # MediaPipe输入
+    image = swap_channels(image)  # 转回BGR后绘制
+    buf = flip_rows(image).tobytes()
+    texture = MemoryTexture((image.shape[1], image.shape[0]), 'bgr')
+    texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+    return texture
+
+
+def reuse_frame(frame, preview):
+    """复用纹理的显示路径"""
+    image = swap_channels(frame)  # MediaPipe输入，同时作为预览图像
+    return preview.update(image)
+
+
+def run(path, frames, width, height):
+    """运行一种显示路径，返回每帧耗时、每帧内存峰值增量（字节）和创建的纹理数"""
+    rng = np.random.default_rng(0)
+    source = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    preview = PreviewTexture(colorfmt='rgb', texture_factory=MemoryTexture)
+    MemoryTexture.created = 0
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        path(source, preview)
+    elapsed = time.perf_counter() - start
+    textures = MemoryTexture.created
+
+    # 单独一轮测量内存分配（tracemalloc会拖慢执行，不计入耗时）
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        path(source, preview)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return {
+        'ms_per_frame': elapsed / frames * 1000,
+        'bytes_per_frame': allocated / frames,
+        'textures': textures
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预览纹理上传的内存分配和耗时基准测试")
+    parser.add_argument("--frames", type=int, default=300, help="每种路径处理的帧数")
+    parser.add_argument("--width", type=int, default=640, help="帧宽度")
+    parser.add_argument("--height", type=int, default=480, help="帧高度")
+    args = parser.parse_args()
+
+    frame_bytes = args.width * args.height * 3
+    print(f"{args.frames} 帧, {args.width}x{args.height} (每帧 {frame_bytes / 1024:.0f} KB), "
+          f"{'cv2' if cv2 is not None else 'numpy'} 颜色转换")
+    print(f"{'路径':<10}{'耗时(ms/帧)':>14}{'峰值内存增量(KB/帧)':>18}{'帧大小倍数':>12}{'创建纹理数':>12}")
+    for name, path in (('legacy', legacy_frame), ('reuse', reuse_frame)):
+        result = run(path, args.frames, args.width, args.height)
+        print(f"{name:<10}{result['ms_per_frame']:>14.3f}{result['bytes_per_frame'] / 1024:>18.0f}"
+              f"{result['bytes_per_frame'] / frame_bytes:>12.1f}{result['textures']:>12d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+应用启动导入耗时基准测试
+
+在新的Python进程中导入启动第一个界面所需的模块，测量导入耗时，并检查
+cv2、mediapipe、scipy、requests 这些耗时较长的模块没有在启动时被导入
+（它们应在首次使用时或界面显示后的后台线程中加载）。
+
+超过启动耗时预算或有重量级模块被提前导入时以退出码1结束，可用于CI检查。
+
+用法:
+    python benchmark_startup.py [--budget 3.0] [--repeat 3] [--top 10]
+"""
+
+import sys
+import os
+import json
+import argparse
+import importlib.util
+import subprocess
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 启动时导入的模块（不依赖Kivy的部分）
+CORE_MODULES = ['utils', 'fms_assessors', 'db_manager', 'frame_pipeline', 'user_profile',
+                'plan_cache', 'ai_assistant', 'pose_estimator', 'preview_texture',
+                'inference_scheduler']
+# 界面模块，只在安装了Kivy时测量
+UI_MODULES = ['training_plan_screen', 'user_profile_screen', 'skeleton_overlay', 'main_kivy']
+# 不应在启动时导入的模块
+HEAVY_MODULES = ('cv2', 'mediapipe', 'scipy', 'requests')
+DEFAULT_BUDGET = 3.0  # 启动导入耗时预算（秒）
+
+MEASURE_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'elapsed': elapsed, 'heavy_loaded': loaded}}))
+"""
+
+
+def startup_modules():
+    """返回当前环境中需要测量的启动模块（未安装Kivy时不包含界面模块）"""
+    if importlib.util.find_spec('kivy') is None:
+        return list(CORE_MODULES)
+    return CORE_MODULES + UI_MODULES
+
+
+def measure_startup(modules=None, repeat=3):
+    """
+    在新进程中测量导入耗时
+
+    Args:
+        modules: 要导入的模块列表，None表示 startup_modules()
+        repeat: 重复次数（取最小值，排除磁盘缓存等干扰）
+
+    Returns:
+        dict: {'modules', 'elapsed'（秒）, 'runs', 'heavy_loaded'（被导入的重量级模块）}
+    """
+    modules = modules or startup_modules()
+    script = MEASURE_SCRIPT.format(modules=modules, heavy=HEAVY_MODULES)
+    runs = []
+    heavy_loaded = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result['elapsed'])
+        heavy_loaded.update(result['heavy_loaded'])
+    return {
+        'modules': modules,
+        'elapsed': min(runs),
+        'runs': runs,
+        'heavy_loaded': sorted(heavy_loaded)
+    }
+
+
+def slowest_imports(modules=None, top=10):
+    """
+    使用 python -X importtime 找出累计耗时最长的导入
+
+    Returns:
+        list: [(累计耗时(秒), 模块名), ...]，按耗时降序
+    """
+    modules = modules or startup_modules()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+                               cwd=PROJECT_DIR, check=True, capture_output=True, text=True)
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if fields[1].isdigit():
+            timings.append((int(fields[1]) / 1e6, fields[2]))
+    return sorted(timings, reverse=True)[:top]
+
+
+def check_budget(result, budget=DEFAULT_BUDGET):
+    """
+    检查测量结果是否满足启动预算
+
+    Returns:
+        list: 问题说明，空列表表示通过
+    """
+    problems = []
+    if result['elapsed'] > budget:
+        problems.append(f"启动导入耗时 {result['elapsed']:.2f} 秒，超过预算 {budget:.2f} 秒")
+    for name in result['heavy_loaded']:
+        problems.append(f"{name} 在启动时被导入，应改为延迟导入")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="应用启动导入耗时基准测试")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="启动导入耗时预算（秒）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复测量次数")
+    parser.add_argument("--top", type=int, default=10, help="显示累计耗时最长的导入数量，0表示不显示")
+    args = parser.parse_args()
+
+    result = measure_startup(repeat=args.repeat)
+    print(f"导入模块: {', '.join(result['modules'])}")
+    print(f"导入耗时: {result['elapsed']:.3f} 秒 (各次: {', '.join(f'{t:.3f}' for t in result['runs'])})")
+    if args.top:
+        print(f"\n累计耗时最长的 {args.top} 个导入:")
+        for seconds, name in slowest_imports(result['modules'], args.top):
+            print(f"  {seconds * 1000:>8.1f} ms  {name}")
+
+    problems = check_budget(result, args.budget)
+    if problems:
+        print("\n未通过启动预算检查:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print(f"\n✓ 启动导入耗时在预算 {args.budget:.2f} 秒以内，未提前导入 {', '.join(HEAVY_MODULES)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,449 @@ import sqlite3
 import datetime
 import os
 import json
+import queue
+import threading
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger('DatabaseManager')
+
+# 每个连接打开后执行的PRAGMA设置
+# - journal_mode=WAL: 读写互不阻塞，后台写入帧数据时界面线程仍可查询
+# - synchronous=NORMAL: WAL模式下只在检查点时fsync，单次提交开销大幅降低
+# - cache_size为负数时单位为KiB，mmap_size单位为字节
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 64 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+
+def connect_database(db_path, pragmas=None):
+    """
+    打开数据库连接并应用PRAGMA设置
+    
+    Args:
+        db_path: 数据库文件路径
+        pragmas: PRAGMA设置字典，None表示使用 DEFAULT_PRAGMAS
+        
+    Returns:
+        sqlite3.Connection: 数据库连接（允许在其他线程中复用，但同一时刻只能由一个线程使用）
+    """
+    connection = sqlite3.connect(db_path, check_same_thread=False)
+    for name, value in (DEFAULT_PRAGMAS if pragmas is None else pragmas).items():
+        connection.execute(f"PRAGMA {name}={value}")
+    return connection
+
+
+# 帧数据时间戳的文本格式（毫秒精度）
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# 单个数据块最多包含的帧数
+MAX_CHUNK_FRAMES = 1024
+
+
+def format_timestamp(seconds):
+    """把Unix时间戳（秒）格式化为帧数据使用的时间字符串"""
+    return datetime.datetime.fromtimestamp(seconds).strftime(TIMESTAMP_FORMAT)[:-3]
+
+
+def parse_timestamp(text):
+    """把帧数据时间字符串解析为Unix时间戳（秒）"""
+    for fmt in (TIMESTAMP_FORMAT, "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    return float('nan')
+
+
+def _is_numeric(value):
+    """判断帧字段是否按数值列存储（None记为NaN）"""
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def encode_frame_chunks(frames, max_chunk_frames=MAX_CHUNK_FRAMES):
+    """
+    把帧字典列表编码为二进制数据块
+    
+    连续且数值字段相同的帧合并为一个块：数值字段打包为 float32 矩阵（帧数 × 指标数），
+    非数值字段（如视图名称）单独保存为JSON，块内取值相同时只存一份。
+    
+    Args:
+        frames: 帧字典列表
+        max_chunk_frames: 单个块最多包含的帧数
+        
+    Returns:
+        list: [(起始帧索引, 帧数, 指标名称元组, 数据bytes, 非数值字段JSON或None), ...]
+    """
+    chunks = []
+    start = 0
+    while start < len(frames):
+        first = frames[start]
+        names = tuple(k for k, v in first.items() if _is_numeric(v))
+        extra_names = tuple(k for k, v in first.items() if not _is_numeric(v))
+        end = start + 1
+        while end < len(frames) and end - start < max_chunk_frames:
+            frame = frames[end]
+            if (tuple(k for k, v in frame.items() if _is_numeric(v)) != names or
+                    tuple(k for k, v in frame.items() if not _is_numeric(v)) != extra_names):
+                break
+            end += 1
+        
+        matrix = np.array(
+            [[np.nan if frame[k] is None else frame[k] for k in names] for frame in frames[start:end]],
+            dtype=np.float32
+        ).reshape(end - start, len(names))
+        
+        extras_json = None
+        if extra_names:
+            constant, per_frame = {}, {}
+            for k in extra_names:
+                values = [frame[k] for frame in frames[start:end]]
+                if all(v == values[0] for v in values):
+                    constant[k] = values[0]
+                else:
+                    per_frame[k] = values
+            extras_json = json.dumps({'constant': constant, 'per_frame': per_frame})
+        
+        chunks.append((start, end - start, names, matrix.tobytes(), extras_json))
+        start = end
+    return chunks
+
+
+def decode_frame_chunk(names, frame_count, data):
+    """把数据块还原为 float32 矩阵（帧数 × 指标数）"""
+    return np.frombuffer(data, dtype=np.float32).reshape(frame_count, len(names))
+
+
+def get_schema_id(cursor, names):
+    """获取指标名称列表对应的schema_id，不存在时创建"""
+    key = json.dumps(list(names), ensure_ascii=False)
+    cursor.execute("INSERT OR IGNORE INTO frame_schemas (metric_names) VALUES (?)", (key,))
+    cursor.execute("SELECT schema_id FROM frame_schemas WHERE metric_names = ?", (key,))
+    return cursor.fetchone()[0]
+
+
+def insert_frame_chunks(cursor, session_id, timestamps, frames, max_chunk_frames=MAX_CHUNK_FRAMES):
+    """
+    以二进制块格式写入一个会话的多帧数据（不提交事务）
+    
+    Args:
+        cursor: 数据库游标
+        session_id: 会话ID
+        timestamps: 每帧的Unix时间戳（秒）
+        frames: 帧字典列表
+        max_chunk_frames: 单个块最多包含的帧数
+        
+    Returns:
+        int: 写入的块数
+    """
+    chunks = encode_frame_chunks(frames, max_chunk_frames)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    for start, count, names, data, extras_json in chunks:
+        cursor.execute(
+            "INSERT INTO frame_chunks (session_id, schema_id, frame_count, start_time, timestamps, data, extras_json) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (session_id, get_schema_id(cursor, names), count, float(timestamps[start]),
+             timestamps[start:start + count].tobytes(), data, extras_json)
+        )
+    return len(chunks)
+
+
+def insert_frame_matrix(cursor, session_id, names, timestamps, matrix, max_chunk_frames=MAX_CHUNK_FRAMES):
+    """
+    把已成形的数值矩阵直接写为二进制帧块（不提交事务）
+    
+    Args:
+        cursor: 数据库游标
+        session_id: 会话ID
+        names: 指标名称列表（矩阵的列）
+        timestamps: 每帧的Unix时间戳（秒）
+        matrix: 形状为 (帧数, 指标数) 的数组
+        max_chunk_frames: 单个块最多包含的帧数
+        
+    Returns:
+        int: 写入的块数
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if len(matrix) == 0:
+        return 0
+    schema_id = get_schema_id(cursor, names)
+    rows = []
+    for start in range(0, len(matrix), max_chunk_frames):
+        end = min(start + max_chunk_frames, len(matrix))
+        rows.append((session_id, schema_id, end - start, float(timestamps[start]),
+                     timestamps[start:end].tobytes(), matrix[start:end].tobytes(), None))
+    cursor.executemany(
+        "INSERT INTO frame_chunks (session_id, schema_id, frame_count, start_time, timestamps, data, extras_json) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    return len(rows)
+
+
+class ConnectionPool:
+    """
+    按线程分配的SQLite连接池
+    
+    每个线程首次调用 acquire 时获得一个专属连接，之后重复调用返回同一连接；
+    线程结束使用后调用 release 把连接放回空闲列表供其他线程复用。
+    """
+    
+    def __init__(self, db_path, max_idle=4, pragmas=None):
+        """
+        初始化连接池
+        
+        Args:
+            db_path: 数据库文件路径
+            max_idle: 最多保留的空闲连接数，超出的连接在释放时关闭
+            pragmas: PRAGMA设置字典，None表示使用 DEFAULT_PRAGMAS
+        """
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.pragmas = pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = []
+        self._connections = set()
+    
+    def acquire(self):
+        """获取当前线程的连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = connect_database(self.db_path, self.pragmas)
+            with self._lock:
+                self._connections.add(connection)
+        self._local.connection = connection
+        return connection
+    
+    def release(self):
+        """归还当前线程的连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            return
+        self._local.connection = None
+        connection.rollback()  # 丢弃未提交的事务，避免带锁归还
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+            self._connections.discard(connection)
+        connection.close()
+    
+    def close_all(self):
+        """关闭连接池中的全部连接"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._idle = []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+    
+    def __len__(self):
+        return len(self._connections)
+
+
+class AsyncFrameWriter:
+    """
+    后台批量帧写入器
+    
+    调用方只把帧数据放入队列即返回，后台线程按数量或时间把多帧合并为一个事务写入，
+    避免每帧一次 commit（fsync）阻塞采集/推理线程。队列满时 submit 会阻塞等待
+    （背压），超过 put_timeout 仍无法入队则丢弃该帧并计数。
+    """
+    
+    def __init__(self, db_path, batch_size=64, flush_interval=0.5, max_queue_size=1024, put_timeout=1.0,
+                 pool=None):
+        """
+        初始化写入器
+        
+        Args:
+            db_path: 数据库文件路径
+            batch_size: 每个事务最多写入的帧数
+            flush_interval: 最长等待时间（秒），超过后即使未攒满也会写入
+            max_queue_size: 队列最大长度
+            put_timeout: 队列满时 submit 的最长等待时间（秒）
+            pool: 连接池，None表示写入线程自行打开连接
+        """
+        self.db_path = db_path
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.written_frames = 0
+        self.dropped_frames = 0
+        self.last_error = None
+        self._thread = None
+    
+    @property
+    def is_running(self):
+        """写入线程是否正在运行"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """启动后台写入线程"""
+        if self.is_running:
+            return
+        self._thread = threading.Thread(target=self._run, name='FrameWriter', daemon=True)
+        self._thread.start()
+    
+    def submit(self, session_id, frame_data, timestamp=None):
+        """
+        提交一帧数据
+        
+        Args:
+            session_id: 会话ID
+            frame_data: 帧数据字典
+            timestamp: Unix时间戳（秒），None表示使用当前时间
+            
+        Returns:
+            bool: 成功入队返回True，队列持续满载导致丢弃返回False
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self.queue.put((session_id, timestamp, frame_data), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self.dropped_frames += 1
+            logger.warning(f"帧写入队列已满，丢弃一帧（累计丢弃 {self.dropped_frames} 帧）")
+            return False
+    
+    def flush(self, timeout=None):
+        """
+        等待已提交的帧全部写入数据库
+        
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            bool: 在超时前完成写入返回True
+        """
+        if not self.is_running:
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+    
+    def stop(self, timeout=None):
+        """写入剩余数据并停止后台线程"""
+        if not self.is_running:
+            return
+        self.queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _write_batch(self, connection, batch):
+        """在一个事务中写入一批帧（每个会话的连续帧合并为二进制块）"""
+        try:
+            with connection:
+                cursor = connection.cursor()
+                start = 0
+                while start < len(batch):
+                    session_id = batch[start][0]
+                    end = start + 1
+                    while end < len(batch) and batch[end][0] == session_id:
+                        end += 1
+                    insert_frame_chunks(cursor, session_id,
+                                        [item[1] for item in batch[start:end]],
+                                        [item[2] for item in batch[start:end]])
+                    start = end
+            self.written_frames += len(batch)
+        except Exception as e:
+            self.last_error = e
+            logger.error(f"批量写入帧数据失败: {str(e)}")
+    
+    def _run(self):
+        """后台线程：按数量或时间合并写入"""
+        connection = self.pool.acquire() if self.pool is not None else connect_database(self.db_path)
+        batch = []
+        deadline = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = False  # 到达时间上限
+                
+                if isinstance(item, tuple):
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                    if len(batch) < self.batch_size:
+                        continue
+                
+                if batch:
+                    self._write_batch(connection, batch)
+                    batch = []
+                deadline = None
+                
+                if item is None:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+        finally:
+            if self.pool is not None:
+                self.pool.release()
+            else:
+                connection.close()
+
 
 class DatabaseManager:
     """管理深蹲评估系统的数据库操作"""
     
-    def __init__(self, db_path="squat_evaluation.db"):
+    def __init__(self, db_path="squat_evaluation.db", pragmas=None):
         self.db_path = db_path
-        self.connection = None
-        self.cursor = None
+        self.pool = None
+        self.pragmas = pragmas
+        self._local = threading.local()
+        self.frame_writer = None  # 后台批量帧写入器，首次异步写入时创建
         self.initialize_database()
     
+    @property
+    def connection(self):
+        """当前线程的数据库连接"""
+        return self.pool.acquire() if self.pool is not None else None
+    
+    @property
+    def cursor(self):
+        """当前线程的游标（与 connection 一一对应）"""
+        connection = self.connection
+        if connection is None:
+            return None
+        if getattr(self._local, 'connection', None) is not connection:
+            self._local.connection = connection
+            self._local.cursor = connection.cursor()
+        return self._local.cursor
+    
+    def release_connection(self):
+        """在工作线程结束前归还其连接"""
+        self._local.connection = None
+        self._local.cursor = None
+        if self.pool is not None:
+            self.pool.release()
+    
     def initialize_database(self):
         """初始化数据库，创建所需的表"""
         # 确保数据库目录存在
         db_dir = os.path.dirname(self.db_path) or os.getcwd()
         os.makedirs(db_dir, exist_ok=True)
         
-        # 连接数据库
-        self.connection = sqlite3.connect(self.db_path)
-        self.cursor = self.connection.cursor()
+        # 创建连接池（连接按线程分配）
+        self.pool = ConnectionPool(self.db_path, pragmas=self.pragmas)
         
         # 创建用户表
         self.cursor.execute('''
@@ -57,6 +481,31 @@ class DatabaseManager:
         )
         ''')
         
+        # 创建帧数据schema表（二进制帧块的指标名称列表，JSON数组）
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS frame_schemas (
+            schema_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            metric_names TEXT NOT NULL UNIQUE
+        )
+        ''')
+        
+        # 创建二进制帧块表
+        # timestamps: float64 Unix时间戳数组；data: float32 矩阵（帧数 × 指标数，行优先）
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS frame_chunks (
+            chunk_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER,
+            schema_id INTEGER NOT NULL,
+            frame_count INTEGER NOT NULL,
+            start_time REAL NOT NULL,
+            timestamps BLOB NOT NULL,
+            data BLOB NOT NULL,
+            extras_json TEXT,
+            FOREIGN KEY (session_id) REFERENCES sessions (session_id),
+            FOREIGN KEY (schema_id) REFERENCES frame_schemas (schema_id)
+        )
+        ''')
+        
         # 创建评估结果表
         self.cursor.execute('''
         CREATE TABLE IF NOT EXISTS evaluations (
@@ -72,10 +521,34 @@ class DatabaseManager:
         )
         ''')
         
+        # 创建用户信息表（训练方案生成所需的年龄、身高、目标等，JSON对象）
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_profiles (
+            user_id INTEGER PRIMARY KEY,
+            profile_json TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''')
+        
+        # 创建训练方案表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS training_plans (
+            plan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            model TEXT,
+            plan TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''')
+        
         # 创建索引以提高查询性能
         self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)')
         self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_frame_data_session ON frame_data (session_id)')
         self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluations_session ON evaluations (session_id)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_frame_chunks_session ON frame_chunks (session_id, start_time)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_training_plans_user ON training_plans (user_id)')
         
         self.connection.commit()
     
@@ -99,6 +572,93 @@ class DatabaseManager:
             self.cursor.execute("SELECT user_id FROM users WHERE username = ?", (username,))
             return self.cursor.fetchone()[0]
     
+    def save_user_profile(self, user_id, profile):
+        """保存（覆盖）用户信息，profile 为 UserProfile.get_profile() 格式的字典"""
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO user_profiles (user_id, profile_json, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            (user_id, json.dumps(profile, ensure_ascii=False))
+        )
+        self.connection.commit()
+    
+    def get_user_profiles(self, user_ids=None):
+        """
+        获取用户信息
+        
+        Args:
+            user_ids: 用户ID列表，None表示全部有用户信息的用户
+            
+        Returns:
+            dict: {用户ID: 用户信息字典}，按用户ID排序
+        """
+        query = "SELECT user_id, profile_json FROM user_profiles"
+        params = []
+        if user_ids is not None:
+            if not user_ids:
+                return {}
+            query += f" WHERE user_id IN ({','.join('?' * len(user_ids))})"
+            params = list(user_ids)
+        self.cursor.execute(query + " ORDER BY user_id", params)
+        return {user_id: json.loads(profile_json) for user_id, profile_json in self.cursor.fetchall()}
+    
+    def get_latest_evaluations(self, user_id):
+        """
+        获取用户每个动作最近一次的评估结果
+        
+        Returns:
+            list: [{'evaluation_id', 'action_type', 'view_type', 'score', 'reason', 'compensations', 'metrics',
+                   'created_at'}, ...]，按动作名称排序
+        """
+        self.cursor.execute("""
+        SELECT e.evaluation_id, s.action_type, s.view_type, e.score, e.reason, e.compensations, e.metrics_json,
+               e.created_at
+        FROM evaluations e
+        JOIN sessions s ON s.session_id = e.session_id
+        WHERE s.user_id = ? AND e.evaluation_id = (
+            SELECT e2.evaluation_id FROM evaluations e2
+            JOIN sessions s2 ON s2.session_id = e2.session_id
+            WHERE s2.user_id = s.user_id AND s2.action_type = s.action_type
+            ORDER BY e2.created_at DESC, e2.evaluation_id DESC LIMIT 1
+        )
+        ORDER BY s.action_type
+        """, (user_id,))
+        return [
+            {'evaluation_id': evaluation_id, 'action_type': action_type, 'view_type': view_type, 'score': score,
+             'reason': reason, 'compensations': json.loads(compensations) if compensations else [],
+             'metrics': json.loads(metrics_json) if metrics_json else {}, 'created_at': created_at}
+            for evaluation_id, action_type, view_type, score, reason, compensations, metrics_json, created_at
+            in self.cursor.fetchall()
+        ]
+    
+    def save_training_plans(self, plans):
+        """
+        在一个事务中批量写入训练方案
+        
+        Args:
+            plans: [(用户ID, 模型名称, 训练方案文本), ...]
+            
+        Returns:
+            int: 写入的方案数
+        """
+        try:
+            self.cursor.executemany(
+                "INSERT INTO training_plans (user_id, model, plan, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+                plans
+            )
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            raise e
+        return len(plans)
+    
+    def get_latest_training_plan(self, user_id):
+        """获取用户最近一次生成的训练方案，没有时返回None"""
+        self.cursor.execute(
+            "SELECT plan FROM training_plans WHERE user_id = ? ORDER BY created_at DESC, plan_id DESC LIMIT 1",
+            (user_id,)
+        )
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+    
     def start_session(self, action_type, view_type, user_id=None, pain_reported=False):
         """开始新的评估会话"""
         self.cursor.execute(
@@ -111,6 +671,10 @@ class DatabaseManager:
     
     def stop_session(self, session_id):
         """结束评估会话"""
+        # 确保该会话已提交的帧全部写入
+        if self.frame_writer:
+            self.frame_writer.flush()
+        
         self.cursor.execute(
             "UPDATE sessions SET end_time = CURRENT_TIMESTAMP WHERE session_id = ?",
             (session_id,)
@@ -119,33 +683,45 @@ class DatabaseManager:
     
     def log_frame_data(self, session_id, frame_data):
         """记录一帧姿态数据"""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        data_json = json.dumps(frame_data)
-        
-        self.cursor.execute(
-            "INSERT INTO frame_data (session_id, timestamp, data_json) VALUES (?, ?, ?)",
-            (session_id, timestamp, data_json)
-        )
+        insert_frame_chunks(self.cursor, session_id, [time.time()], [frame_data])
         self.connection.commit()
     
+    def start_frame_writer(self, **kwargs):
+        """
+        启动后台批量帧写入器
+        
+        Args:
+            **kwargs: 传给 AsyncFrameWriter 的参数（batch_size、flush_interval等）
+            
+        Returns:
+            AsyncFrameWriter: 写入器实例
+        """
+        if self.frame_writer is None:
+            self.frame_writer = AsyncFrameWriter(self.db_path, pool=self.pool, **kwargs)
+        self.frame_writer.start()
+        return self.frame_writer
+    
+    def log_frame_data_async(self, session_id, frame_data):
+        """
+        异步记录一帧姿态数据（不等待写入完成）
+        
+        Returns:
+            bool: 成功入队返回True
+        """
+        if self.frame_writer is None or not self.frame_writer.is_running:
+            self.start_frame_writer()
+        return self.frame_writer.submit(session_id, frame_data)
+    
     def log_batch_frame_data(self, session_id, frames_data):
         """批量记录多帧姿态数据（提高性能）"""
         if not frames_data:
             return
         
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        data_tuples = []
-        
-        for frame_data in frames_data:
-            data_json = json.dumps(frame_data)
-            data_tuples.append((session_id, timestamp, data_json))
+        timestamp = time.time()
         
         # 使用事务批量插入
         try:
-            self.cursor.executemany(
-                "INSERT INTO frame_data (session_id, timestamp, data_json) VALUES (?, ?, ?)",
-                data_tuples
-            )
+            insert_frame_chunks(self.cursor, session_id, [timestamp] * len(frames_data), frames_data)
             self.connection.commit()
         except Exception as e:
             self.connection.rollback()
@@ -164,6 +740,48 @@ class DatabaseManager:
         self.connection.commit()
         return self.cursor.lastrowid
     
+    def save_session_results(self, results):
+        """
+        在一个事务中批量写入多个完整会话（会话、帧数据和评估结果）
+        
+        Args:
+            results: 会话结果列表，每项为字典：
+                {
+                    'action_type', 'view_type', 'user_id'(可选), 'pain_reported'(可选),
+                    'names': 指标名称列表, 'timestamps': 时间戳数组, 'matrix': 帧数据矩阵,
+                    'evaluation': {'score', 'reason', 'similarity', 'compensations', 'metrics'}（可选）
+                }
+                
+        Returns:
+            list: 新建的会话ID列表
+        """
+        session_ids = []
+        try:
+            for result in results:
+                self.cursor.execute(
+                    "INSERT INTO sessions (user_id, action_type, view_type, start_time, end_time, pain_reported) \
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?)",
+                    (result.get('user_id'), result['action_type'], result['view_type'],
+                     int(result.get('pain_reported', False)))
+                )
+                session_id = self.cursor.lastrowid
+                insert_frame_matrix(self.cursor, session_id, result['names'], result['timestamps'], result['matrix'])
+                
+                evaluation = result.get('evaluation')
+                if evaluation:
+                    self.cursor.execute(
+                        "INSERT INTO evaluations (session_id, score, reason, similarity, compensations, metrics_json) \
+                        VALUES (?, ?, ?, ?, ?, ?)",
+                        (session_id, evaluation['score'], evaluation['reason'], evaluation['similarity'],
+                         json.dumps(evaluation['compensations']), json.dumps(evaluation['metrics']))
+                    )
+                session_ids.append(session_id)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            raise e
+        return session_ids
+    
     def get_session_history(self, user_id=None, limit=100):
         """获取评估会话历史"""
         query = """
@@ -185,21 +803,245 @@ class DatabaseManager:
         self.cursor.execute(query, params)
         return self.cursor.fetchall()
     
+    def _load_json_frames(self, session_id):
+        """读取会话中尚未迁移的JSON格式帧数据"""
+        self.cursor.execute("SELECT timestamp, data_json FROM frame_data WHERE session_id = ? ORDER BY frame_id",
+                          (session_id,))
+        rows = self.cursor.fetchall()
+        timestamps = np.array([parse_timestamp(row[0]) for row in rows], dtype=np.float64)
+        return timestamps, [json.loads(row[1]) for row in rows]
+    
+    def _iter_json_frames(self, session_id, batch_size=256):
+        """按批读取未迁移的JSON帧，逐帧产出 (时间戳, 数据字典)"""
+        cursor = self.connection.cursor()  # 独立游标，迭代期间不受其他查询影响
+        cursor.execute("SELECT timestamp, data_json FROM frame_data WHERE session_id = ? ORDER BY frame_id",
+                       (session_id,))
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for timestamp, data_json in rows:
+                    yield parse_timestamp(timestamp), json.loads(data_json)
+        finally:
+            cursor.close()
+    
+    def _iter_frame_chunks(self, session_id, batch_size=16):
+        """
+        按时间顺序逐块读取会话的二进制帧块
+        
+        Yields:
+            (指标名称列表, 时间戳数组, float32矩阵, 非数值字段字典或None)
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("""
+        SELECT c.frame_count, c.timestamps, c.data, c.extras_json, s.metric_names
+        FROM frame_chunks c JOIN frame_schemas s ON c.schema_id = s.schema_id
+        WHERE c.session_id = ? ORDER BY c.start_time, c.chunk_id
+        """, (session_id,))
+        schemas = {}
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for frame_count, timestamps, data, extras_json, metric_names in rows:
+                    names = schemas.get(metric_names)
+                    if names is None:
+                        names = schemas[metric_names] = json.loads(metric_names)
+                    yield (
+                        names,
+                        np.frombuffer(timestamps, dtype=np.float64),
+                        decode_frame_chunk(names, frame_count, data),
+                        json.loads(extras_json) if extras_json else None
+                    )
+        finally:
+            cursor.close()
+    
+    def _load_frame_chunks(self, session_id):
+        """
+        读取会话的全部二进制帧块
+        
+        Returns:
+            list: [(指标名称列表, 时间戳数组, float32矩阵, 非数值字段字典或None), ...]
+        """
+        return list(self._iter_frame_chunks(session_id))
+    
+    @staticmethod
+    def _chunk_frames(names, timestamps, matrix, extras):
+        """把一个二进制帧块还原为逐帧的 (时间戳, 数据字典)，NaN还原为None"""
+        constant = extras['constant'] if extras else {}
+        per_frame = extras['per_frame'] if extras else {}
+        for i, timestamp in enumerate(timestamps.tolist()):
+            data = {name: (None if value != value else value)
+                    for name, value in zip(names, matrix[i].tolist())}
+            data.update(constant)
+            for name, values in per_frame.items():
+                data[name] = values[i]
+            yield timestamp, data
+    
+    def get_session_metric_names(self, session_id):
+        """
+        获取会话中出现过的全部数值指标名称
+        
+        Returns:
+            list: 指标名称列表（二进制帧块的指标在前，按首次出现顺序）
+        """
+        self.cursor.execute("""
+        SELECT s.metric_names FROM frame_schemas s
+        JOIN (SELECT schema_id, MIN(start_time) AS first_time FROM frame_chunks
+              WHERE session_id = ? GROUP BY schema_id) c ON s.schema_id = c.schema_id
+        ORDER BY c.first_time
+        """, (session_id,))
+        names = []
+        for (metric_names,) in self.cursor.fetchall():
+            names.extend(n for n in json.loads(metric_names) if n not in names)
+        # 未迁移的JSON帧需要扫描一遍才能得到全部指标
+        for _, data in self._iter_json_frames(session_id):
+            names.extend(k for k, v in data.items() if _is_numeric(v) and k not in names)
+        return names
+    
+    def iter_session_frames(self, session_id, batch_size=256):
+        """
+        逐帧迭代会话数据（流式读取，内存占用与会话长度无关）
+        
+        未迁移的JSON帧在前，二进制帧块按时间顺序在后。
+        
+        Args:
+            session_id: 会话ID
+            batch_size: 每次从数据库读取的JSON行数
+            
+        Yields:
+            dict: {'timestamp': 时间字符串, 'data': 数据字典}，与 get_session_data 的帧格式相同
+        """
+        for timestamp, data in self._iter_json_frames(session_id, batch_size):
+            yield {'timestamp': format_timestamp(timestamp), 'data': data}
+        for chunk in self._iter_frame_chunks(session_id):
+            for timestamp, data in self._chunk_frames(*chunk):
+                yield {'timestamp': format_timestamp(timestamp), 'data': data}
+    
+    def iter_session_chunks(self, session_id, chunk_size=256, names=None):
+        """
+        按固定帧数分块迭代会话的数值数据（流式读取）
+        
+        Args:
+            session_id: 会话ID
+            chunk_size: 每块的帧数（最后一块可能不足）
+            names: 需要的指标名称列表，None表示 get_session_metric_names 的结果
+            
+        Yields:
+            tuple: (指标名称列表, 时间戳数组 (帧数,), float32矩阵 (帧数, 指标数))，
+                   每块的指标名称列表相同，缺失的指标为NaN
+        """
+        names = self.get_session_metric_names(session_id) if names is None else list(names)
+        index = {name: i for i, name in enumerate(names)}
+        
+        def pieces():
+            """以 (指标名称, 时间戳, 矩阵) 形式产出原始数据片段"""
+            buffered_t, buffered = [], []
+            for timestamp, data in self._iter_json_frames(session_id):
+                buffered_t.append(timestamp)
+                buffered.append(data)
+                if len(buffered) == chunk_size:
+                    yield from self._json_pieces(buffered_t, buffered)
+                    buffered_t, buffered = [], []
+            if buffered:
+                yield from self._json_pieces(buffered_t, buffered)
+            for chunk_names, timestamps, matrix, _ in self._iter_frame_chunks(session_id):
+                yield chunk_names, timestamps, matrix
+        
+        out_t = np.empty(chunk_size, dtype=np.float64)
+        out = np.full((chunk_size, len(names)), np.nan, dtype=np.float32)
+        filled = 0
+        for piece_names, timestamps, matrix in pieces():
+            columns = [(j, index[name]) for j, name in enumerate(piece_names) if name in index]
+            start = 0
+            while start < len(timestamps):
+                count = min(chunk_size - filled, len(timestamps) - start)
+                out_t[filled:filled + count] = timestamps[start:start + count]
+                for j, k in columns:
+                    out[filled:filled + count, k] = matrix[start:start + count, j]
+                filled += count
+                start += count
+                if filled == chunk_size:
+                    yield names, out_t, out
+                    out_t = np.empty(chunk_size, dtype=np.float64)
+                    out = np.full((chunk_size, len(names)), np.nan, dtype=np.float32)
+                    filled = 0
+        if filled:
+            yield names, out_t[:filled], out[:filled]
+    
+    @staticmethod
+    def _json_pieces(timestamps, frames):
+        """把一批JSON帧编码为 (指标名称, 时间戳, 矩阵) 片段"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        for start, count, names, data, _ in encode_frame_chunks(frames):
+            yield list(names), timestamps[start:start + count], decode_frame_chunk(names, count, data)
+    
+    def get_session_matrix(self, session_id, names=None):
+        """
+        以NumPy矩阵形式获取会话的全部数值帧数据
+        
+        Args:
+            session_id: 会话ID
+            names: 需要的指标名称列表，None表示全部指标（按首次出现顺序）
+            
+        Returns:
+            tuple: (指标名称列表, 时间戳数组 (帧数,), float32矩阵 (帧数, 指标数))，
+                   某帧缺失的指标为NaN
+        """
+        parts = [chunk[:3] for chunk in self._load_frame_chunks(session_id)]
+        
+        json_timestamps, json_frames = self._load_json_frames(session_id)
+        if json_frames:
+            # 未迁移的JSON帧按同样的方式编码后参与合并
+            for start, count, chunk_names, data, _ in encode_frame_chunks(json_frames):
+                parts.append((list(chunk_names), json_timestamps[start:start + count],
+                              decode_frame_chunk(chunk_names, count, data)))
+        
+        if names is None:
+            names = []
+            for chunk_names, _, _ in parts:
+                names.extend(n for n in chunk_names if n not in names)
+        names = list(names)
+        
+        total = sum(len(timestamps) for _, timestamps, _ in parts)
+        timestamps = np.empty(total, dtype=np.float64)
+        matrix = np.full((total, len(names)), np.nan, dtype=np.float32)
+        index = {name: i for i, name in enumerate(names)}
+        row = 0
+        for chunk_names, chunk_timestamps, chunk_matrix in parts:
+            count = len(chunk_timestamps)
+            timestamps[row:row + count] = chunk_timestamps
+            for j, name in enumerate(chunk_names):
+                if name in index:
+                    matrix[row:row + count, index[name]] = chunk_matrix[:, j]
+            row += count
+        
+        # 同时存在两种格式时按时间排序（稳定排序保持同一时间戳内的写入顺序）
+        if json_frames and len(parts) > 1:
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, matrix = timestamps[order], matrix[order]
+        
+        return names, timestamps, matrix
+    
     def get_session_data(self, session_id):
         """获取特定会话的所有数据"""
         # 获取会话信息
         self.cursor.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
         session_info = self.cursor.fetchone()
         
-        # 获取帧数据
-        self.cursor.execute("SELECT timestamp, data_json FROM frame_data WHERE session_id = ? ORDER BY frame_id", 
-                          (session_id,))
-        frame_data = []
-        for row in self.cursor.fetchall():
-            frame_data.append({
-                'timestamp': row[0],
-                'data': json.loads(row[1])
-            })
+        # 获取帧数据（二进制帧块还原为字典，NaN还原为None）
+        frames = []
+        for chunk in self._load_frame_chunks(session_id):
+            frames.extend(self._chunk_frames(*chunk))
+        
+        json_timestamps, json_frames = self._load_json_frames(session_id)
+        if json_frames:
+            frames.extend(zip(json_timestamps.tolist(), json_frames))
+            frames.sort(key=lambda frame: frame[0])
+        
+        frame_data = [{'timestamp': format_timestamp(timestamp), 'data': data} for timestamp, data in frames]
         
         # 获取评估结果
         self.cursor.execute("SELECT * FROM evaluations WHERE session_id = ?", (session_id,))
@@ -211,6 +1053,41 @@ class DatabaseManager:
             'evaluation': evaluation
         }
     
+    def migrate_json_frames(self, session_ids=None, max_chunk_frames=MAX_CHUNK_FRAMES):
+        """
+        把 frame_data 表中的JSON帧数据迁移为二进制帧块
+        
+        每个会话在一个事务中完成：写入帧块后删除原JSON行。
+        注意数值以 float32 存储，精度约为7位有效数字。
+        
+        Args:
+            session_ids: 需要迁移的会话ID列表，None表示全部会话
+            max_chunk_frames: 单个块最多包含的帧数
+            
+        Returns:
+            dict: {'sessions': 迁移的会话数, 'frames': 迁移的帧数, 'chunks': 写入的块数}
+        """
+        if session_ids is None:
+            self.cursor.execute("SELECT DISTINCT session_id FROM frame_data ORDER BY session_id")
+            session_ids = [row[0] for row in self.cursor.fetchall()]
+        
+        summary = {'sessions': 0, 'frames': 0, 'chunks': 0}
+        for session_id in session_ids:
+            timestamps, frames = self._load_json_frames(session_id)
+            if not frames:
+                continue
+            try:
+                summary['chunks'] += insert_frame_chunks(self.cursor, session_id, timestamps, frames,
+                                                         max_chunk_frames)
+                self.cursor.execute("DELETE FROM frame_data WHERE session_id = ?", (session_id,))
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            summary['sessions'] += 1
+            summary['frames'] += len(frames)
+        return summary
+    
     def import_from_csv(self, csv_file_path, action_type, view_type, user_id=None):
         """从CSV文件导入数据"""
         import csv
@@ -258,7 +1135,10 @@ class DatabaseManager:
     
     def close(self):
         """关闭数据库连接"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            self.cursor = None
\ No newline at end of file
+        if self.frame_writer:
+            self.frame_writer.stop()
+            self.frame_writer = None
+        if self.pool is not None:
+            self.pool.close_all()
+            self.pool = None
+            self._local = threading.local()
\ No newline at end of file
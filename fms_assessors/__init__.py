@@ -17,6 +17,8 @@ FMS动作评估器模块
 - active_leg_raise: 主动直腿上抬动作评估器
 - trunk_pushup: 躯干稳定俯卧撑动作评估器
 - rotary_stability: 旋转稳定性动作评估器
+- registry: 动作键到评估器类的注册表
+- rules: 数据驱动的评分规则引擎（支持逐帧矩阵向量化评分）
 
 使用示例:
     from fms_assessors import SquatAssessor
@@ -35,4 +37,6 @@ from .shoulder_mobility import ShoulderMobilityAssessor
 from .active_leg_raise import ActiveLegRaiseAssessor
 from .trunk_pushup import TrunkPushupAssessor
 from .rotary_stability import RotaryStabilityAssessor
-from .base_assessor import BaseAssessor
\ No newline at end of file
+from .base_assessor import BaseAssessor
+from .registry import ASSESSORS, get_assessor
+from .rules import Condition, Rule, RuleSet
\ No newline at end of file
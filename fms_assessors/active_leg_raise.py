@@ -7,6 +7,7 @@
 import numpy as np
 from typing import Dict, Any, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class ActiveLegRaiseAssessor(BaseAssessor):
@@ -19,6 +20,14 @@ class ActiveLegRaiseAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式
+    REP_REDUCTIONS = {
+        'thigh_angle': 'max',
+        'support_leg_stability': 'min',
+        'pelvis_tilt': 'absmax',
+        'knee_flexion': 'max',
+    }
+    
     # 定义评分阈值
     THRESHOLDS = {
         'thigh_angle_3': 70,   # 3分标准：大腿与地面夹角≥70度
@@ -26,6 +35,20 @@ class ActiveLegRaiseAssessor(BaseAssessor):
         'thigh_angle_1': 50,   # 1分标准：大腿与地面夹角≥50度
     }
     
+    # 评分规则：大腿抬升角度低于3分标准为2分、低于2分标准为1分（只记录一条代偿），
+    # 其余规则任一条件满足时评分不超过对应上限
+    RULES = RuleSet([
+        Rule((Condition('thigh_angle', '<', THRESHOLDS['thigh_angle_3']),), 2, "大腿抬升角度不足: {thigh_angle:.1f}°"),
+        Rule((Condition('thigh_angle', '<', THRESHOLDS['thigh_angle_2']),), 1),
+        Rule((Condition('support_leg_stability', '<', 90, 100),), 2, "支撑腿稳定性不足"),
+        Rule((Condition('pelvis_tilt', 'abs>', 10),), 2, "骨盆倾斜过度"),
+        Rule((Condition('knee_flexion', '>', 10),), 2, "抬腿侧膝关节未充分伸直"),  # 膝关节应该基本伸直
+    ], reasons={
+        3: "主动直腿上抬动作完成良好，大腿抬升角度达到{thigh_angle:.1f}°",
+        2: "主动直腿上抬动作基本完成，大腿抬升角度为{thigh_angle:.1f}°，存在轻微代偿",
+        1: "主动直腿上抬动作完成困难，大腿抬升角度仅为{thigh_angle:.1f}°，存在明显代偿",
+    })
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -45,49 +68,4 @@ class ActiveLegRaiseAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
-        
-        # 评估大腿抬升角度
-        thigh_angle = angles.get('thigh_angle', 0)
-        if thigh_angle < self.THRESHOLDS['thigh_angle_3']:
-            score = 2 if thigh_angle >= self.THRESHOLDS['thigh_angle_2'] else 1
-            if thigh_angle < self.THRESHOLDS['thigh_angle_2']:
-                score = 1
-            compensations.append(f"大腿抬升角度不足: {thigh_angle:.1f}°")
-            
-        # 评估支撑腿稳定性
-        if angles.get('support_leg_stability', 100) < 90:
-            score = min(score, 2)
-            compensations.append("支撑腿稳定性不足")
-            
-        # 评估骨盆倾斜
-        if abs(angles.get('pelvis_tilt', 0)) > 10:
-            score = min(score, 2)
-            compensations.append("骨盆倾斜过度")
-            
-        # 评估膝关节伸直
-        if angles.get('knee_flexion', 0) > 10:  # 膝关节应该基本伸直
-            score = min(score, 2)
-            compensations.append("抬腿侧膝关节未充分伸直")
-            
-        if score == 3:
-            reasons.append(f"主动直腿上抬动作完成良好，大腿抬升角度达到{thigh_angle:.1f}°")
-        elif score == 2:
-            reasons.append(f"主动直腿上抬动作基本完成，大腿抬升角度为{thigh_angle:.1f}°，存在轻微代偿")
-        else:
-            reasons.append(f"主动直腿上抬动作完成困难，大腿抬升角度仅为{thigh_angle:.1f}°，存在明显代偿")
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
-        
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
-        
-        return result
\ No newline at end of file
+        return self._assess_rules(self.RULES, angles)
@@ -4,8 +4,23 @@ FMS评估器基类模块
 该模块定义了所有FMS动作评估器的统一接口。
 """
 
+import math
+import warnings
+import numpy as np
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Tuple, List
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple, List
+
+from .rules import RuleSet, template_fields
+
+
+# 单次动作窗口内各指标的归约方式
+REDUCERS = {
+    'min': lambda matrix: np.nanmin(matrix, axis=0),
+    'max': lambda matrix: np.nanmax(matrix, axis=0),
+    'mean': lambda matrix: np.nanmean(matrix, axis=0),
+    'absmax': lambda matrix: np.nanmax(np.abs(matrix), axis=0),
+}
 
 
 class BaseAssessor(ABC):
@@ -13,8 +28,24 @@ class BaseAssessor(ABC):
     FMS评估器抽象基类
     
     所有具体的FMS动作评估器都应该继承此类并实现相应的方法。
+    
+    子类通过 REP_REDUCTIONS 声明逐次评估时各指标在一次动作内取哪个极值
+    （例如膝角度取最小值即最大屈曲，膝外翻取最大值），未声明的指标取平均值。
+    
+    子类通过 RULES 声明评分规则表（见 rules.RuleSet），声明后 assess_stream
+    按数据块向量化评分，不再逐帧调用 assess。
+    
+    逐帧规则中的“角度 < 阈值”在归约为最大屈曲后含义相反（蹲得越深角度越小），
+    这类评估器通过 REP_RULES（或重写 rep_rule_set）为逐次评估声明方向一致的规则，
+    例如“一次动作中的最小膝角度 > 90 表示屈曲不足”。未声明时逐次评估使用 assess。
     """
     
+    REP_REDUCTIONS: Dict[str, str] = {}
+    DEFAULT_REDUCTION = 'mean'
+    RULES: Optional[RuleSet] = None
+    REP_RULES: Optional[RuleSet] = None
+    RULE_SIMILARITY = 100.0  # 按规则评分时的相似度（规则表不计算相似度）
+    
     def __init__(self):
         """初始化评估器"""
         self.assessment_history = []
@@ -49,6 +80,107 @@ class BaseAssessor(ABC):
         """
         pass
         
+    def _assess_rules(self, rule_set: RuleSet, angles: Dict[str, float]) -> Dict[str, Any]:
+        """
+        按规则表评估单帧并保存到历史记录
+        
+        Args:
+            rule_set: 评分规则集
+            angles: 关节角度字典
+            
+        Returns:
+            与 assess 格式相同的结果
+        """
+        score, reasons, compensations = rule_set.evaluate(angles)
+        result = {
+            'score': score,
+            'reasons': reasons,
+            'compensations': compensations,
+            'similarity': self.RULE_SIMILARITY
+        }
+        
+        # 保存评估结果到历史记录
+        self.assessment_history.append(result)
+        
+        return result
+        
+    def matrix_rule_sets(self, names: Sequence[str], matrix: np.ndarray) -> Optional[List[Tuple[RuleSet, np.ndarray]]]:
+        """
+        为矩阵中的各帧选择评分规则集
+        
+        Args:
+            names: 指标名称列表
+            matrix: 形状为 (帧数, 指标数) 的数组
+            
+        Returns:
+            [(规则集, 帧掩码), ...]，各掩码互不重叠；None表示没有规则表（需逐帧调用 assess）
+        """
+        if self.RULES is None:
+            return None
+        return [(self.RULES, np.ones(len(matrix), dtype=bool))]
+        
+    def score_matrix(self, names: Sequence[str], matrix) -> Optional[Dict[str, Any]]:
+        """
+        向量化评估多帧数据
+        
+        Args:
+            names: 指标名称列表（矩阵的列）
+            matrix: 形状为 (帧数, 指标数) 的数组，NaN表示该帧缺失此指标
+            
+        Returns:
+            {
+                'scores': 每帧评分数组,
+                'reasons': {评分: 首次出现该评分的帧的原因列表},
+                'compensation_counts': {代偿描述: 帧数}（按首次出现的帧和规则顺序排列）
+            }
+            没有规则表时返回None
+        """
+        names = list(names)
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+        rule_sets = self.matrix_rule_sets(names, matrix)
+        if rule_sets is None:
+            return None
+            
+        scores = np.full(len(matrix), 3, dtype=np.int64)
+        owner = np.full(len(matrix), -1, dtype=np.int64)
+        first_seen = []  # (首次出现的帧, 规则序号, 代偿描述, 帧数)
+        for set_index, (rule_set, mask) in enumerate(rule_sets):
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                continue
+            set_scores, triggered = rule_set.evaluate_matrix(names, matrix[rows])
+            scores[rows] = set_scores
+            owner[rows] = set_index
+            for rule_index, rule in enumerate(rule_set.rules):
+                hits = np.flatnonzero(triggered[:, rule_index])
+                if not rule.message or not len(hits):
+                    continue
+                if template_fields(rule.message):
+                    # 带数值的描述只能逐帧格式化
+                    seen = {}
+                    for row in rows[hits].tolist():
+                        message = rule_set.message(rule, rule_set.row_angles(names, matrix[row]))
+                        if message in seen:
+                            seen[message][1] += 1
+                        else:
+                            seen[message] = [row, 1]
+                    first_seen.extend((row, rule_index, message, count) for message, (row, count) in seen.items())
+                else:
+                    first_seen.append((int(rows[hits[0]]), rule_index, rule.message, len(hits)))
+                    
+        reasons = {}
+        for score in np.unique(scores).tolist():
+            row = int(np.argmax(scores == score))
+            if owner[row] < 0:
+                reasons[score] = []
+            else:
+                reasons[score] = rule_sets[owner[row]][0].reason(score, rule_sets[owner[row]][0].row_angles(names, matrix[row]))
+                
+        compensation_counts = {}
+        for _, _, message, count in sorted(first_seen, key=lambda item: item[:2]):
+            compensation_counts[message] = compensation_counts.get(message, 0) + count
+        return {'scores': scores, 'reasons': reasons, 'compensation_counts': compensation_counts}
+        
     def get_history(self) -> List[Dict[str, Any]]:
         """
         获取评估历史记录
@@ -69,4 +201,174 @@ class BaseAssessor(ABC):
             return 0.0
             
         total_score = sum(record['score'] for record in self.assessment_history)
-        return total_score / len(self.assessment_history)
\ No newline at end of file
+        return total_score / len(self.assessment_history)
+        
+    def assess_stream(self, chunks: Iterable, min_fraction: float = 0.05) -> Dict[str, Any]:
+        """
+        流式评估整个会话
+        
+        有规则表时每个数据块用 score_matrix 一次向量化评分，否则逐帧调用 assess；
+        只累积评分分布和代偿计数，不保留逐帧结果，内存占用与会话长度无关。
+        结束后只把汇总结果追加到历史记录。
+        
+        Args:
+            chunks: 数据块迭代器 [(指标名称列表, 时间戳数组, 矩阵), ...]，
+                    例如 DatabaseManager.iter_session_chunks 的输出；NaN表示该帧缺失此指标
+            min_fraction: 评分至少出现在该比例的帧中才计入最终评分，用于忽略偶发的噪声帧；
+                          默认5%，0表示任一帧的评分都计入（最终评分即最差帧的评分）
+            
+        Returns:
+            与 assess 格式相同的汇总结果，'parameters' 中包含帧数、评分分布和代偿计数
+        """
+        history_length = len(self.assessment_history)
+        frames = 0
+        score_counts = Counter()
+        compensation_counts = Counter()
+        reasons_by_score = {}
+        similarity_total = 0.0
+        
+        for chunk in chunks:
+            names = list(chunk[0])
+            scored = self.score_matrix(names, chunk[-1]) if len(chunk[-1]) else None
+            if scored is not None:
+                frames += len(scored['scores'])
+                values, first, counts = np.unique(scored['scores'], return_index=True, return_counts=True)
+                for position in np.argsort(first):  # 按首次出现的顺序累计，与逐帧评估一致
+                    score_counts[int(values[position])] += int(counts[position])
+                compensation_counts.update(scored['compensation_counts'])
+                for score, reasons in scored['reasons'].items():
+                    reasons_by_score.setdefault(score, reasons)
+                similarity_total += self.RULE_SIMILARITY * len(scored['scores'])
+                continue
+                
+            for row in chunk[-1].tolist():
+                angles = {name: value for name, value in zip(names, row) if not math.isnan(value)}
+                result = self.assess(angles, {})
+                del self.assessment_history[history_length:]
+                
+                frames += 1
+                score_counts[result['score']] += 1
+                compensation_counts.update(result['compensations'])
+                reasons_by_score.setdefault(result['score'], result['reasons'])
+                similarity_total += result['similarity']
+                
+        if frames == 0:
+            return {'score': 0, 'reasons': [], 'compensations': [], 'similarity': 0.0,
+                    'parameters': {'frames': 0, 'score_counts': {}, 'compensation_counts': {}}}
+                    
+        eligible = [score for score, count in score_counts.items() if count / frames >= min_fraction]
+        score = min(eligible) if eligible else max(score_counts)
+        result = {
+            'score': score,
+            'reasons': list(reasons_by_score[score]),
+            'compensations': [name for name, count in compensation_counts.most_common()
+                              if count / frames >= min_fraction],
+            'similarity': similarity_total / frames,
+            'parameters': {
+                'frames': frames,
+                'score_counts': dict(score_counts),
+                'compensation_counts': dict(compensation_counts)
+            }
+        }
+        self.assessment_history.append(result)
+        return result
+        
+    def reduce_rep(self, names: Sequence[str], matrix) -> Dict[str, float]:
+        """
+        把一次动作的帧矩阵归约为每个指标一个代表值
+        
+        Args:
+            names: 指标名称列表（矩阵的列）
+            matrix: 形状为 (帧数, 指标数) 的数组，NaN表示缺失
+            
+        Returns:
+            {指标名称: 代表值}，整段缺失的指标不包含在内
+        """
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(-1, len(names))
+        groups = {}
+        for column, name in enumerate(names):
+            groups.setdefault(self.REP_REDUCTIONS.get(name, self.DEFAULT_REDUCTION), []).append(column)
+            
+        reduced = {}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # 整列为NaN时的警告
+            for kind, columns in groups.items():
+                values = REDUCERS[kind](matrix[:, columns]) if len(matrix) else np.full(len(columns), np.nan)
+                for column, value in zip(columns, values.tolist()):
+                    if not math.isnan(value):
+                        reduced[names[column]] = value
+        return reduced
+        
+    def assess_rep(self, names: Sequence[str], matrix) -> Dict[str, Any]:
+        """
+        评估一次完整动作
+        
+        Args:
+            names: 指标名称列表
+            matrix: 该次动作的帧矩阵 (帧数, 指标数)
+            
+        Returns:
+            与 assess 格式相同的结果，'parameters' 中包含归约后的指标和帧数
+        """
+        reduced = self.reduce_rep(names, matrix)
+        rule_set = self.rep_rule_set(reduced)
+        result = self.assess(reduced, {}) if rule_set is None else self._assess_rules(rule_set, reduced)
+        result['parameters'] = dict(result.get('parameters', {}), rep_metrics=reduced, frames=len(matrix))
+        return result
+        
+    def rep_rule_set(self, reduced: Dict[str, float]) -> Optional[RuleSet]:
+        """
+        选择逐次评估的规则集
+        
+        Args:
+            reduced: reduce_rep 归约后的指标
+            
+        Returns:
+            规则集，None表示使用 assess 评估归约后的指标
+        """
+        return self.REP_RULES
+        
+    def assess_reps(self, reps: Iterable) -> Dict[str, Any]:
+        """
+        逐次评估多次动作并汇总
+        
+        按FMS惯例，会话评分取各次中的最高分；同时给出每次的评分。
+        
+        Args:
+            reps: 动作窗口迭代器，每项为 RepWindow 或 (指标名称列表, [时间戳,] 矩阵)
+            
+        Returns:
+            {
+                'score', 'reasons', 'compensations', 'similarity': 汇总结果（评分最高的那次），
+                'reps': 每次的评估结果列表,
+                'parameters': {'rep_scores', 'mean_score', 'min_score', 'compensation_counts'}
+            }
+        """
+        results = []
+        for rep in reps:
+            if hasattr(rep, 'matrix'):
+                names, matrix = rep.names, rep.matrix
+            else:
+                names, matrix = rep[0], rep[-1]
+            results.append(self.assess_rep(names, matrix))
+            
+        if not results:
+            return {'score': 0, 'reasons': [], 'compensations': [], 'similarity': 0.0, 'reps': [],
+                    'parameters': {'rep_scores': [], 'mean_score': 0.0, 'min_score': 0, 'compensation_counts': {}}}
+            
+        scores = [result['score'] for result in results]
+        best = results[scores.index(max(scores))]
+        compensation_counts = Counter(c for result in results for c in result['compensations'])
+        return {
+            'score': best['score'],
+            'reasons': list(best['reasons']),
+            'compensations': list(best['compensations']),
+            'similarity': best['similarity'],
+            'reps': results,
+            'parameters': {
+                'rep_scores': scores,
+                'mean_score': sum(scores) / len(scores),
+                'min_score': min(scores),
+                'compensation_counts': dict(compensation_counts)
+            }
+        }
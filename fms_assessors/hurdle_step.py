@@ -7,6 +7,7 @@
 import numpy as np
 from typing import Dict, Any, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class HurdleStepAssessor(BaseAssessor):
@@ -19,6 +20,34 @@ class HurdleStepAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式
+    REP_REDUCTIONS = {
+        'hip_angle': 'min',
+        'knee_angle': 'min',
+        'ankle_dorsiflexion': 'max',
+        'trunk_inclination': 'max',
+    }
+    
+    # 评分规则：任一条件满足时评分不超过对应上限，代偿描述按规则顺序记录
+    RULES = RuleSet([
+        Rule((Condition('hip_angle', '<', 90),), 2, "髋关节屈曲不足"),
+        Rule((Condition('knee_angle', '<', 90),), 2, "膝关节屈曲不足"),
+        Rule((Condition('ankle_dorsiflexion', '<', 10),), 2, "踝关节背屈不足"),
+        Rule((Condition('trunk_inclination', '>', 10),), 2, "躯干倾斜过度"),
+    ], reasons={
+        3: "跨栏步动作完成良好，各关节角度符合标准",
+        2: "跨栏步动作基本完成，但存在轻微代偿",
+        1: "跨栏步动作完成困难，存在明显代偿",
+    })
+    
+    # 逐次评估的规则：髋、膝角度已归约为一次动作中的最小值（最大屈曲），屈曲不足表示最小值仍高于阈值
+    REP_RULES = RuleSet([
+        Rule((Condition('hip_angle', '>', 90),), 2, "髋关节屈曲不足"),
+        Rule((Condition('knee_angle', '>', 90),), 2, "膝关节屈曲不足"),
+        Rule((Condition('ankle_dorsiflexion', '<', 10),), 2, "踝关节背屈不足"),
+        Rule((Condition('trunk_inclination', '>', 10),), 2, "躯干倾斜过度"),
+    ], reasons=RULES.reasons)
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -38,46 +67,4 @@ class HurdleStepAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
-        
-        # 评估髋关节角度
-        if angles.get('hip_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("髋关节屈曲不足")
-            
-        # 评估膝关节角度
-        if angles.get('knee_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("膝关节屈曲不足")
-            
-        # 评估踝关节背屈角度
-        if angles.get('ankle_dorsiflexion', 0) < 10:
-            score = min(score, 2)
-            compensations.append("踝关节背屈不足")
-            
-        # 评估躯干倾斜角度
-        if angles.get('trunk_inclination', 0) > 10:
-            score = min(score, 2)
-            compensations.append("躯干倾斜过度")
-            
-        if score == 3:
-            reasons.append("跨栏步动作完成良好，各关节角度符合标准")
-        elif score == 2:
-            reasons.append("跨栏步动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("跨栏步动作完成困难，存在明显代偿")
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
-        
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
-        
-        return result
\ No newline at end of file
+        return self._assess_rules(self.RULES, angles)
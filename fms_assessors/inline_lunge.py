@@ -7,6 +7,7 @@
 import numpy as np
 from typing import Dict, Any, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class InlineLungeAssessor(BaseAssessor):
@@ -19,6 +20,37 @@ class InlineLungeAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式
+    REP_REDUCTIONS = {
+        'front_leg_hip_angle': 'min',
+        'front_leg_knee_angle': 'min',
+        'back_leg_knee_angle': 'min',
+        'trunk_inclination': 'max',
+        'feet_separation': 'mean',
+    }
+    
+    # 评分规则：任一条件满足时评分不超过对应上限，代偿描述按规则顺序记录
+    RULES = RuleSet([
+        Rule((Condition('front_leg_hip_angle', '<', 90),), 2, "前腿髋关节屈曲不足"),
+        Rule((Condition('front_leg_knee_angle', '<', 90),), 2, "前腿膝关节屈曲不足"),
+        Rule((Condition('back_leg_knee_angle', '>', 10),), 2, "后腿膝关节未充分屈曲"),  # 应该接近0度
+        Rule((Condition('trunk_inclination', '>', 15),), 2, "躯干倾斜过度"),
+        Rule((Condition('feet_separation', '<', 10),), 2, "双足间距不足"),  # 应该有足够间距
+    ], reasons={
+        3: "直线弓步蹲动作完成良好，各关节角度符合标准",
+        2: "直线弓步蹲动作基本完成，但存在轻微代偿",
+        1: "直线弓步蹲动作完成困难，存在明显代偿",
+    })
+    
+    # 逐次评估的规则：前腿髋、膝角度已归约为一次动作中的最小值（最大屈曲），屈曲不足表示最小值仍高于阈值
+    REP_RULES = RuleSet([
+        Rule((Condition('front_leg_hip_angle', '>', 90),), 2, "前腿髋关节屈曲不足"),
+        Rule((Condition('front_leg_knee_angle', '>', 90),), 2, "前腿膝关节屈曲不足"),
+        Rule((Condition('back_leg_knee_angle', '>', 10),), 2, "后腿膝关节未充分屈曲"),
+        Rule((Condition('trunk_inclination', '>', 15),), 2, "躯干倾斜过度"),
+        Rule((Condition('feet_separation', '<', 10),), 2, "双足间距不足"),
+    ], reasons=RULES.reasons)
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -38,51 +70,4 @@ class InlineLungeAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
-        
-        # 评估前腿髋关节角度
-        if angles.get('front_leg_hip_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("前腿髋关节屈曲不足")
-            
-        # 评估前腿膝关节角度
-        if angles.get('front_leg_knee_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("前腿膝关节屈曲不足")
-            
-        # 评估后腿膝关节角度
-        if angles.get('back_leg_knee_angle', 0) > 10:  # 应该接近0度
-            score = min(score, 2)
-            compensations.append("后腿膝关节未充分屈曲")
-            
-        # 评估躯干倾斜角度
-        if angles.get('trunk_inclination', 0) > 15:
-            score = min(score, 2)
-            compensations.append("躯干倾斜过度")
-            
-        # 评估双足间距
-        if angles.get('feet_separation', 0) < 10:  # 应该有足够间距
-            score = min(score, 2)
-            compensations.append("双足间距不足")
-            
-        if score == 3:
-            reasons.append("直线弓步蹲动作完成良好，各关节角度符合标准")
-        elif score == 2:
-            reasons.append("直线弓步蹲动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("直线弓步蹲动作完成困难，存在明显代偿")
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
-        
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
-        
-        return result
\ No newline at end of file
+        return self._assess_rules(self.RULES, angles)
@@ -0,0 +1,46 @@
+"""
+评估器注册表模块
+
+该模块维护动作键（与 PoseEstimator.ACTIONS 的取值一致）到评估器类的映射，
+供离线批处理等需要按动作名称选择评估器的场景使用。
+"""
+
+from typing import Dict, Type
+
+from .base_assessor import BaseAssessor
+from .squat import SquatAssessor
+from .hurdle_step import HurdleStepAssessor
+from .inline_lunge import InlineLungeAssessor
+from .shoulder_mobility import ShoulderMobilityAssessor
+from .active_leg_raise import ActiveLegRaiseAssessor
+from .trunk_pushup import TrunkPushupAssessor
+from .rotary_stability import RotaryStabilityAssessor
+
+
+ASSESSORS: Dict[str, Type[BaseAssessor]] = {
+    'squat': SquatAssessor,
+    'hurdle_step': HurdleStepAssessor,
+    'split_squat': InlineLungeAssessor,
+    'shoulder_flex': ShoulderMobilityAssessor,
+    'active_leg_raise': ActiveLegRaiseAssessor,
+    'push_up': TrunkPushupAssessor,
+    'trunk_rotation': RotaryStabilityAssessor,
+}
+
+
+def get_assessor(action: str) -> BaseAssessor:
+    """
+    按动作键创建评估器实例
+    
+    Args:
+        action: 动作键，例如 'squat'、'hurdle_step'
+        
+    Returns:
+        对应的评估器实例
+        
+    Raises:
+        ValueError: 未知的动作键
+    """
+    if action not in ASSESSORS:
+        raise ValueError(f"未知的动作: {action}，可选: {', '.join(ASSESSORS)}")
+    return ASSESSORS[action]()
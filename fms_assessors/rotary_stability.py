@@ -7,6 +7,7 @@
 import numpy as np
 from typing import Dict, Any, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class RotaryStabilityAssessor(BaseAssessor):
@@ -19,6 +20,28 @@ class RotaryStabilityAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式：控制类指标取最差值
+    REP_REDUCTIONS = {
+        'trunk_rotation_control': 'min',
+        'limb_coordination': 'min',
+        'core_stability': 'min',
+        'movement_fluidity': 'min',
+        'contralateral_coordination': 'min',
+    }
+    
+    # 评分规则：任一条件满足时评分不超过对应上限，代偿描述按规则顺序记录
+    RULES = RuleSet([
+        Rule((Condition('trunk_rotation_control', '<', 90, 100),), 2, "躯干旋转控制能力不足"),
+        Rule((Condition('limb_coordination', '<', 90, 100),), 2, "四肢协调性不足"),
+        Rule((Condition('core_stability', '<', 90, 100),), 2, "核心稳定性不足"),
+        Rule((Condition('movement_fluidity', '<', 90, 100),), 2, "动作流畅性不足"),
+        Rule((Condition('contralateral_coordination', '<', 90, 100),), 1, "对侧肢体配合不佳"),
+    ], reasons={
+        3: "旋转稳定性动作完成良好，躯干控制稳定",
+        2: "旋转稳定性动作基本完成，但存在轻微代偿",
+        1: "旋转稳定性动作完成困难，存在明显代偿",
+    })
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -38,51 +61,4 @@ class RotaryStabilityAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
-        
-        # 评估躯干旋转控制
-        if angles.get('trunk_rotation_control', 100) < 90:
-            score = min(score, 2)
-            compensations.append("躯干旋转控制能力不足")
-            
-        # 评估四肢协调性
-        if angles.get('limb_coordination', 100) < 90:
-            score = min(score, 2)
-            compensations.append("四肢协调性不足")
-            
-        # 评估核心稳定性
-        if angles.get('core_stability', 100) < 90:
-            score = min(score, 2)
-            compensations.append("核心稳定性不足")
-            
-        # 评估动作流畅性
-        if angles.get('movement_fluidity', 100) < 90:
-            score = min(score, 2)
-            compensations.append("动作流畅性不足")
-            
-        # 评估对侧肢体配合
-        if angles.get('contralateral_coordination', 100) < 90:
-            score = min(score, 1)
-            compensations.append("对侧肢体配合不佳")
-            
-        if score == 3:
-            reasons.append("旋转稳定性动作完成良好，躯干控制稳定")
-        elif score == 2:
-            reasons.append("旋转稳定性动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("旋转稳定性动作完成困难，存在明显代偿")
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
-        
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
-        
-        return result
\ No newline at end of file
+        return self._assess_rules(self.RULES, angles)
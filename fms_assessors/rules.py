@@ -0,0 +1,182 @@
+"""
+评分规则引擎模块
+
+该模块把各评估器中 “if angles.get(k, 默认值) < 阈值: score = min(score, n)” 形式的判断
+改为数据驱动的规则表：每条规则由若干条件（任一满足即触发）、评分上限和代偿描述组成。
+
+功能描述:
+- RuleSet.evaluate: 对单帧角度字典求值，结果与原手写判断逐条一致
+- RuleSet.evaluate_matrix: 对 帧数 × 指标数 矩阵一次性向量化求值，
+  同一种比较运算的全部条件在一次NumPy比较中完成
+
+使用示例:
+    rules = RuleSet([
+        Rule((Condition('hip_angle', '<', 90),), cap=2, message="髋关节屈曲不足"),
+        Rule((Condition('trunk_inclination', '>', 10),), cap=2, message="躯干倾斜过度"),
+    ], reasons={3: "完成良好", 2: "存在轻微代偿", 1: "存在明显代偿"})
+    score, reasons, compensations = rules.evaluate(angles)
+"""
+
+import string
+import numpy as np
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# 比较运算：(标量版本, 向量版本)
+OPERATORS = {
+    '<': (lambda value, threshold: value < threshold, np.less),
+    '>': (lambda value, threshold: value > threshold, np.greater),
+    '<=': (lambda value, threshold: value <= threshold, np.less_equal),
+    '>=': (lambda value, threshold: value >= threshold, np.greater_equal),
+    'abs>': (lambda value, threshold: abs(value) > threshold, lambda values, thresholds: np.abs(values) > thresholds),
+}
+
+
+class Condition(NamedTuple):
+    """单个比较条件：angles.get(metric, default) <op> threshold"""
+    metric: str
+    op: str
+    threshold: float
+    default: float = 0.0
+
+
+class Rule(NamedTuple):
+    """评分规则：任一条件满足时评分不超过 cap，并记录代偿描述"""
+    conditions: Tuple[Condition, ...]
+    cap: int
+    message: Optional[str] = None  # 可包含 {指标名称:格式} 占位符，None表示不记录代偿
+
+
+@lru_cache(maxsize=None)
+def template_fields(template: Optional[str]) -> Tuple[str, ...]:
+    """取出模板中的占位符名称"""
+    if not template:
+        return ()
+    return tuple(field for _, field, _, _ in string.Formatter().parse(template) if field)
+
+
+class RuleSet:
+    """一组评分规则及各评分对应的原因描述"""
+
+    def __init__(self, rules: Sequence[Rule], reasons: Dict[int, str], base_score: int = 3,
+                 defaults: Optional[Dict[str, float]] = None):
+        """
+        初始化规则集
+
+        Args:
+            rules: 规则列表（按顺序记录代偿描述）
+            reasons: {评分: 原因描述模板}，未列出的评分使用最接近的较低评分的描述
+            base_score: 没有规则触发时的评分
+            defaults: 原因描述模板中占位符指标的默认值
+        """
+        for rule in rules:
+            for condition in rule.conditions:
+                if condition.op not in OPERATORS:
+                    raise ValueError(f"不支持的比较运算: {condition.op}")
+        self.rules = tuple(rules)
+        self.reasons = dict(reasons)
+        self.base_score = base_score
+        self.defaults = dict(defaults or {})
+        for rule in self.rules:
+            for condition in rule.conditions:
+                self.defaults.setdefault(condition.metric, condition.default)
+        self._compiled = {}
+
+    @property
+    def metrics(self) -> List[str]:
+        """规则涉及的全部指标"""
+        names = []
+        for rule in self.rules:
+            names.extend(c.metric for c in rule.conditions if c.metric not in names)
+        return names
+
+    def _values(self, angles: Dict[str, float], fields: Sequence[str]) -> Dict[str, float]:
+        """取出模板占位符对应的数值（缺失时使用默认值）"""
+        return {field: angles.get(field, self.defaults.get(field, 0)) for field in fields}
+
+    def reason(self, score: int, angles: Dict[str, float]) -> List[str]:
+        """生成评分对应的原因描述列表（规则集未定义原因时为空列表）"""
+        if not self.reasons:
+            return []
+        template = self.reasons.get(score)
+        if template is None:
+            lower = [s for s in self.reasons if s <= score]
+            template = self.reasons[max(lower) if lower else min(self.reasons)]
+        return [template.format(**self._values(angles, template_fields(template)))]
+
+    def message(self, rule: Rule, angles: Dict[str, float]) -> str:
+        """生成规则的代偿描述"""
+        return rule.message.format(**self._values(angles, template_fields(rule.message)))
+
+    def evaluate(self, angles: Dict[str, float]) -> Tuple[int, List[str], List[str]]:
+        """
+        对单帧角度求值
+
+        Args:
+            angles: 关节角度字典
+
+        Returns:
+            (评分, 原因列表, 代偿列表)
+        """
+        score = self.base_score
+        compensations = []
+        for rule in self.rules:
+            if any(OPERATORS[c.op][0](angles.get(c.metric, c.default), c.threshold) for c in rule.conditions):
+                score = min(score, rule.cap)
+                if rule.message:
+                    compensations.append(self.message(rule, angles))
+        return score, self.reason(score, angles), compensations
+
+    def _compile(self, names: Tuple[str, ...]):
+        """按列顺序预编译条件：列索引、默认值、阈值和按运算分组的条件位置"""
+        compiled = self._compiled.get(names)
+        if compiled is not None:
+            return compiled
+        index = {name: i for i, name in enumerate(names)}
+        conditions = [c for rule in self.rules for c in rule.conditions]
+        columns = np.array([index.get(c.metric, -1) for c in conditions], dtype=np.int64)
+        defaults = np.array([c.default for c in conditions], dtype=np.float64)
+        thresholds = np.array([c.threshold for c in conditions], dtype=np.float64)
+        groups = {}
+        for position, condition in enumerate(conditions):
+            groups.setdefault(condition.op, []).append(position)
+        groups = {op: np.array(positions) for op, positions in groups.items()}
+        # reduceat 的分段起点：每条规则第一个条件的位置
+        starts = np.cumsum([0] + [len(rule.conditions) for rule in self.rules[:-1]])
+        caps = np.array([rule.cap for rule in self.rules], dtype=np.int64)
+        compiled = (columns, defaults, thresholds, groups, starts, caps)
+        self._compiled[names] = compiled
+        return compiled
+
+    def evaluate_matrix(self, names: Sequence[str], matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        对多帧数据向量化求值
+
+        Args:
+            names: 指标名称列表（矩阵的列）
+            matrix: 形状为 (帧数, 指标数) 的数组，NaN表示该帧缺失此指标（使用条件的默认值）
+
+        Returns:
+            (评分数组 (帧数,), 规则触发矩阵 (帧数, 规则数) 的布尔数组)
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        frames = len(matrix)
+        if not self.rules:
+            return np.full(frames, self.base_score, dtype=np.int64), np.zeros((frames, 0), dtype=bool)
+
+        columns, defaults, thresholds, groups, starts, caps = self._compile(tuple(names))
+        padded = np.concatenate([matrix, np.full((frames, 1), np.nan)], axis=1)  # -1 列表示不存在的指标
+        values = padded[:, columns]
+        values = np.where(np.isnan(values), defaults, values)
+
+        satisfied = np.empty(values.shape, dtype=bool)
+        for op, positions in groups.items():
+            satisfied[:, positions] = OPERATORS[op][1](values[:, positions], thresholds[positions])
+        triggered = np.logical_or.reduceat(satisfied, starts, axis=1)
+        scores = np.where(triggered, caps, self.base_score).min(axis=1)
+        return np.minimum(scores, self.base_score), triggered
+
+    def row_angles(self, names: Sequence[str], row: Sequence[float]) -> Dict[str, float]:
+        """把矩阵中的一行还原为角度字典（跳过NaN）"""
+        return {name: value for name, value in zip(names, row) if value == value}
@@ -7,6 +7,7 @@
 import numpy as np
 from typing import Dict, Any, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class ShoulderMobilityAssessor(BaseAssessor):
@@ -19,6 +20,26 @@ class ShoulderMobilityAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式：取动作中达到的最大活动范围
+    REP_REDUCTIONS = {
+        'shoulder_elevation': 'max',
+        'shoulder_abduction': 'max',
+        'shoulder_internal_rotation': 'max',
+        'shoulder_extension': 'max',
+    }
+    
+    # 评分规则：任一条件满足时评分不超过对应上限，代偿描述按规则顺序记录
+    RULES = RuleSet([
+        Rule((Condition('shoulder_elevation', '<', 160),), 2, "肩部抬升不足"),
+        Rule((Condition('shoulder_abduction', '<', 160),), 2, "肩部外展不足"),
+        Rule((Condition('shoulder_internal_rotation', '<', 60),), 2, "肩部内旋不足"),
+        Rule((Condition('shoulder_extension', '<', 50),), 2, "肩部后伸不足"),
+    ], reasons={
+        3: "肩部灵活性动作完成良好，各关节角度符合标准",
+        2: "肩部灵活性动作基本完成，但存在轻微代偿",
+        1: "肩部灵活性动作完成困难，存在明显代偿",
+    })
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -38,46 +59,4 @@ class ShoulderMobilityAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
-        
-        # 评估肩部抬升角度
-        if angles.get('shoulder_elevation', 0) < 160:
-            score = min(score, 2)
-            compensations.append("肩部抬升不足")
-            
-        # 评估肩部外展角度
-        if angles.get('shoulder_abduction', 0) < 160:
-            score = min(score, 2)
-            compensations.append("肩部外展不足")
-            
-        # 评估肩部内旋角度
-        if angles.get('shoulder_internal_rotation', 0) < 60:
-            score = min(score, 2)
-            compensations.append("肩部内旋不足")
-            
-        # 评估肩部后伸角度
-        if angles.get('shoulder_extension', 0) < 50:
-            score = min(score, 2)
-            compensations.append("肩部后伸不足")
-            
-        if score == 3:
-            reasons.append("肩部灵活性动作完成良好，各关节角度符合标准")
-        elif score == 2:
-            reasons.append("肩部灵活性动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("肩部灵活性动作完成困难，存在明显代偿")
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
-        
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
-        
-        return result
\ No newline at end of file
+        return self._assess_rules(self.RULES, angles)
@@ -5,8 +5,9 @@
 """
 
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class SquatAssessor(BaseAssessor):
@@ -19,6 +20,78 @@ class SquatAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式：关节角度取最大屈曲（最小值），代偿指标取最大值
+    REP_REDUCTIONS = {
+        'left_hip_angle': 'min',
+        'right_hip_angle': 'min',
+        'left_knee_angle': 'min',
+        'right_knee_angle': 'min',
+        'hip_angle': 'min',
+        'knee_angle': 'min',
+        'ankle_angle': 'min',
+        'side_hip_angle': 'min',
+        'side_knee_angle': 'min',
+        'knee_valgus': 'max',
+        'trunk_angle': 'max',
+        'heel_lift': 'max',
+        'trunk_rotation': 'absmax',
+        'foot_shoulder_ratio': 'mean',
+    }
+    
+    REASONS = {
+        3: "深蹲动作完成良好，各关节角度符合标准",
+        2: "深蹲动作基本完成，但存在轻微代偿",
+        1: "深蹲动作完成困难，存在明显代偿",
+    }
+    
+    # 各视角的评分规则：任一条件满足时评分不超过对应上限，代偿描述按规则顺序记录
+    VIEW_RULES = {
+        'front': RuleSet([
+            Rule((Condition('left_hip_angle', '<', 120), Condition('right_hip_angle', '<', 120)), 2, "髋关节屈曲不足"),
+            Rule((Condition('left_knee_angle', '<', 90), Condition('right_knee_angle', '<', 90)), 2, "膝关节屈曲不足"),
+            Rule((Condition('foot_shoulder_ratio', '<', 80, 100), Condition('foot_shoulder_ratio', '>', 120, 100)),
+                 2, "双脚间距与肩宽不匹配"),
+            Rule((Condition('knee_valgus', '>', 15),), 1, "膝外翻明显"),
+        ], REASONS),
+        'side': RuleSet([
+            Rule((Condition('trunk_angle', '>', 30),), 2, "躯干前倾过度"),
+            Rule((Condition('hip_angle', '<', 120),), 2, "髋关节屈曲不足"),
+            Rule((Condition('knee_angle', '<', 90),), 2, "膝关节屈曲不足"),
+            Rule((Condition('ankle_angle', '<', 70),), 2, "踝关节背屈不足"),
+            Rule((Condition('heel_lift', '>', 5),), 1, "脚跟离地明显"),
+        ], REASONS),
+        '45': RuleSet([
+            Rule((Condition('side_hip_angle', '<', 110),), 2, "髋关节屈曲不足"),
+            Rule((Condition('side_knee_angle', '<', 90),), 2, "膝关节屈曲不足"),
+            Rule((Condition('trunk_rotation', '>', 15),), 1, "躯干旋转过度"),
+        ], REASONS),
+    }
+    # 逐次评估的规则：关节角度已归约为一次动作中的最小值（最大屈曲），
+    # 屈曲不足表示最小值仍高于阈值，其余规则与逐帧评估相同
+    REP_VIEW_RULES = {
+        'front': RuleSet([
+            Rule((Condition('left_hip_angle', '>', 120), Condition('right_hip_angle', '>', 120)), 2, "髋关节屈曲不足"),
+            Rule((Condition('left_knee_angle', '>', 90), Condition('right_knee_angle', '>', 90)), 2, "膝关节屈曲不足"),
+            Rule((Condition('foot_shoulder_ratio', '<', 80, 100), Condition('foot_shoulder_ratio', '>', 120, 100)),
+                 2, "双脚间距与肩宽不匹配"),
+            Rule((Condition('knee_valgus', '>', 15),), 1, "膝外翻明显"),
+        ], REASONS),
+        'side': RuleSet([
+            Rule((Condition('trunk_angle', '>', 30),), 2, "躯干前倾过度"),
+            Rule((Condition('hip_angle', '>', 120),), 2, "髋关节屈曲不足"),
+            Rule((Condition('knee_angle', '>', 90),), 2, "膝关节屈曲不足"),
+            Rule((Condition('ankle_angle', '>', 70),), 2, "踝关节背屈不足"),
+            Rule((Condition('heel_lift', '>', 5),), 1, "脚跟离地明显"),
+        ], REASONS),
+        '45': RuleSet([
+            Rule((Condition('side_hip_angle', '>', 110),), 2, "髋关节屈曲不足"),
+            Rule((Condition('side_knee_angle', '>', 90),), 2, "膝关节屈曲不足"),
+            Rule((Condition('trunk_rotation', '>', 15),), 1, "躯干旋转过度"),
+        ], REASONS),
+    }
+    # 无法判断视角时不扣分，也不给出原因
+    NO_VIEW_RULES = RuleSet([], {})
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -38,135 +111,45 @@ class SquatAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
+        return self._assess_rules(self._select_rules(angles), angles)
         
-        # 根据不同视角进行评估
+    def _select_rules(self, angles: Dict[str, float], view_rules: Optional[Dict[str, RuleSet]] = None) -> RuleSet:
+        """根据已有的角度判断视角并选择规则集（默认为逐帧规则）"""
+        view_rules = self.VIEW_RULES if view_rules is None else view_rules
         if 'left_hip_angle' in angles and 'right_hip_angle' in angles:
-            # 正面视角评估
-            score, reasons, compensations = self._assess_front_view(angles)
+            return view_rules['front']
         elif 'trunk_angle' in angles:
-            # 侧面视角评估
-            score, reasons, compensations = self._assess_side_view(angles)
+            return view_rules['side']
         elif 'trunk_rotation' in angles:
-            # 45度角视角评估
-            score, reasons, compensations = self._assess_45_view(angles)
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
+            return view_rules['45']
+        return self.NO_VIEW_RULES
         
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
+    def rep_rule_set(self, reduced: Dict[str, float]) -> RuleSet:
+        """按视角选择逐次评估的规则集"""
+        return self._select_rules(reduced, self.REP_VIEW_RULES)
         
-        return result
+    def matrix_rule_sets(self, names: Sequence[str], matrix: np.ndarray) -> List[Tuple[RuleSet, np.ndarray]]:
+        """按与 assess 相同的视角判断为每帧选择规则集（缺失用NaN表示）"""
+        present = {name: ~np.isnan(matrix[:, column]) for column, name in enumerate(names)}
+        missing = np.zeros(len(matrix), dtype=bool)
+        front = present.get('left_hip_angle', missing) & present.get('right_hip_angle', missing)
+        side = ~front & present.get('trunk_angle', missing)
+        view_45 = ~front & ~side & present.get('trunk_rotation', missing)
+        return [
+            (self.VIEW_RULES['front'], front),
+            (self.VIEW_RULES['side'], side),
+            (self.VIEW_RULES['45'], view_45),
+            (self.NO_VIEW_RULES, ~(front | side | view_45)),
+        ]
         
     def _assess_front_view(self, angles: Dict[str, float]) -> Tuple[int, list, list]:
         """正面视角评估"""
-        score = 3
-        reasons = []
-        compensations = []
-        
-        # 评估髋关节角度
-        if angles.get('left_hip_angle', 0) < 120 or angles.get('right_hip_angle', 0) < 120:
-            score = min(score, 2)
-            compensations.append("髋关节屈曲不足")
-            
-        # 评估膝关节角度
-        if angles.get('left_knee_angle', 0) < 90 or angles.get('right_knee_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("膝关节屈曲不足")
-            
-        # 评估双脚与肩宽比例
-        if angles.get('foot_shoulder_ratio', 100) < 80 or angles.get('foot_shoulder_ratio', 100) > 120:
-            score = min(score, 2)
-            compensations.append("双脚间距与肩宽不匹配")
-            
-        # 评估膝外翻
-        if angles.get('knee_valgus', 0) > 15:
-            score = min(score, 1)
-            compensations.append("膝外翻明显")
-            
-        if score == 3:
-            reasons.append("深蹲动作完成良好，各关节角度符合标准")
-        elif score == 2:
-            reasons.append("深蹲动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("深蹲动作完成困难，存在明显代偿")
-            
-        return score, reasons, compensations
+        return self.VIEW_RULES['front'].evaluate(angles)
         
     def _assess_side_view(self, angles: Dict[str, float]) -> Tuple[int, list, list]:
         """侧面视角评估"""
-        score = 3
-        reasons = []
-        compensations = []
-        
-        # 评估躯干倾斜角度
-        if angles.get('trunk_angle', 0) > 30:
-            score = min(score, 2)
-            compensations.append("躯干前倾过度")
-            
-        # 评估髋关节角度
-        if angles.get('hip_angle', 0) < 120:
-            score = min(score, 2)
-            compensations.append("髋关节屈曲不足")
-            
-        # 评估膝关节角度
-        if angles.get('knee_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("膝关节屈曲不足")
-            
-        # 评估踝关节角度
-        if angles.get('ankle_angle', 0) < 70:
-            score = min(score, 2)
-            compensations.append("踝关节背屈不足")
-            
-        # 评估脚跟离地
-        if angles.get('heel_lift', 0) > 5:
-            score = min(score, 1)
-            compensations.append("脚跟离地明显")
-            
-        if score == 3:
-            reasons.append("深蹲动作完成良好，各关节角度符合标准")
-        elif score == 2:
-            reasons.append("深蹲动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("深蹲动作完成困难，存在明显代偿")
-            
-        return score, reasons, compensations
+        return self.VIEW_RULES['side'].evaluate(angles)
         
     def _assess_45_view(self, angles: Dict[str, float]) -> Tuple[int, list, list]:
         """45度角视角评估"""
-        score = 3
-        reasons = []
-        compensations = []
-        
-        # 评估侧面髋关节角度
-        if angles.get('side_hip_angle', 0) < 110:
-            score = min(score, 2)
-            compensations.append("髋关节屈曲不足")
-            
-        # 评估侧面膝关节角度
-        if angles.get('side_knee_angle', 0) < 90:
-            score = min(score, 2)
-            compensations.append("膝关节屈曲不足")
-            
-        # 评估躯干旋转
-        if angles.get('trunk_rotation', 0) > 15:
-            score = min(score, 1)
-            compensations.append("躯干旋转过度")
-            
-        if score == 3:
-            reasons.append("深蹲动作完成良好，各关节角度符合标准")
-        elif score == 2:
-            reasons.append("深蹲动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("深蹲动作完成困难，存在明显代偿")
-            
-        return score, reasons, compensations
\ No newline at end of file
+        return self.VIEW_RULES['45'].evaluate(angles)
@@ -7,6 +7,7 @@
 import numpy as np
 from typing import Dict, Any, Tuple
 from .base_assessor import BaseAssessor
+from .rules import Condition, Rule, RuleSet
 
 
 class TrunkPushupAssessor(BaseAssessor):
@@ -19,6 +20,28 @@ class TrunkPushupAssessor(BaseAssessor):
     - 1分：动作完成困难，有明显代偿
     """
     
+    # 逐次评估时各指标的归约方式：稳定性指标取最差值
+    REP_REDUCTIONS = {
+        'elbow_flexion': 'max',
+        'trunk_stability': 'min',
+        'shoulder_stability': 'min',
+        'core_control': 'min',
+        'body_alignment': 'min',
+    }
+    
+    # 评分规则：任一条件满足时评分不超过对应上限，代偿描述按规则顺序记录
+    RULES = RuleSet([
+        Rule((Condition('trunk_stability', '<', 90, 100),), 2, "躯干稳定性不足"),
+        Rule((Condition('elbow_flexion', '<', 80),), 2, "肘关节屈曲不足"),
+        Rule((Condition('shoulder_stability', '<', 90, 100),), 2, "肩部稳定性不足"),
+        Rule((Condition('core_control', '<', 90, 100),), 2, "核心控制能力不足"),
+        Rule((Condition('body_alignment', '<', 90, 100),), 1, "身体未保持直线"),
+    ], reasons={
+        3: "躯干稳定俯卧撑动作完成良好，躯干控制稳定",
+        2: "躯干稳定俯卧撑动作基本完成，但存在轻微代偿",
+        1: "躯干稳定俯卧撑动作完成困难，存在明显代偿",
+    })
+    
     def __init__(self):
         """初始化评估器"""
         super().__init__()
@@ -38,51 +61,4 @@ class TrunkPushupAssessor(BaseAssessor):
         Returns:
             包含评分结果和反馈的字典
         """
-        score = 3  # 默认评分
-        reasons = []
-        compensations = []
-        similarity = 100.0
-        
-        # 评估躯干稳定性
-        if angles.get('trunk_stability', 100) < 90:
-            score = min(score, 2)
-            compensations.append("躯干稳定性不足")
-            
-        # 评估肘关节屈曲角度
-        if angles.get('elbow_flexion', 0) < 80:
-            score = min(score, 2)
-            compensations.append("肘关节屈曲不足")
-            
-        # 评估肩部稳定性
-        if angles.get('shoulder_stability', 100) < 90:
-            score = min(score, 2)
-            compensations.append("肩部稳定性不足")
-            
-        # 评估核心控制
-        if angles.get('core_control', 100) < 90:
-            score = min(score, 2)
-            compensations.append("核心控制能力不足")
-            
-        # 评估身体直线度
-        if angles.get('body_alignment', 100) < 90:
-            score = min(score, 1)
-            compensations.append("身体未保持直线")
-            
-        if score == 3:
-            reasons.append("躯干稳定俯卧撑动作完成良好，躯干控制稳定")
-        elif score == 2:
-            reasons.append("躯干稳定俯卧撑动作基本完成，但存在轻微代偿")
-        else:
-            reasons.append("躯干稳定俯卧撑动作完成困难，存在明显代偿")
-            
-        result = {
-            'score': score,
-            'reasons': reasons,
-            'compensations': compensations,
-            'similarity': similarity
-        }
-        
-        # 保存评估结果到历史记录
-        self.assessment_history.append(result)
-        
-        return result
\ No newline at end of file
+        return self._assess_rules(self.RULES, angles)
@@ -0,0 +1,312 @@
+"""
+采集/推理流水线模块
+
+该模块把实时评估拆分为三个阶段，避免在Kivy时钟回调（UI线程）中
+同时执行摄像头读取、MediaPipe推理和纹理上传：
+
+- 采集线程：循环调用 capture.read()，把原始帧放入采集队列
+- 推理线程：从采集队列取帧，调用处理函数（如 PoseEstimator.process_frame）
+- UI阶段：由界面定时器调用 poll() 取出最新结果，只负责上传纹理
+
+阶段之间使用有界队列连接，队满时丢弃最旧的帧，保证界面始终显示最新画面。
+每个阶段都记录延迟计数器，便于在低端设备上定位瓶颈。
+
+使用示例:
+    pipeline = FramePipeline(cv2.VideoCapture(0), estimator.process_frame)
+    pipeline.start()
+    packet = pipeline.poll()   # 在UI线程中调用
+    pipeline.stop()
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger('FramePipeline')
+
+
+class DropOldestQueue:
+    """
+    有界队列
+
+    队列已满时丢弃最旧的元素而不是阻塞生产者，适合实时视频帧传递。
+    """
+
+    def __init__(self, maxsize: int = 2):
+        """
+        初始化队列
+
+        Args:
+            maxsize: 队列最大长度
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize必须大于0")
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item: Any) -> None:
+        """放入元素，队满时丢弃最旧的元素"""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        取出最旧的元素
+
+        Args:
+            timeout: 等待超时时间（秒），None表示一直等待
+
+        Returns:
+            队首元素，超时返回None
+        """
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_latest(self) -> Any:
+        """取出最新的元素并清空队列，队列为空时返回None"""
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def clear(self) -> None:
+        """清空队列"""
+        with self._cond:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """单个流水线阶段的延迟计数器"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """重置计数器"""
+        with self._lock:
+            self.count = 0
+            self.total = 0.0
+            self.last = 0.0
+            self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """记录一次耗时（秒）"""
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        获取计数器快照
+
+        Returns:
+            包含次数、最近/平均/最大耗时（毫秒）的字典
+        """
+        with self._lock:
+            avg = self.total / self.count if self.count else 0.0
+            return {
+                'count': self.count,
+                'last_ms': self.last * 1000,
+                'avg_ms': avg * 1000,
+                'max_ms': self.max * 1000
+            }
+
+
+class FramePacket:
+    """在流水线各阶段之间传递的帧数据"""
+
+    __slots__ = ('frame_id', 'capture_time', 'frame', 'image', 'angles', 'landmarks', 'reps')
+
+    def __init__(self, frame_id: int, capture_time: float, frame: Any):
+        self.frame_id = frame_id
+        self.capture_time = capture_time
+        self.frame = frame
+        self.image = None
+        self.angles = None
+        self.landmarks = None
+        self.reps = None
+
+
+class FramePipeline:
+    """
+    三阶段采集/推理流水线
+
+    采集和推理在后台线程中运行，UI阶段通过 poll() 获取最新的处理结果。
+    """
+
+    def __init__(self, capture: Any,
+                 processor: Callable[[Any], Any],
+                 queue_size: int = 2,
+                 read_retry_delay: float = 0.01):
+        """
+        初始化流水线
+
+        Args:
+            capture: 提供 read() -> (ret, frame) 的视频源，如 cv2.VideoCapture
+            processor: 帧处理函数，接收原始帧，返回 (处理后的图像, 角度字典)，
+                       或 (处理后的图像, 角度字典, 关键点数组) 供UI阶段绘制骨架叠加层，
+                       或再加上重复次数信息 (..., 关键点数组, 各次评分) 供UI阶段显示
+            queue_size: 各阶段之间队列的最大长度
+            read_retry_delay: 读取失败时的重试间隔（秒）
+        """
+        self.capture = capture
+        self.processor = processor
+        self.read_retry_delay = read_retry_delay
+
+        self.capture_queue = DropOldestQueue(queue_size)
+        self.result_queue = DropOldestQueue(queue_size)
+
+        # 推理线程调用处理函数时持有该锁，UI线程修改处理器状态（如切换视图）前应先获取
+        self.processing_lock = threading.Lock()
+
+        self.capture_stats = StageStats('capture')
+        self.inference_stats = StageStats('inference')
+        self.ui_stats = StageStats('ui')
+        self.latency_stats = StageStats('end_to_end')
+
+        self._running = threading.Event()
+        self._threads = []
+        self._frame_counter = 0
+
+    @property
+    def is_running(self) -> bool:
+        """流水线是否正在运行"""
+        return self._running.is_set()
+
+    def start(self) -> None:
+        """启动采集线程和推理线程"""
+        if self.is_running:
+            return
+
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='FrameCapture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='FrameInference', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("采集/推理流水线已启动")
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        停止流水线并等待后台线程退出
+
+        Args:
+            timeout: 每个线程的最长等待时间（秒）
+        """
+        if not self.is_running:
+            return
+
+        self._running.clear()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.capture_queue.clear()
+        self.result_queue.clear()
+        logger.info(f"采集/推理流水线已停止: {self.stats()}")
+
+    def poll(self) -> Optional[FramePacket]:
+        """
+        UI阶段获取最新处理结果（非阻塞）
+
+        Returns:
+            最新的帧数据包，没有新结果时返回None
+        """
+        return self.result_queue.get_latest()
+
+    def record_ui_latency(self, packet: FramePacket, seconds: float) -> None:
+        """
+        记录UI阶段耗时以及端到端延迟
+
+        Args:
+            packet: 已显示的帧数据包
+            seconds: 纹理上传耗时（秒）
+        """
+        self.ui_stats.record(seconds)
+        self.latency_stats.record(time.perf_counter() - packet.capture_time)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取各阶段的延迟计数器
+
+        Returns:
+            以阶段名为键的计数器快照字典，包含各队列的丢帧数
+        """
+        capture = self.capture_stats.snapshot()
+        capture['dropped'] = self.capture_queue.dropped
+        inference = self.inference_stats.snapshot()
+        inference['dropped'] = self.result_queue.dropped
+        return {
+            'capture': capture,
+            'inference': inference,
+            'ui': self.ui_stats.snapshot(),
+            'end_to_end': self.latency_stats.snapshot()
+        }
+
+    def _capture_loop(self) -> None:
+        """采集线程：读取摄像头帧并放入采集队列"""
+        while self._running.is_set():
+            start = time.perf_counter()
+            try:
+                ret, frame = self.capture.read()
+            except Exception as e:
+                logger.error(f"读取视频帧时出错: {str(e)}")
+                ret, frame = False, None
+
+            if not ret:
+                time.sleep(self.read_retry_delay)
+                continue
+
+            now = time.perf_counter()
+            self.capture_stats.record(now - start)
+            self._frame_counter += 1
+            self.capture_queue.put(FramePacket(self._frame_counter, now, frame))
+
+    def _inference_loop(self) -> None:
+        """推理线程：处理采集队列中的帧并放入结果队列"""
+        while self._running.is_set():
+            packet = self.capture_queue.get(timeout=0.1)
+            if packet is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                with self.processing_lock:
+                    result = self.processor(packet.frame)
+                packet.image, packet.angles = result[0], result[1]
+                if len(result) > 2:
+                    packet.landmarks = result[2]
+                if len(result) > 3:
+                    packet.reps = result[3]
+            except Exception as e:
+                logger.error(f"处理视频帧时出错: {str(e)}")
+                continue
+            self.inference_stats.record(time.perf_counter() - start)
+
+            # 原始帧不再需要，释放引用
+            packet.frame = None
+            self.result_queue.put(packet)
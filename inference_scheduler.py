@@ -0,0 +1,277 @@
+"""
+自适应推理调度模块
+
+原来每一帧都把完整的摄像头画面送入MediaPipe，低端Android设备上推理速度跟不上摄像头帧率，
+采集队列不断丢帧，角度序列时断时续。InferenceScheduler 在推理前后做三件事:
+
+- 缩小输入: 裁剪后的图像长边超过 inference_size 时先缩小再推理（归一化坐标不受缩放影响）
+- ROI跟踪: 用上一帧关键点的包围盒（加边距）裁剪画面，人物只占画面一部分时输入更小；
+  人物仍在当前裁剪框内时不移动裁剪框，避免MediaPipe内部跟踪因输入频繁变化而失效
+- 跳帧: 推理耗时的滑动平均超过单帧预算时，每 skip_interval 帧只推理一帧，
+  跳过的帧用最近两次推理结果线性外推关键点，角度和重复次数计数照常更新
+
+关键点检测失败时清除ROI和外推历史，下一帧回到完整画面推理。
+
+使用示例:
+    scheduler = InferenceScheduler(latency_budget=1 / 30)
+    estimator = PoseEstimator(scheduler=scheduler, profile='lite')  # 推理输入尺寸由性能档位设置
+    image, angles = estimator.process_frame(frame)
+    print(scheduler.stats())
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+class InferenceWindow:
+    """一次推理的输入区域：原始帧中的裁剪框（像素）和缩放比例"""
+
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'frame_width', 'frame_height', 'scale')
+
+    def __init__(self, x0: int, y0: int, x1: int, y1: int,
+                 frame_width: int, frame_height: int, scale: float = 1.0):
+        self.x0 = x0
+        self.y0 = y0
+        self.x1 = x1
+        self.y1 = y1
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.scale = scale
+
+    @property
+    def is_full_frame(self) -> bool:
+        """是否为完整画面（不裁剪）"""
+        return (self.x0 == 0 and self.y0 == 0 and
+                self.x1 == self.frame_width and self.y1 == self.frame_height)
+
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """推理输入图像的 (宽, 高)"""
+        return (max(1, round((self.x1 - self.x0) * self.scale)),
+                max(1, round((self.y1 - self.y0) * self.scale)))
+
+    def to_frame(self, points: np.ndarray) -> np.ndarray:
+        """
+        把相对于推理输入的归一化坐标换算为相对于原始帧的归一化坐标
+
+        Args:
+            points: (N, 3) 或 (N, 4) 数组，前三列为 x, y, z（其余列原样保留）
+
+        Returns:
+            换算后的新数组
+        """
+        points = np.array(points, dtype=float)
+        crop_width = self.x1 - self.x0
+        crop_height = self.y1 - self.y0
+        points[:, 0] = (self.x0 + points[:, 0] * crop_width) / self.frame_width
+        points[:, 1] = (self.y0 + points[:, 1] * crop_height) / self.frame_height
+        # MediaPipe的z与x使用相同的尺度
+        points[:, 2] = points[:, 2] * crop_width / self.frame_width
+        return points
+
+
+class InferenceScheduler:
+    """缩小输入、ROI裁剪和跳帧的推理调度器"""
+
+    def __init__(self, inference_size: Optional[int] = 320, roi: bool = True,
+                 roi_margin: float = 0.25, min_roi_fraction: float = 0.4,
+                 latency_budget: Optional[float] = 1 / 30, max_skip_interval: int = 3,
+                 smoothing: float = 0.2, recovery_ratio: float = 0.8):
+        """
+        初始化调度器
+
+        Args:
+            inference_size: 推理输入长边的最大像素数，None表示不缩小
+            roi: 是否按上一帧关键点裁剪画面
+            roi_margin: 裁剪框相对关键点包围盒的边距（按包围盒长边的比例）
+            min_roi_fraction: 裁剪框在每个方向上至少占画面的比例
+            latency_budget: 单帧推理耗时预算（秒），None表示从不跳帧
+            max_skip_interval: 跳帧时最多每几帧推理一帧
+            smoothing: 推理耗时滑动平均的平滑系数（0~1，越大越灵敏）
+            recovery_ratio: 耗时低于预算的该比例时才减少跳帧，避免在临界值附近来回切换
+        """
+        if inference_size is not None and inference_size < 32:
+            raise ValueError("inference_size不能小于32")
+        if max_skip_interval < 1:
+            raise ValueError("max_skip_interval必须大于0")
+        self.inference_size = inference_size
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.min_roi_fraction = min_roi_fraction
+        self.latency_budget = latency_budget
+        self.max_skip_interval = max_skip_interval
+        self.smoothing = smoothing
+        self.recovery_ratio = recovery_ratio
+
+        self.latency = None  # 推理耗时的滑动平均（秒）
+        self.skip_interval = 1  # 每几帧推理一帧，1表示不跳帧
+        self.inferred = 0
+        self.skipped = 0
+        self.cropped = 0  # 使用ROI裁剪推理的帧数
+        self._roi = None  # 归一化裁剪框 (x0, y0, x1, y1)
+        self._history = deque(maxlen=2)  # 最近两次推理的 (时间, 关键点)
+        self._since_inference = 0
+
+    def reset(self) -> None:
+        """清除ROI、外推历史和跳帧状态（切换动作或视图时调用）"""
+        self._roi = None
+        self._history.clear()
+        self._since_inference = 0
+        self.latency = None
+        self.skip_interval = 1
+
+    def should_infer(self) -> bool:
+        """
+        判断当前帧是否需要推理（每帧调用一次）
+
+        Returns:
+            bool: False表示跳过推理，使用 predict() 的外推结果
+        """
+        if self.skip_interval > 1 and self._history and self._since_inference + 1 < self.skip_interval:
+            self._since_inference += 1
+            self.skipped += 1
+            return False
+        self._since_inference = 0
+        self.inferred += 1
+        return True
+
+    def plan(self, frame_width: int, frame_height: int) -> InferenceWindow:
+        """计算当前帧的推理区域"""
+        x0, y0, x1, y1 = 0, 0, frame_width, frame_height
+        if self.roi and self._roi is not None:
+            rx0, ry0, rx1, ry1 = self._roi
+            x0 = int(math.floor(rx0 * frame_width))
+            y0 = int(math.floor(ry0 * frame_height))
+            x1 = int(math.ceil(rx1 * frame_width))
+            y1 = int(math.ceil(ry1 * frame_height))
+        scale = 1.0
+        long_side = max(x1 - x0, y1 - y0)
+        if self.inference_size and long_side > self.inference_size:
+            scale = self.inference_size / long_side
+        return InferenceWindow(x0, y0, x1, y1, frame_width, frame_height, scale)
+
+    def prepare(self, frame: np.ndarray) -> Tuple[np.ndarray, InferenceWindow]:
+        """
+        裁剪并缩小一帧图像
+
+        Args:
+            frame: 原始图像
+
+        Returns:
+            (推理输入图像, 推理区域)；不裁剪也不缩小时返回原图像
+        """
+        window = self.plan(frame.shape[1], frame.shape[0])
+        image = frame
+        if not window.is_full_frame:
+            image = frame[window.y0:window.y1, window.x0:window.x1]
+            self.cropped += 1
+        if window.scale < 1.0:
+            image = cv2.resize(image, window.input_size, interpolation=cv2.INTER_AREA)
+        return image, window
+
+    def record_latency(self, seconds: float) -> None:
+        """记录一次推理耗时并调整跳帧间隔"""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.smoothing * (seconds - self.latency)
+        if not self.latency_budget:
+            return
+        required = self.latency / self.latency_budget
+        if required > self.skip_interval:
+            self.skip_interval = min(self.max_skip_interval, math.ceil(required))
+        elif self.skip_interval > 1 and required < (self.skip_interval - 1) * self.recovery_ratio:
+            self.skip_interval = max(1, math.ceil(required))
+
+    def update(self, points: Optional[np.ndarray], timestamp: float) -> None:
+        """
+        记录一次推理结果
+
+        Args:
+            points: 相对于原始帧的归一化关键点 (N, 3+)，未检测到人体时为None
+            timestamp: 帧时间（秒）
+        """
+        if points is None or not np.isfinite(points[:, :2]).any():
+            self._roi = None
+            self._history.clear()
+            return
+        self._history.append((timestamp, np.array(points, dtype=float)))
+        if self.roi:
+            self._update_roi(points[:, :2])
+
+    def _update_roi(self, xy: np.ndarray) -> None:
+        """按关键点包围盒更新裁剪框，人物仍在当前裁剪框内时保持不变"""
+        xy = xy[np.isfinite(xy).all(axis=1)]
+        low = np.clip(xy.min(axis=0), 0.0, 1.0)
+        high = np.clip(xy.max(axis=0), 0.0, 1.0)
+        if self._roi is not None:
+            inner = self.roi_margin * 0.5 * float((high - low).max())
+            rx0, ry0, rx1, ry1 = self._roi
+            fits = (low[0] - inner >= rx0 or rx0 <= 0.0) and (low[1] - inner >= ry0 or ry0 <= 0.0) and \
+                   (high[0] + inner <= rx1 or rx1 >= 1.0) and (high[1] + inner <= ry1 or ry1 >= 1.0)
+        else:
+            fits = False
+
+        pad = self.roi_margin * float((high - low).max())
+        low = low - pad
+        high = high + pad
+        # 每个方向至少占画面 min_roi_fraction，围绕中心扩展
+        center = (low + high) / 2
+        half = np.maximum((high - low) / 2, self.min_roi_fraction / 2)
+        low = np.clip(center - half, 0.0, 1.0)
+        high = np.clip(center + half, 0.0, 1.0)
+        area = float((high - low).prod())
+        # 人物仍在框内且框没有比需要的大太多（如人物走远）时保持不变
+        if fits and (rx1 - rx0) * (ry1 - ry0) <= 2 * area:
+            return
+        if area > 0.9:
+            self._roi = None  # 裁剪框接近整个画面时直接使用完整画面
+        else:
+            self._roi = (float(low[0]), float(low[1]), float(high[0]), float(high[1]))
+
+    def predict(self, timestamp: float) -> Optional[np.ndarray]:
+        """
+        外推跳过帧的关键点
+
+        用最近两次推理结果按时间线性外推坐标，外推距离不超过两次推理的间隔；
+        坐标以外的列（如可见度）沿用最近一次推理的结果。
+
+        Returns:
+            与 update 传入的列数相同的 (N, 3+) 数组，没有推理历史时为None
+        """
+        if not self._history:
+            return None
+        last_time, last_points = self._history[-1]
+        if len(self._history) < 2:
+            return last_points.copy()
+        previous_time, previous_points = self._history[0]
+        interval = last_time - previous_time
+        if interval <= 0:
+            return last_points.copy()
+        factor = min(max((timestamp - last_time) / interval, 0.0), 1.0)
+        predicted = last_points.copy()
+        predicted[:, :3] += (last_points[:, :3] - previous_points[:, :3]) * factor
+        return predicted
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取调度统计
+
+        Returns:
+            dict: inferred, skipped, cropped, skip_interval, latency_ms, roi
+        """
+        return {
+            'inferred': self.inferred,
+            'skipped': self.skipped,
+            'cropped': self.cropped,
+            'skip_interval': self.skip_interval,
+            'latency_ms': self.latency * 1000 if self.latency is not None else None,
+            'roi': self._roi
+        }
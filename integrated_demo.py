@@ -135,23 +135,26 @@ def perform_fms_assessment(angles_history, filtered_frames):
     # 创建评估器
     assessor = SquatAssessor()
     
-    # 使用最后一帧数据进行评估
+    # 把整段数据作为一次动作窗口评估，各指标取该次动作内的极值，而不是只看最后一帧
     if angles_history and filtered_frames:
-        final_angles = angles_history[-1]
-        final_landmarks = filtered_frames[-1]
-        
-        # 添加一些额外的角度参数用于评估
-        extended_angles = final_angles.copy()
-        extended_angles['knee_valgus'] = abs(final_angles['left_knee_angle'] - final_angles['right_knee_angle'])
+        names = list(angles_history[0].keys()) + ['knee_valgus']
+        matrix = np.array([
+            [angles[name] for name in names[:-1]] +
+            [abs(angles['left_knee_angle'] - angles['right_knee_angle'])]
+            for angles in angles_history
+        ])
         
         # 执行评估
-        result = assessor.assess(extended_angles, final_landmarks)
+        result = assessor.assess_reps([(names, matrix)])
+        rep_metrics = result['reps'][0]['parameters']['rep_metrics']
         
         print(f"评估结果:")
         print(f"  评分: {result['score']}/3")
         print(f"  评估原因: {result['reasons'][0]}")
         if result['compensations']:
             print(f"  代偿模式: {', '.join(result['compensations'])}")
+        print(f"  最大屈曲: 左膝 {rep_metrics['left_knee_angle']:.1f}°, 右膝 {rep_metrics['right_knee_angle']:.1f}°, "
+              f"最大膝外翻 {rep_metrics['knee_valgus']:.1f}°")
         
         # 查看历史记录
         history = assessor.get_history()
@@ -13,22 +13,30 @@ from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.progressbar import ProgressBar
 from kivy.clock import Clock
-from kivy.graphics.texture import Texture
 from kivy.core.window import Window
 from kivy.logger import Logger
 from kivy.metrics import dp, sp
 from kivy.graphics import Color, RoundedRectangle, Line
 
-import cv2
 import numpy as np
 import datetime
 import os
+import threading
+import time
 from pose_estimator import PoseEstimator
+from frame_pipeline import FramePipeline
+from inference_scheduler import InferenceScheduler
+from performance_profiles import ProfileStore, choose_profile
+from preview_texture import PreviewTexture
+from skeleton_overlay import SkeletonOverlay
+from utils.lazy_import import lazy_import
 
 # 添加AI相关导入
-from ai_assistant import AIFitnessAssistant
 from user_profile import UserProfile
 
+# cv2 在打开摄像头时才导入，MediaPipe模型在界面显示后于后台加载
+cv2 = lazy_import('cv2')
+
 class StyledButton(Button):
     """自定义样式按钮"""
     def __init__(self, **kwargs):
@@ -98,8 +106,21 @@ class MainScreen(Screen):
     
     def __init__(self, **kwargs):
         super(MainScreen, self).__init__(**kwargs)
-        self.pose_estimator = PoseEstimator()
+        # 按设备保存的性能档位（首次开始捕获时校准）
+        app = App.get_running_app()
+        self.profile_store = ProfileStore(os.path.join(app.user_data_dir if app else ".", "performance_profiles.json"))
+        saved_profile = self.profile_store.get()
+        # 推理输入按人物区域裁剪并按性能档位缩小，推理跟不上帧率时自动跳帧
+        # 骨架由 SkeletonOverlay 在GPU上绘制，推理线程不再把骨架绘制到图像中
+        self.pose_estimator = PoseEstimator(lazy_model=True, scheduler=InferenceScheduler(),
+                                            profile=saved_profile['profile'] if saved_profile else 'full',
+                                            overlay='gpu')
         self.cap = None
+        self.pipeline = None  # 采集/推理流水线
+        self._calibration_thread = None  # 性能校准线程（结束后在UI线程中置为None）
+        self._calibration_cancel = threading.Event()  # 校准期间停止捕获时置位
+        self.preview = PreviewTexture(colorfmt='rgb')  # 按分辨率复用的预览纹理
+        self._shown_reps = None  # 界面上正在显示的各次评分
         self.is_capturing = False
         self.current_action = "深蹲"
         self.is_evaluating = False
@@ -232,6 +253,8 @@ class MainScreen(Screen):
             keep_ratio=True
         )
         video_layout.add_widget(self.video_image)
+        self.skeleton_overlay = SkeletonOverlay(image_widget=self.video_image)
+        video_layout.add_widget(self.skeleton_overlay)
         middle_layout.add_widget(video_layout)
         
         # 动作指引信息区域
@@ -320,6 +343,15 @@ class MainScreen(Screen):
             color=(0.2, 0.6, 1.0, 1)
         )
         
+        # 完成次数和各次评分（评分取各次中的最高分）
+        self.rep_label = Label(
+            text='次数: --',
+            pos_hint={'top': 0.4, 'center_x': 0.5},
+            size_hint=(0.9, 0.15),
+            font_size='12sp',
+            color=(0.3, 0.3, 0.3, 1)
+        )
+        
         # 评估进度条
         progress_layout = BoxLayout(orientation='vertical', pos_hint={'bottom': 0.1, 'left': 0.1}, size_hint=(0.8, 0.2))
         self.progress_bar = ProgressBar(max=100, value=0, size_hint_y=0.3)
@@ -330,6 +362,7 @@ class MainScreen(Screen):
         eval_container.add_widget(eval_label)
         eval_container.add_widget(pain_layout)
         eval_container.add_widget(self.score_label)
+        eval_container.add_widget(self.rep_label)
         eval_container.add_widget(progress_layout)
         
         # 右侧：参数信息
@@ -388,11 +421,21 @@ class MainScreen(Screen):
     def on_action_change(self, spinner, text):
         """处理动作选择变化"""
         self.current_action = text
+        if self.pipeline:
+            with self.pipeline.processing_lock:
+                self.pose_estimator.set_action(text)
+        else:
+            self.pose_estimator.set_action(text)
         self.update_guidance()
     
     def set_view(self, view):
         """设置当前视图并更新按钮样式"""
-        self.pose_estimator.set_view(view)
+        if self.pipeline:
+            # 避免推理线程处理帧的同时重置估计器状态
+            with self.pipeline.processing_lock:
+                self.pose_estimator.set_view(view)
+        else:
+            self.pose_estimator.set_view(view)
         self.update_guidance()
         
         # 更新按钮样式
@@ -463,6 +506,9 @@ class MainScreen(Screen):
     
     def start_capture(self, instance):
         """开始视频捕获"""
+        if self._calibration_thread is not None:
+            Logger.info("性能校准尚未结束，忽略开始请求")
+            return
         try:
             self.cap = cv2.VideoCapture(0)
             if not self.cap.isOpened():
@@ -476,54 +522,134 @@ class MainScreen(Screen):
             # 设置视频帧率
             self.cap.set(cv2.CAP_PROP_FPS, 30)
             
-            # 开始更新视频帧
-            Clock.schedule_interval(self.update_frame, 1.0/30.0)
-            
-            Logger.info("视频捕获已开始")
+            # 选择性能档位（首次在该设备上运行时需要校准几秒）后再启动流水线
+            if self.profile_store.get() is None:
+                self.guidance_text.text = "正在测试设备性能，请稍候..."
+            # 校准线程持有摄像头和取消事件的引用，不读取 self.cap（停止捕获时会被置为None）
+            self._calibration_cancel = threading.Event()
+            self._calibration_thread = threading.Thread(
+                target=self._select_profile_and_start, args=(self.cap, self._calibration_cancel),
+                name="profile-calibration", daemon=True)
+            self._calibration_thread.start()
         except Exception as e:
             Logger.error(f"启动视频捕获时出错: {str(e)}")
     
+    def _read_calibration_frames(self, cap, cancel, count=20):
+        """从摄像头读取用于性能校准的画面，取消时抛出异常"""
+        frames = []
+        while len(frames) < count and not cancel.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        if cancel.is_set():
+            raise RuntimeError("已停止捕获，取消校准")
+        return frames
+    
+    def _select_profile_and_start(self, cap, cancel):
+        """在后台线程中选择性能档位，完成后回到UI线程"""
+        try:
+            profile, calibrated = choose_profile(self.pose_estimator,
+                                                 lambda: self._read_calibration_frames(cap, cancel),
+                                                 store=self.profile_store)
+            Logger.info(f"性能档位: {profile}{'（新校准）' if calibrated else ''}")
+        except Exception as e:
+            # 校准失败时使用当前档位
+            Logger.error(f"性能校准失败: {str(e)}")
+        Clock.schedule_once(lambda dt: self._finish_calibration(cap, cancel))
+    
+    def _finish_calibration(self, cap, cancel):
+        """校准线程结束后（UI线程）：启动流水线；校准期间已停止捕获时释放摄像头"""
+        self._calibration_thread = None
+        if cancel.is_set():
+            cap.release()
+            self.start_btn.disabled = False
+            return
+        self._start_pipeline()
+    
+    def _start_pipeline(self):
+        """启动采集/推理流水线"""
+        if not self.is_capturing or self.pipeline:
+            return  # 校准期间已停止捕获
+        self.update_guidance()
+        
+        # 采集和推理在后台线程中进行，UI线程只负责上传纹理和更新骨架
+        self.pipeline = FramePipeline(self.cap, self._process_frame)
+        self.pipeline.start()
+        
+        # 开始更新视频帧
+        Clock.schedule_interval(self.update_frame, 1.0/30.0)
+        
+        Logger.info("视频捕获已开始")
+    
+    def _process_frame(self, frame):
+        """推理线程中的帧处理：输出RGB图像（与预览纹理的颜色格式一致）、角度、关键点和各次评分"""
+        image, angles = self.pose_estimator.process_frame(frame, output_format='rgb')
+        return image, angles, self.pose_estimator.latest_landmarks, self.pose_estimator.rep_scores
+    
     def stop_capture(self, instance):
         """停止视频捕获"""
         self.is_capturing = False
+        self._calibration_cancel.set()
         Clock.unschedule(self.update_frame)
         
+        if self.pipeline:
+            self.pipeline.stop()
+            Logger.info(f"流水线延迟统计: {self.pipeline.stats()}")
+            Logger.info(f"推理调度统计: {self.pose_estimator.scheduler.stats()}")
+            self.pipeline = None
+        
         if self.cap:
-            self.cap.release()
+            # 校准线程可能正在读取画面，此时由 _finish_calibration 在线程结束后释放
+            if self._calibration_thread is None:
+                self.cap.release()
             self.cap = None
             
-        self.start_btn.disabled = False
+        self.start_btn.disabled = self._calibration_thread is not None
         self.stop_btn.disabled = True
         self.video_image.texture = None
+        self.skeleton_overlay.clear()
         
         Logger.info("视频捕获已停止")
     
     def update_frame(self, dt):
-        """更新视频帧"""
-        if not self.is_capturing or not self.cap:
+        """更新视频帧（UI阶段，只负责上传纹理）"""
+        if not self.is_capturing or not self.pipeline:
             return
             
-        ret, frame = self.cap.read()
-        if not ret:
+        packet = self.pipeline.poll()
+        if packet is None:
             return
             
         try:
-            # 处理视频帧
-            processed_frame = self.process_frame(frame)
+            start = time.perf_counter()
             
-            # 将OpenCV图像转换为Kivy纹理
-            buf = cv2.flip(processed_frame, 0).tostring()
-            texture = Texture.create(
-                size=(processed_frame.shape[1], processed_frame.shape[0]), 
-                colorfmt='bgr'
-            )
-            texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+            # 上传到复用的纹理（分辨率不变时不重新创建）
+            texture = self.preview.update(packet.image)
             
-            # 更新图像显示
-            self.video_image.texture = texture
+            # 更新图像显示：纹理对象不变时属性不会触发重绘，需要主动请求
+            if self.video_image.texture is not texture:
+                self.video_image.texture = texture
+            else:
+                self.video_image.canvas.ask_update()
+            self.skeleton_overlay.update(packet.landmarks)
+            if packet.reps != self._shown_reps:
+                self._show_reps(packet.reps)
+            self.pipeline.record_ui_latency(packet, time.perf_counter() - start)
         except Exception as e:
             Logger.error(f"更新视频帧时出错: {str(e)}")
     
+    def _show_reps(self, scores):
+        """显示完成次数和各次评分（最近5次），分数按FMS惯例取各次中的最高分"""
+        self._shown_reps = scores
+        if scores is None:
+            self.rep_label.text = '次数: --'
+            return
+        recent = ' '.join('-' if score is None else str(score) for score in scores[-5:])
+        self.rep_label.text = f"次数: {len(scores)}" + (f"  各次评分: {recent}" if scores else "")
+        rated = [score for score in scores if score is not None]
+        self.score_label.text = f"分数: {max(rated)}/3" if rated else '分数: --/3'
+        
     def collect_data(self, instance):
         """处理数据收集"""
         Logger.info("开始数据收集")
@@ -541,9 +667,8 @@ class MainScreen(Screen):
             # 获取最近的评估结果
             assessment_results = []
             if hasattr(self.pose_estimator, 'db_manager') and self.pose_estimator.db_manager:
-                # 获取所有动作的评估结果
-                from db_manager import DatabaseManager
-                db = DatabaseManager()
+                # 获取所有动作的评估结果（复用姿态估计器的数据库管理器，避免重复打开数据库）
+                db = self.pose_estimator.db_manager
                 
                 # 获取会话历史
                 session_history = db.get_session_history()
@@ -802,6 +927,10 @@ class RehabGPTApp(App):
         sm.add_widget(MainScreen(name='main'))
         
         return sm
+    
+    def on_start(self):
+        # 第一帧界面绘制完成后再在后台加载cv2、MediaPipe和姿态模型
+        Clock.schedule_once(lambda dt: self.root.get_screen('main').pose_estimator.start_warmup(), 0)
 
 if __name__ == '__main__':
     RehabGPTApp().run()
\ No newline at end of file
@@ -0,0 +1,41 @@
+import os
+import argparse
+from db_manager import DatabaseManager
+
+def migrate_frames_to_binary(db_path="squat_evaluation.db", vacuum=True):
+    """将数据库中的JSON帧数据迁移为二进制帧块"""
+    size_before = os.path.getsize(db_path)
+    
+    # 初始化数据库管理器（会自动创建二进制帧块表）
+    db_manager = DatabaseManager(db_path)
+    
+    summary = db_manager.migrate_json_frames()
+    print(f"迁移完成：{summary['sessions']} 个会话，{summary['frames']} 帧，写入 {summary['chunks']} 个数据块")
+    
+    # 回收被删除的JSON行占用的空间
+    if vacuum:
+        db_manager.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db_manager.connection.execute("VACUUM")
+    
+    # 关闭数据库连接
+    db_manager.close()
+    
+    size_after = os.path.getsize(db_path)
+    print(f"数据库大小: {size_before / 1024:.1f} KB -> {size_after / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将JSON帧数据迁移为二进制帧块")
+    parser.add_argument("--db_path", type=str, default="squat_evaluation.db", 
+                       help="数据库文件路径")
+    parser.add_argument("--no_vacuum", action="store_true",
+                       help="迁移后不执行VACUUM")
+    
+    args = parser.parse_args()
+    
+    # 检查数据库文件是否存在
+    if not os.path.exists(args.db_path):
+        print(f"错误：数据库文件 '{args.db_path}' 不存在")
+        exit(1)
+    
+    # 开始迁移
+    migrate_frames_to_binary(args.db_path, vacuum=not args.no_vacuum)
@@ -0,0 +1,234 @@
+"""
+性能档位模块
+
+MediaPipe姿态模型有三种复杂度，速度和精度差别很大。原来固定使用默认复杂度，
+低端设备帧率不足，高端设备又没有用上更准确的模型。该模块提供:
+
+- PROFILES: 预设档位 lite / full / heavy，每档设置模型复杂度、关键点平滑、
+  检测/跟踪置信度和推理输入尺寸（通过 InferenceScheduler 生效）
+- calibrate: 用真实画面依次测量各档位的推理帧率，选出满足目标帧率的最高档位
+- ProfileStore: 按设备保存校准结果（JSON文件），同一设备下次启动直接使用
+- choose_profile: 读取已保存的档位，没有时校准并保存
+
+使用示例:
+    estimator = PoseEstimator(profile='full')
+    profile, calibrated = choose_profile(estimator, lambda: read_frames(cap, 20),
+                                         store=ProfileStore("performance_profiles.json"))
+"""
+
+import datetime
+import json
+import logging
+import os
+import platform
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger('PerformanceProfiles')
+
+
+class PerformanceProfile(NamedTuple):
+    """性能档位"""
+    name: str
+    model_complexity: int  # MediaPipe模型复杂度：0（最快）~ 2（最准确）
+    smooth_landmarks: bool  # MediaPipe是否对关键点做时间平滑
+    min_detection_confidence: float
+    min_tracking_confidence: float
+    inference_size: Optional[int]  # 推理输入长边的最大像素数，None表示不缩小
+
+    def pose_options(self) -> Dict[str, Any]:
+        """创建 mp_pose.Pose 使用的参数"""
+        return {
+            'model_complexity': self.model_complexity,
+            'smooth_landmarks': self.smooth_landmarks,
+            'min_detection_confidence': self.min_detection_confidence,
+            'min_tracking_confidence': self.min_tracking_confidence,
+        }
+
+
+PROFILES = {
+    'lite': PerformanceProfile('lite', 0, True, 0.5, 0.5, 256),
+    'full': PerformanceProfile('full', 1, True, 0.5, 0.5, 384),
+    'heavy': PerformanceProfile('heavy', 2, True, 0.5, 0.6, None),
+}
+PROFILE_ORDER = ('heavy', 'full', 'lite')  # 从高到低，校准时依次尝试
+DEFAULT_PROFILE = 'full'  # 与MediaPipe的默认模型复杂度一致
+DEFAULT_TARGET_FPS = 25.0
+
+
+def get_profile(profile) -> PerformanceProfile:
+    """
+    获取性能档位
+
+    Args:
+        profile: 档位名称或 PerformanceProfile
+
+    Returns:
+        PerformanceProfile
+    """
+    if isinstance(profile, PerformanceProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"未知的性能档位: {profile}，可选 {', '.join(PROFILES)}")
+    return PROFILES[profile]
+
+
+def device_id() -> str:
+    """当前设备的标识（系统、架构、主机名和CPU核数）"""
+    return f"{platform.system()}-{platform.machine()}-{platform.node()}-{os.cpu_count()}"
+
+
+def measure_fps(estimator, frames: Sequence[Any], warmup: int = 3) -> float:
+    """
+    测量姿态估计器当前档位处理给定画面的帧率
+
+    推理调度器的跳帧和ROI裁剪在测量期间关闭，得到的是逐帧完整推理的帧率。
+
+    Args:
+        estimator: PoseEstimator实例
+        frames: 用于测量的画面（BGR图像）
+        warmup: 不计时的预热帧数（模型加载和首帧初始化不计入）
+
+    Returns:
+        float: 每秒处理的帧数
+    """
+    from inference_scheduler import InferenceScheduler
+
+    if len(frames) <= warmup:
+        raise ValueError("测量画面数必须多于预热帧数")
+    original_scheduler = estimator.scheduler
+    estimator.scheduler = InferenceScheduler(inference_size=estimator.profile.inference_size,
+                                             roi=False, latency_budget=None)
+    try:
+        for frame in frames[:warmup]:
+            estimator.process_frame(frame, draw=False)
+        start = time.perf_counter()
+        for frame in frames[warmup:]:
+            estimator.process_frame(frame, draw=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        estimator.scheduler = original_scheduler
+        estimator.reset()
+    return (len(frames) - warmup) / elapsed if elapsed > 0 else float('inf')
+
+
+def calibrate(estimator, frames: Sequence[Any], target_fps: float = DEFAULT_TARGET_FPS,
+              profiles: Sequence[str] = PROFILE_ORDER, warmup: int = 3) -> Dict[str, Any]:
+    """
+    校准性能档位：从高到低测量各档位的帧率，选出第一个达到目标帧率的档位
+
+    所有档位都达不到目标时选择最后一个可用（最快）的档位。模型创建或推理出错的档位
+    （例如离线时无法下载的模型）视为不可用并跳过。校准结束后估计器使用选出的档位。
+
+    Args:
+        estimator: PoseEstimator实例
+        frames: 用于测量的真实画面
+        target_fps: 目标推理帧率
+        profiles: 按从高到低排列的候选档位
+        warmup: 每个档位不计时的预热帧数
+
+    Returns:
+        dict: {'profile': 选出的档位名称, 'fps': {档位名称: 帧率},
+               'failed': {不可用的档位名称: 错误信息}, 'target_fps'}
+
+    Raises:
+        RuntimeError: 所有候选档位都不可用（估计器恢复为校准前的档位）
+    """
+    if not profiles:
+        raise ValueError("至少需要一个候选档位")
+    original = estimator.profile
+    measured = {}
+    failed = {}
+    chosen = None
+    for name in profiles:
+        estimator.set_profile(name)
+        try:
+            measured[name] = measure_fps(estimator, frames, warmup)
+        except Exception as e:
+            failed[name] = str(e)
+            logger.warning(f"性能档位 {name} 不可用: {e}")
+            continue
+        logger.info(f"性能档位 {name}: {measured[name]:.1f} FPS")
+        chosen = name
+        if measured[name] >= target_fps:
+            break
+    if chosen is None:
+        estimator.set_profile(original)
+        raise RuntimeError(f"所有性能档位都不可用: {failed}")
+    estimator.set_profile(chosen)
+    return {'profile': chosen, 'fps': measured, 'failed': failed, 'target_fps': target_fps}
+
+
+class ProfileStore:
+    """按设备保存性能档位的JSON文件"""
+
+    def __init__(self, path: str = "performance_profiles.json"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取性能档位文件失败，将重新校准: {e}")
+            return {}
+
+    def get(self, device: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        读取设备的校准结果
+
+        Args:
+            device: 设备标识，None表示当前设备
+
+        Returns:
+            dict: calibrate 的返回值加上 calibrated_at；没有记录或档位已不存在时为None
+        """
+        with self._lock:
+            entry = self._read().get(device or device_id())
+        if not entry or entry.get('profile') not in PROFILES:
+            return None
+        return entry
+
+    def save(self, result: Dict[str, Any], device: Optional[str] = None) -> None:
+        """保存设备的校准结果（先写临时文件再替换）"""
+        entry = dict(result, calibrated_at=datetime.datetime.now().isoformat(timespec='seconds'))
+        with self._lock:
+            entries = self._read()
+            entries[device or device_id()] = entry
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def choose_profile(estimator, read_frames: Callable[[], Sequence[Any]],
+                   store: Optional[ProfileStore] = None, target_fps: float = DEFAULT_TARGET_FPS,
+                   recalibrate: bool = False) -> Tuple[str, bool]:
+    """
+    为当前设备选择性能档位：有保存的结果时直接使用，否则校准并保存
+
+    Args:
+        estimator: PoseEstimator实例
+        read_frames: 返回校准画面的函数（只在需要校准时调用）
+        store: 档位存储，None表示不保存
+        target_fps: 目标推理帧率
+        recalibrate: 是否忽略保存的结果重新校准
+
+    Returns:
+        (档位名称, 是否进行了校准)
+    """
+    entry = None if (store is None or recalibrate) else store.get()
+    # 目标帧率改变后保存的结果不再适用
+    if entry is not None and entry.get('target_fps') == target_fps:
+        estimator.set_profile(entry['profile'])
+        return entry['profile'], False
+    result = calibrate(estimator, read_frames(), target_fps)
+    if store is not None:
+        store.save(result)
+    return result['profile'], True
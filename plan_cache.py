@@ -0,0 +1,217 @@
+"""
+训练方案缓存模块
+
+以 模型名称 + 规范化提示词 的SHA-256作为键，把AI生成的训练方案保存在SQLite中，
+相同的用户信息和评估结果再次生成方案时直接返回缓存，省去推理模型数十秒的等待和API费用。
+
+功能描述:
+- TTL: 超过有效期的条目视为未命中并在读取时删除
+- LRU: 条目数超过上限时淘汰最久未访问的条目
+- 近似重复模式: 计算键之前把关键角度按 angle_step 取整，角度只有细微差别的评估共享同一方案
+- 命中统计: hits / misses / expirations / evictions 以及命中率
+
+使用示例:
+    cache = PlanCache("plan_cache.db", ttl=7 * 24 * 3600, max_entries=256, angle_step=5)
+    assistant = AIFitnessAssistant(cache=cache)
+    plan = assistant.generate_personalized_plan(profile, results)  # 第二次调用直接命中缓存
+    print(cache.stats())
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from db_manager import connect_database
+
+DEFAULT_TTL = 7 * 24 * 3600  # 默认有效期：7天（秒）
+DEFAULT_MAX_ENTRIES = 256
+
+
+def normalize_prompt(prompt: str) -> str:
+    """规范化提示词：去掉每行首尾空白和空行，使缩进和换行的差异不影响缓存键"""
+    return "\n".join(line.strip() for line in prompt.splitlines() if line.strip())
+
+
+def make_cache_key(model: str, prompt: str) -> str:
+    """
+    计算缓存键
+
+    Args:
+        model: 模型名称
+        prompt: 提示词（会先规范化）
+
+    Returns:
+        str: 十六进制SHA-256
+    """
+    digest = hashlib.sha256()
+    digest.update(model.encode('utf-8'))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def normalize_assessment_results(assessment_results: List[Dict], angle_step: Optional[float] = None) -> List[Dict]:
+    """
+    规范化评估结果，用于构建缓存键
+
+    关键角度按名称排序；指定 angle_step 时数值角度取整到最接近的 angle_step 的倍数。
+
+    Args:
+        assessment_results: FMS评估结果列表
+        angle_step: 角度取整步长（度），None表示不取整
+
+    Returns:
+        list: 规范化后的评估结果副本
+    """
+    normalized = []
+    for result in assessment_results:
+        result = copy.copy(result)
+        angles = result.get('angles')
+        if isinstance(angles, dict):
+            rounded = {}
+            for name in sorted(angles):
+                value = angles[name]
+                if angle_step and isinstance(value, (int, float)) and not isinstance(value, bool):
+                    value = float(round(value / angle_step) * angle_step)
+                rounded[name] = value
+            result['angles'] = rounded
+        normalized.append(result)
+    return normalized
+
+
+class PlanCache:
+    """基于SQLite的训练方案缓存（TTL + LRU）"""
+
+    def __init__(self, db_path: str = "plan_cache.db", ttl: Optional[float] = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, angle_step: Optional[float] = None):
+        """
+        初始化缓存
+
+        Args:
+            db_path: 缓存数据库文件路径（":memory:" 表示只在内存中缓存）
+            ttl: 有效期（秒），None表示永不过期
+            max_entries: 最多保存的条目数
+            angle_step: 近似重复模式的角度取整步长（度），None表示只缓存完全相同的输入
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.angle_step = angle_step
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # 后台生成方案的线程共用同一个连接
+        self.connection = connect_database(db_path)
+        self.connection.execute('''
+        CREATE TABLE IF NOT EXISTS plan_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT,
+            plan TEXT,
+            created_at REAL,
+            last_access REAL,
+            hit_count INTEGER DEFAULT 0
+        )
+        ''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS idx_plan_cache_access ON plan_cache (last_access)')
+        self.connection.commit()
+
+    def key_for(self, model: str, prompt: str) -> str:
+        """计算模型和提示词对应的缓存键"""
+        return make_cache_key(model, prompt)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            str: 缓存的训练方案，未命中或已过期时为None
+        """
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT plan, created_at FROM plan_cache WHERE cache_key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self.connection.execute('DELETE FROM plan_cache WHERE cache_key = ?', (key,))
+                self.connection.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.connection.execute(
+                'UPDATE plan_cache SET last_access = ?, hit_count = hit_count + 1 WHERE cache_key = ?',
+                (now, key)
+            )
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, plan: str, model: str = None) -> None:
+        """
+        写入缓存，超过条目上限时淘汰最久未访问的条目
+
+        Args:
+            key: 缓存键
+            plan: 训练方案
+            model: 模型名称（仅用于记录）
+        """
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO plan_cache (cache_key, model, plan, created_at, last_access, hit_count) '
+                'VALUES (?, ?, ?, ?, ?, 0)',
+                (key, model, plan, now, now)
+            )
+            if self.ttl is not None:
+                self.connection.execute('DELETE FROM plan_cache WHERE created_at < ?', (now - self.ttl,))
+            count = self.connection.execute('SELECT COUNT(*) FROM plan_cache').fetchone()[0]
+            if count > self.max_entries:
+                cursor = self.connection.execute(
+                    'DELETE FROM plan_cache WHERE cache_key IN '
+                    '(SELECT cache_key FROM plan_cache ORDER BY last_access ASC, rowid ASC LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+                self.evictions += cursor.rowcount
+            self.connection.commit()
+
+    def entry_count(self) -> int:
+        """当前缓存的条目数"""
+        with self._lock:
+            return self.connection.execute('SELECT COUNT(*) FROM plan_cache').fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取命中统计
+
+        Returns:
+            dict: hits, misses, expirations, evictions, entries, hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'entries': self.entry_count(),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self.connection.execute('DELETE FROM plan_cache')
+            self.connection.commit()
+        self.hits = self.misses = self.expirations = self.evictions = 0
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self.connection.close()
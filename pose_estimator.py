@@ -1,17 +1,30 @@
-import cv2
-import mediapipe as mp
 import numpy as np
 import csv
+import dataclasses
 import datetime
+import itertools
 import os
+import threading
+import time
 
-# 初始化MediaPipe姿态估计器
-mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
+from utils.lazy_import import lazy_import, lazy_attribute
+
+# cv2 和 MediaPipe 导入耗时较长，首次使用时才加载（见 PoseEstimator.start_warmup）
+cv2 = lazy_import('cv2')
+mp_pose = lazy_attribute('mediapipe', 'solutions.pose')
+mp_drawing = lazy_attribute('mediapipe', 'solutions.drawing_utils')
+mp_drawing_styles = lazy_attribute('mediapipe', 'solutions.drawing_styles')
+landmark_pb2 = lazy_import('mediapipe.framework.formats.landmark_pb2')
 
 import json
 from db_manager import DatabaseManager
+from utils.angle_calculations import NUM_LANDMARKS, landmarks_to_array
+from utils.angle_specs import get_angle_plan
+from utils.landmark_filter import LandmarkFilter
+from utils.metric_history import MetricHistory
+from utils.rep_counter import RepSegmenter, REP_METRICS
+from fms_assessors import get_assessor
+from performance_profiles import DEFAULT_PROFILE, get_profile
 
 # 优化CSV方法以支持数据库选项并提高代码健壮性
 import logging
@@ -20,16 +33,64 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('PoseEstimator')
 
+# 骨架叠加方式：不绘制 / 在CPU上绘制到图像中 / 由界面在GPU上绘制
+OVERLAY_MODES = ('off', 'cpu', 'gpu')
+
 class PoseEstimator:
     """使用MediaPipe实现真实的姿态估计算法"""
     
-    def __init__(self):
-        self.pose = mp_pose.Pose(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5)
-        self.landmarks_history = []  # 存储历史姿态数据
-        self.angle_history = {}  # 存储角度历史数据
+    def __init__(self, filter_mode=None, history_capacity=18000, history_spill_dir=None,
+                 lazy_model=False, scheduler=None, profile=DEFAULT_PROFILE, overlay='cpu',
+                 min_visibility=None):
+        """
+        初始化姿态估计器
+        
+        Args:
+            filter_mode: 关键点滤波模式，None表示不滤波，
+                         可选 'moving_average' 或 'one_euro'（按动作使用预设参数）
+            history_capacity: 角度历史保留的最大帧数（默认约10分钟@30FPS），None表示不限制
+            history_spill_dir: 历史数据溢出目录，超过容量的旧数据写入该目录
+            lazy_model: 是否推迟加载MediaPipe模型，推迟时由 start_warmup 在后台加载，
+                        或在处理第一帧时加载
+            scheduler: 推理调度器（InferenceScheduler），None表示每帧都用完整画面推理
+            profile: 性能档位名称或 PerformanceProfile（见 performance_profiles），
+                     决定模型复杂度、置信度和调度器的推理输入尺寸
+            overlay: 骨架叠加方式，'cpu' 在返回的图像上绘制，'gpu' 由界面根据
+                     latest_landmarks 用画布指令绘制（见 skeleton_overlay），'off' 不绘制
+            min_visibility: 关键点可见度阈值，None表示不按可见度筛选。低于阈值的关键点在滤波时
+                            视为无效（保持之前的滤波结果）；不滤波时坐标置为NaN，相关角度为NaN
+        """
+        if overlay not in OVERLAY_MODES:
+            raise ValueError(f"未知的骨架叠加方式: {overlay}，可选 {', '.join(OVERLAY_MODES)}")
+        self.overlay = overlay
+        self.scheduler = scheduler
+        self.profile = get_profile(profile)
+        if scheduler is not None:
+            scheduler.inference_size = self.profile.inference_size
+        self.pose = None  # MediaPipe姿态模型，由 warm_up 创建
+        self._model_lock = threading.Lock()
+        self._warmup_thread = None
+        self._landmark_styles = {}  # 按输出颜色格式缓存的关键点绘制样式
+        if not lazy_model:
+            self.warm_up()
+        self.latest_angles = None  # 最近一帧的角度数据
+        self.latest_landmarks = None  # 最近一帧的关键点 (33, 4) float32：x, y, z, 可见度；未检测到人体时为None
+        self.min_visibility = min_visibility
+        self._landmark_buffer = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)  # extract_landmarks 复用的缓冲区
+        # 缓冲区的一维视图：逐个写入Python浮点数比经numpy索引赋值快
+        self._landmark_view = memoryview(self._landmark_buffer).cast('B').cast('f')
+        self.db_manager = None  # 数据库管理器，开始数据库会话时创建
+        self.current_session_id = None
+        self.angle_history = MetricHistory(capacity=history_capacity,
+                                           spill_dir=history_spill_dir)  # 列式角度历史数据
         self.current_view = "front"  # 默认正面视图
+        self.current_action = "squat"  # 默认深蹲动作
+        self.angle_plan = get_angle_plan(self.current_action, self.current_view)  # 预编译的角度计算计划
+        self.filter_mode = filter_mode
+        self.landmark_filter = self._create_filter()
+        self.rep_segmenter = self._create_rep_segmenter()  # 在线重复次数计数与逐次评分
+        self.rep_events = []  # 最近一帧产生的动作阶段事件
+        self.rep_scores = () if self.rep_segmenter else None  # 已完成各次动作的评分，不支持计数的动作为None
         
         # 添加CSV日志相关属性
         self.csv_file = None
@@ -146,12 +207,54 @@ class PoseEstimator:
     def set_view(self, view: str) -> None:
         """设置当前视图角度"""
         self.current_view = view
+        self.angle_plan = get_angle_plan(self.current_action, view)
+        self.reset()
+    
+    def set_action(self, action: str) -> None:
+        """设置当前评估动作，支持中文动作名称或英文动作键"""
+        self.current_action = self.ACTIONS.get(action, action)
+        self.angle_plan = get_angle_plan(self.current_action, self.current_view)
+        self.landmark_filter = self._create_filter()
+        self.rep_segmenter = self._create_rep_segmenter()
         self.reset()
     
+    def set_overlay(self, mode) -> None:
+        """设置骨架叠加方式：'off'、'cpu' 或 'gpu'"""
+        if mode not in OVERLAY_MODES:
+            raise ValueError(f"未知的骨架叠加方式: {mode}，可选 {', '.join(OVERLAY_MODES)}")
+        self.overlay = mode
+    
+    def set_filter_mode(self, mode) -> None:
+        """设置关键点滤波模式，None表示关闭滤波"""
+        self.filter_mode = mode
+        self.landmark_filter = self._create_filter()
+    
+    def _create_filter(self):
+        """按当前动作创建关键点滤波器"""
+        if not self.filter_mode:
+            return None
+        return LandmarkFilter.for_action(self.current_action, mode=self.filter_mode)
+    
+    def _create_rep_segmenter(self):
+        """按当前动作创建重复次数分割器，不支持计数的动作返回None"""
+        if self.current_action not in REP_METRICS:
+            return None
+        return RepSegmenter(assessor=get_assessor(self.current_action),
+                            metric_groups=REP_METRICS[self.current_action])
+    
     def reset(self) -> None:
         """重置估计器状态"""
-        self.landmarks_history = []
-        self.angle_history = {}
+        self.latest_angles = None
+        self.latest_landmarks = None
+        self.angle_history.clear()
+        if self.landmark_filter:
+            self.landmark_filter.reset()
+        if self.rep_segmenter:
+            self.rep_segmenter.reset()
+        self.rep_scores = () if self.rep_segmenter else None
+        if self.scheduler:
+            self.scheduler.reset()
+        self.rep_events = []
         
         # 停止CSV日志记录
         if self.csv_file:
@@ -159,182 +262,211 @@ class PoseEstimator:
             self.csv_file = None
             self.csv_writer = None
     
-    def process_frame(self, frame):
-        """处理单帧图像，返回处理后的帧和姿态数据"""
-        # 转换为RGB格式，因为MediaPipe使用RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
-        results = self.pose.process(image)
+    @property
+    def model_ready(self):
+        """姿态模型是否已加载"""
+        return self.pose is not None
+    
+    def warm_up(self):
+        """
+        加载cv2、MediaPipe和姿态模型（重复调用只加载一次）
+        
+        Returns:
+            姿态模型
+        """
+        if self.pose is None:
+            with self._model_lock:
+                if self.pose is None:
+                    start = time.perf_counter()
+                    cv2.load()
+                    self.pose = mp_pose.Pose(**self.profile.pose_options())
+                    logger.info(f"姿态模型（{self.profile.name}）加载完成，"
+                                f"耗时 {time.perf_counter() - start:.2f} 秒")
+        return self.pose
+    
+    def set_profile(self, profile):
+        """
+        切换性能档位
+        
+        模型复杂度等参数改变时关闭当前模型，下一帧（或 warm_up）按新档位重新创建。
+        使用流水线时应持有 pipeline.processing_lock 后调用。
+        
+        Args:
+            profile: 档位名称或 PerformanceProfile
+        """
+        profile = get_profile(profile)
+        with self._model_lock:
+            if self.pose is not None and profile.pose_options() != self.profile.pose_options():
+                close = getattr(self.pose, 'close', None)
+                if close:
+                    close()
+                self.pose = None
+            self.profile = profile
+        if self.scheduler is not None:
+            self.scheduler.inference_size = profile.inference_size
+            self.scheduler.reset()
+    
+    def start_warmup(self):
+        """
+        在后台线程中加载姿态模型，界面显示后调用，避免阻塞启动
+        
+        Returns:
+            threading.Thread: 预热线程（模型已加载时为None）
+        """
+        if self.pose is not None:
+            return None
+        if self._warmup_thread is None or not self._warmup_thread.is_alive():
+            self._warmup_thread = threading.Thread(target=self._warm_up_safely, name="pose-warmup", daemon=True)
+            self._warmup_thread.start()
+        return self._warmup_thread
+    
+    def _warm_up_safely(self):
+        try:
+            self.warm_up()
+        except Exception as e:
+            # 后台加载失败时处理第一帧会再次尝试并抛出异常
+            logger.error(f"后台加载姿态模型失败: {e}")
+    
+    def _landmark_style(self, output_format):
+        """获取关键点绘制样式（按输出颜色格式缓存，默认样式的颜色为BGR）"""
+        style = self._landmark_styles.get(output_format)
+        if style is None:
+            style = mp_drawing_styles.get_default_pose_landmarks_style()
+            if output_format == 'rgb':
+                style = {landmark: dataclasses.replace(spec, color=tuple(reversed(spec.color)))
+                         for landmark, spec in style.items()}
+            self._landmark_styles[output_format] = style
+        return style
+    
+    def process_frame(self, frame, draw=True, timestamp=None, output_format='bgr'):
+        """
+        处理单帧图像，返回处理后的帧和姿态数据
         
-        # 绘制姿态标记
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-        if results.pose_landmarks:
-            mp_drawing.draw_landmarks(
-                image,
-                results.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style())
+        Args:
+            frame: BGR图像
+            draw: 是否在返回的图像上绘制姿态标记（仅 overlay='cpu' 时绘制），
+                  离线批处理时可关闭以节省时间
+            timestamp: 帧时间（秒），用于滤波器；None表示使用当前时间（实时采集）
+            output_format: 返回图像的颜色格式，'bgr'（OpenCV显示）或 'rgb'（Kivy预览，
+                           直接在MediaPipe的输入图像上绘制，省去一次颜色转换）
         
-        # 提取姿态特征和角度
-        landmarks = None
+        配置了推理调度器时，按调度器裁剪、缩小推理输入，或跳过推理并使用外推的关键点。
+        """
+        if output_format not in ('bgr', 'rgb'):
+            raise ValueError("output_format必须是 'bgr' 或 'rgb'")
+        frame_time = time.perf_counter() if timestamp is None else timestamp
+        scheduler = self.scheduler
+        image = None
+        pose_landmarks = None  # 用于绘制的MediaPipe关键点
+        points = None  # 相对于原始帧的归一化关键点 (33, 4)：x, y, z, 可见度
+        
+        if scheduler is None or scheduler.should_infer():
+            start = time.perf_counter()
+            input_image, window = scheduler.prepare(frame) if scheduler else (frame, None)
+            # 转换为RGB格式，因为MediaPipe使用RGB
+            rgb_image = cv2.cvtColor(input_image, cv2.COLOR_BGR2RGB)
+            rgb_image.flags.writeable = False
+            results = self.warm_up().process(rgb_image)
+            rgb_image.flags.writeable = True
+            if input_image is frame:
+                image = rgb_image  # 输入未裁剪缩小时直接在其上绘制
+            
+            if results.pose_landmarks:
+                points = self.extract_landmarks(results.pose_landmarks)
+                if window is None or window.is_full_frame:
+                    pose_landmarks = results.pose_landmarks
+                else:
+                    points = window.to_frame(points)
+            if scheduler is not None:
+                scheduler.record_latency(time.perf_counter() - start)
+                scheduler.update(points, frame_time)
+        else:
+            # 跳过推理的帧使用外推的关键点
+            points = scheduler.predict(frame_time)
+        
+        if draw and self.overlay == 'cpu':
+            # 绘制姿态标记
+            if image is None:
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if output_format == 'rgb' else frame.copy()
+            elif output_format == 'bgr':
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+            if points is not None:
+                mp_drawing.draw_landmarks(
+                    image,
+                    pose_landmarks if pose_landmarks is not None else self._landmark_list(points),
+                    mp_pose.POSE_CONNECTIONS,
+                    landmark_drawing_spec=self._landmark_style(output_format))
+        elif output_format == 'bgr':
+            image = frame
+        elif image is None:
+            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        # 计算姿态特征和角度
         angles = None
-        if results.pose_landmarks:
-            landmarks = self.extract_landmarks(results.pose_landmarks)
-            angles = self.calculate_angles(landmarks)
-            self.landmarks_history.append(angles)
+        self.rep_events = []
+        if points is not None:
+            # 复制一份：提取缓冲区下一帧会被覆盖，而结果会交给界面线程
+            landmarks = np.array(points, dtype=np.float32)
+            hidden = None if self.min_visibility is None else points[:, 3] < self.min_visibility
+            if self.landmark_filter:
+                mask = None if hidden is None else ~hidden
+                landmarks[:, :3] = self.landmark_filter.filter(points, mask=mask, timestamp=frame_time)
+            elif hidden is not None:
+                landmarks[hidden, :3] = np.nan
+            points = landmarks
+        self.latest_landmarks = points
+        if points is not None:
+            angles = self.calculate_angles(points)
+            self.latest_angles = angles
             
             # 更新角度历史记录
-            for angle_name, angle_value in angles.items():
-                if angle_name not in self.angle_history:
-                    self.angle_history[angle_name] = []
-                self.angle_history[angle_name].append(angle_value)
+            self.angle_history.append(angles)
+            
+            # 更新重复次数计数，完成一次时该次动作会被单独评分
+            if self.rep_segmenter:
+                self.rep_events = self.rep_segmenter.update(angles, frame_time)
+                # 元组整体替换，其他线程读到的总是完整的结果
+                for event in self.rep_events:
+                    if event.kind == 'rep':
+                        assessment = event.window.assessment
+                        self.rep_scores += (assessment['score'] if assessment else None,)
         
         return image, angles
     
+    def _landmark_list(self, points):
+        """把关键点数组转换为MediaPipe关键点列表（用于绘制裁剪推理和外推的结果）"""
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in points[:, :3]:
+            landmark_list.landmark.add(x=x, y=y, z=z)
+        return landmark_list
+    
     def extract_landmarks(self, landmarks):
-        """提取关键点坐标"""
-        landmark_dict = {}
-        for idx, landmark in enumerate(landmarks.landmark):
-            landmark_dict[idx] = (landmark.x, landmark.y, landmark.z)
-        return landmark_dict
+        """
+        提取关键点坐标和可见度
+
+        结果写入复用的 (33, 4) float32 缓冲区（x, y, z, 可见度），下次调用时会被覆盖，
+        需要保留时请复制。缺失的关键点坐标为NaN、可见度为0。
+        """
+        buffer = self._landmark_buffer
+        view = self._landmark_view
+        i = 0
+        for landmark in itertools.islice(landmarks.landmark, NUM_LANDMARKS):
+            view[i] = landmark.x
+            view[i + 1] = landmark.y
+            view[i + 2] = landmark.z
+            view[i + 3] = landmark.visibility
+            i += 4
+        count = i // 4
+        if count < NUM_LANDMARKS:
+            buffer[count:, :3] = np.nan
+            buffer[count:, 3] = 0.0
+        return buffer
     
     def calculate_angles(self, landmarks):
-        """根据当前视图计算相关角度"""
-        angles = {}
-        
-        if self.current_view == "front":  # 正面视图角度计算
-            # 计算膝关节角度
-            left_knee_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-            )
-            right_knee_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-            )
-            
-            # 计算髋关节角度
-            left_hip_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-            )
-            right_hip_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value]
-            )
-            
-            # 计算两脚间距与肩宽比例
-            shoulder_width = self.calculate_distance(
-                landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-            )
-            hip_width = self.calculate_distance(
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value]
-            )
-            ankle_width = self.calculate_distance(
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-            )
-            
-            foot_shoulder_ratio = ankle_width / shoulder_width if shoulder_width > 0 else 0
-            
-            angles.update({
-                'left_knee_angle': left_knee_angle,
-                'right_knee_angle': right_knee_angle,
-                'left_hip_angle': left_hip_angle,
-                'right_hip_angle': right_hip_angle,
-                'foot_shoulder_ratio': foot_shoulder_ratio * 100,  # 转换为百分比
-                'knee_valgus': abs(left_knee_angle - right_knee_angle)  # 膝外翻程度
-            })
-            
-        elif self.current_view == "side":  # 侧面视图角度计算
-            # 计算躯干与地面角度
-            trunk_angle = self.calculate_trunk_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-            )
-            
-            # 计算髋关节角度
-            hip_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-            )
-            
-            # 计算膝关节角度
-            knee_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-            )
-            
-            # 计算踝关节角度
-            ankle_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_HEEL.value]
-            )
-            
-            # 计算脚跟离地高度
-            heel_lift = self.calculate_heel_lift(
-                landmarks[mp_pose.PoseLandmark.LEFT_HEEL.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-            )
-            
-            angles.update({
-                'trunk_angle': trunk_angle,
-                'hip_angle': hip_angle,
-                'knee_angle': knee_angle,
-                'ankle_angle': ankle_angle,
-                'heel_lift': heel_lift
-            })
-            
-        elif self.current_view == "45":  # 45度视图角度计算
-            # 计算侧面相关角度
-            side_hip_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-            )
-            side_knee_angle = self.calculate_joint_angle(
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-            )
-            
-            # 计算正面相关角度
-            front_hip_width = self.calculate_distance(
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value]
-            )
-            front_ankle_width = self.calculate_distance(
-                landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-            )
-            
-            # 计算躯干旋转角度
-            trunk_rotation = self.calculate_trunk_rotation(
-                landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value],
-                landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value]
-            )
-            
-            angles.update({
-                'side_hip_angle': side_hip_angle,
-                'side_knee_angle': side_knee_angle,
-                'front_hip_width': front_hip_width,
-                'front_ankle_width': front_ankle_width,
-                'trunk_rotation': trunk_rotation
-            })
-            
-        return angles
+        """根据当前动作和视图的预编译计划计算相关角度"""
+        if isinstance(landmarks, dict):
+            landmarks = landmarks_to_array(landmarks)
+        return self.angle_plan.evaluate_dict(landmarks)
     
     def calculate_joint_angle(self, a, b, c):
         """计算三点形成的关节角度（单位：度）"""
@@ -413,6 +545,8 @@ class PoseEstimator:
     
     def start_session(self, action_name, view_type, user_id=None, pain_reported=False):
         """开始新的数据库会话记录"""
+        if self.db_manager is None:
+            self.db_manager = DatabaseManager()
         self.current_session_id = self.db_manager.start_session(
             action_type=action_name,
             view_type=view_type,
@@ -431,10 +565,10 @@ class PoseEstimator:
         return None
     
     def log_to_database(self):
-        """记录当前帧数据到数据库"""
-        if self.current_session_id and self.landmarks_history and len(self.landmarks_history) > 0:
-            current_data = self.landmarks_history[-1].copy()
-            self.db_manager.log_frame_data(self.current_session_id, current_data)
+        """记录当前帧数据到数据库（放入后台写入队列，不阻塞调用方）"""
+        if self.current_session_id and self.latest_angles:
+            current_data = self.latest_angles.copy()
+            self.db_manager.log_frame_data_async(self.current_session_id, current_data)
     
     def save_evaluation_to_db(self, result):
         """保存评估结果到数据库"""
@@ -468,8 +602,8 @@ class PoseEstimator:
             self.csv_writer = csv.writer(self.csv_file)
             
             # 写入表头
-            if self.landmarks_history and isinstance(self.landmarks_history[0], dict):
-                headers = list(self.landmarks_history[0].keys())
+            if len(self.angle_history) > 0:
+                headers = self.angle_history.names
                 headers.insert(0, "timestamp")
                 self.csv_writer.writerow(headers)
                 logger.info(f"成功创建CSV日志文件: {self.csv_file_path}")
@@ -491,12 +625,12 @@ class PoseEstimator:
         try:
             if use_database and self.current_session_id:
                 self.log_to_database()
-            elif self.csv_writer and self.landmarks_history and len(self.landmarks_history) > 0:
-                current_data = self.landmarks_history[-1].copy()
+            elif self.csv_writer and self.latest_angles:
+                current_data = self.latest_angles.copy()
                 timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
                 
                 # 准备数据行 - 优化逻辑，确保与表头顺序一致
-                first_record_keys = list(self.landmarks_history[0].keys())
+                first_record_keys = self.angle_history.names
                 data_row = [timestamp] + [current_data.get(key, "") for key in first_record_keys]
                 
                 self.csv_writer.writerow(data_row)
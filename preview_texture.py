@@ -0,0 +1,83 @@
+"""
+预览纹理模块
+
+把流水线输出的图像上传到Kivy纹理，用于实时预览。
+
+原来每一帧都执行 cv2.flip(frame, 0).tostring()（复制整帧）并用 Texture.create 新建纹理，
+30FPS下每秒分配数十个纹理和同样大小的字节串。PreviewTexture 的做法:
+
+- 每种分辨率只创建一次纹理，之后的帧直接覆盖纹理内容
+- 创建纹理时调用 flip_vertical() 翻转纹理坐标，不再在CPU上翻转图像
+- 直接从连续内存的 numpy 数组上传（只有非连续数组才复制一次）
+- 颜色格式与流水线输出一致（PoseEstimator.process_frame(output_format='rgb')），
+  省去 RGB→BGR 的回转
+
+使用示例:
+    preview = PreviewTexture(colorfmt='rgb')
+    texture = preview.update(packet.image)   # 在UI线程中调用
+"""
+
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+
+def create_kivy_texture(size: Tuple[int, int], colorfmt: str) -> Any:
+    """创建Kivy纹理（默认的纹理工厂）"""
+    from kivy.graphics.texture import Texture
+
+    return Texture.create(size=size, colorfmt=colorfmt)
+
+
+class PreviewTexture:
+    """按分辨率复用的预览纹理"""
+
+    def __init__(self, colorfmt: str = 'rgb',
+                 texture_factory: Optional[Callable[[Tuple[int, int], str], Any]] = None):
+        """
+        初始化预览纹理
+
+        Args:
+            colorfmt: 上传图像的颜色格式，'rgb' 或 'bgr'
+            texture_factory: 创建纹理的函数 (size, colorfmt) -> texture，None表示使用Kivy纹理
+        """
+        if colorfmt not in ('rgb', 'bgr'):
+            raise ValueError("colorfmt必须是 'rgb' 或 'bgr'")
+        self.colorfmt = colorfmt
+        self.texture_factory = texture_factory or create_kivy_texture
+        self.texture = None
+        self.size = None  # (宽, 高)
+        self.allocations = 0  # 创建纹理的次数
+        self.copies = 0  # 因数组不连续而复制的次数
+
+    def update(self, image: np.ndarray) -> Any:
+        """
+        上传一帧图像
+
+        Args:
+            image: (高, 宽, 3) 的 uint8 图像，行序从上到下（OpenCV格式）
+
+        Returns:
+            纹理对象；分辨率不变时与上一次返回的是同一个对象
+        """
+        if image.ndim != 3 or image.shape[2] != 3 or image.dtype != np.uint8:
+            raise ValueError(f"需要 (高, 宽, 3) 的uint8图像，实际为 {image.shape} {image.dtype}")
+        size = (image.shape[1], image.shape[0])
+        if self.texture is None or self.size != size:
+            self.texture = self.texture_factory(size, self.colorfmt)
+            # OpenCV图像第一行在顶部，OpenGL纹理第一行在底部
+            self.texture.flip_vertical()
+            self.size = size
+            self.allocations += 1
+
+        if not image.flags['C_CONTIGUOUS']:
+            image = np.ascontiguousarray(image)
+            self.copies += 1
+        # reshape 不复制数据，得到一维字节视图
+        self.texture.blit_buffer(image.reshape(-1), colorfmt=self.colorfmt, bufferfmt='ubyte')
+        return self.texture
+
+    def release(self) -> None:
+        """释放纹理（下次上传时重新创建）"""
+        self.texture = None
+        self.size = None
@@ -0,0 +1,98 @@
+"""
+骨架叠加层模块
+
+用Kivy画布指令在预览图像上方绘制骨架，代替在推理线程中用 mp_drawing.draw_landmarks
+把骨架光栅化到每一帧图像里（每帧要花几毫秒CPU时间）。
+
+绘制指令只在创建控件时分配一次（每条骨骼一条 Line，每个关键点一个 Ellipse），
+每帧只更新坐标，由GPU完成绘制。骨架与图像分离，叠加层可以随时隐藏而不影响推理。
+
+使用示例:
+    overlay = SkeletonOverlay(image_widget=video_image)
+    video_layout.add_widget(overlay)
+    overlay.update(packet.landmarks)   # 在UI线程中调用，None表示未检测到人体
+"""
+
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Ellipse, Line
+from kivy.metrics import dp
+
+from utils.skeleton import POSE_CONNECTIONS, fit_image_rect, project_landmarks, visible_mask
+
+NUM_LANDMARKS = 33
+
+
+class SkeletonOverlay(Widget):
+    """在图像控件上方绘制骨架的叠加层"""
+
+    def __init__(self, image_widget, line_color=(0.2, 0.9, 0.4, 0.9), point_color=(1.0, 0.4, 0.2, 0.9),
+                 line_width=dp(2), point_radius=dp(3), visibility_threshold=0.5, **kwargs):
+        """
+        初始化叠加层
+
+        Args:
+            image_widget: 显示预览纹理的 Image 控件（需 keep_ratio=True）
+            line_color: 骨骼连线颜色 (r, g, b, a)
+            point_color: 关键点颜色 (r, g, b, a)
+            line_width: 连线宽度
+            point_radius: 关键点半径
+            visibility_threshold: 可见度低于该值的关键点不绘制
+        """
+        super(SkeletonOverlay, self).__init__(**kwargs)
+        self.image_widget = image_widget
+        self.point_radius = point_radius
+        self.visibility_threshold = visibility_threshold
+        self._points = None
+        self._visibility = None
+
+        with self.canvas:
+            Color(*line_color)
+            self.bones = [Line(points=[], width=line_width) for _ in POSE_CONNECTIONS]
+            Color(*point_color)
+            self.joints = [Ellipse(pos=(0, 0), size=(0, 0)) for _ in range(NUM_LANDMARKS)]
+
+        # 控件尺寸或图像纹理变化时按最近一次的关键点重新定位
+        image_widget.bind(pos=self._redraw, size=self._redraw, texture_size=self._redraw)
+
+    def update(self, points, visibility=None):
+        """
+        更新骨架
+
+        Args:
+            points: (33, 2+) 归一化关键点数组（如 PoseEstimator.latest_landmarks），None表示清除骨架
+            visibility: (33,) 可见度，None表示使用 points 的第四列（没有时视为全部可见）
+        """
+        self._points = points
+        self._visibility = visibility
+        self._redraw()
+
+    def clear(self):
+        """清除骨架"""
+        self.update(None)
+
+    def _redraw(self, *args):
+        points = self._points
+        if points is None or not self.image_widget.texture:
+            for bone in self.bones:
+                bone.points = []
+            for joint in self.joints:
+                joint.size = (0, 0)
+            return
+
+        rect = fit_image_rect(self.image_widget.pos, self.image_widget.size, self.image_widget.texture_size)
+        projected = project_landmarks(points, rect)
+        visible = visible_mask(points, self._visibility, self.visibility_threshold)
+
+        for bone, (start, end) in zip(self.bones, POSE_CONNECTIONS):
+            if visible[start] and visible[end]:
+                bone.points = [projected[start, 0], projected[start, 1], projected[end, 0], projected[end, 1]]
+            else:
+                bone.points = []
+
+        radius = self.point_radius
+        for joint, (x, y), shown in zip(self.joints, projected, visible):
+            if shown:
+                joint.pos = (x - radius, y - radius)
+                joint.size = (radius * 2, radius * 2)
+            else:
+                joint.size = (0, 0)
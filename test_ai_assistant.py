@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试AI助手的HTTP客户端（使用本地模拟服务器，不访问真实API）
+"""
+
+import sys
+import os
+import json
+import subprocess
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_assistant import AIFitnessAssistant, iter_sse_data
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按预设队列返回响应的模拟API"""
+    protocol_version = "HTTP/1.1"  # 支持keep-alive
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server.requests.append({'path': self.path, 'client_port': self.client_address[1],
+                                'auth': self.headers.get('Authorization'), 'body': body})
+        status, headers, delay = server.responses.pop(0) if server.responses else (200, {}, 0)
+        if delay:
+            time.sleep(delay)
+        if body.get('stream') and status == 200:
+            self.send_event_stream(server.stream_events, server.stream_delay)
+            return
+        content = body['messages'][-1]['content'] if status == 200 else "error"
+        payload = json.dumps({'choices': [{'message': {'content': f"方案:{content}"}}]}).encode('utf-8')
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 客户端已超时断开
+
+    def send_event_stream(self, deltas, delay):
+        """以分块传输编码逐个发送SSE事件"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [{'choices': [{'delta': {'reasoning_content': "思考中"}}]}]
+        events += [{'choices': [{'delta': {'content': delta}}]} for delta in deltas]
+        for event in events:
+            chunk = f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+            time.sleep(delay)
+        done = b": keep-alive\n\ndata: [DONE]\n\n"
+        self.wfile.write(f"{len(done):X}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    server.responses = []
+    server.stream_events = ["第一周：", "深蹲", "练习"]
+    server.stream_delay = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_assistant(server, **kwargs):
+    return AIFitnessAssistant(api_key="test_key", base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                              backoff_factor=0.01, **kwargs)
+
+
+def test_connection_reuse():
+    """测试多次请求复用同一连接"""
+    print("HTTP连接复用测试")
+    print("=" * 30)
+
+    server = start_stub_server()
+    with create_assistant(server) as assistant:
+        assert assistant._session is None
+        print("✓ 构造助手时不创建HTTP会话")
+        for i in range(3):
+            assert assistant._send_request(f"提示{i}") == f"方案:提示{i}"
+    assert [r['path'] for r in server.requests] == ["/v1/chat/completions"] * 3
+    assert server.requests[0]['auth'] == "Bearer test_key"
+    assert len({r['client_port'] for r in server.requests}) == 1
+    server.shutdown()
+    print("✓ 3次请求使用同一个TCP连接")
+
+
+def test_lazy_session():
+    """测试构造助手时不导入requests"""
+    print("\nHTTP会话延迟创建测试")
+    print("=" * 30)
+
+    code = ("import sys; from ai_assistant import AIFitnessAssistant; "
+            "assistant = AIFitnessAssistant(api_key='k'); assistant.close(); "
+            "assert 'requests' not in sys.modules; "
+            "assistant.session; assert 'requests' in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    print("✓ 首次访问会话时才导入requests并创建连接池")
+
+
+def test_retry_with_backoff():
+    """测试429/5xx重试"""
+    print("\n请求重试测试")
+    print("=" * 30)
+
+    server = start_stub_server()
+    server.responses = [(503, {}, 0), (429, {'Retry-After': '0'}, 0), (200, {}, 0)]
+    with create_assistant(server) as assistant:
+        assert assistant._send_request("重试") == "方案:重试"
+        assert len(server.requests) == 3
+        print("✓ 503和429后重试成功")
+
+        server.requests.clear()
+        server.responses = [(500, {}, 0)] * 4
+        try:
+            assistant._send_request("失败")
+            assert False, "重试次数用尽应抛出异常"
+        except Exception as e:
+            assert "API请求失败: 500" in str(e)
+        assert len(server.requests) == 4  # 首次请求 + 3次重试
+        print("✓ 重试次数用尽后返回最后一次错误")
+
+        server.requests.clear()
+        server.responses = [(400, {}, 0)]
+        try:
+            assistant._send_request("参数错误")
+            assert False, "400应直接抛出异常"
+        except Exception as e:
+            assert "API请求失败: 400" in str(e)
+        assert len(server.requests) == 1
+        print("✓ 4xx错误不重试")
+
+    delays = [AIFitnessAssistant(api_key="k", backoff_factor=1.0)._backoff_delay(3) for _ in range(50)]
+    assert all(0 <= d <= 8.0 for d in delays) and len(set(delays)) > 1
+    print("✓ 退避时间带随机抖动且不超过上限")
+    server.shutdown()
+
+
+def test_timeout_and_async():
+    """测试读取超时和后台请求"""
+    print("\n超时与异步请求测试")
+    print("=" * 30)
+
+    server = start_stub_server()
+    server.responses = [(200, {}, 0.5)]
+    with create_assistant(server, timeout=(1.0, 0.1)) as assistant:
+        start = time.perf_counter()
+        plan = assistant.generate_personalized_plan({'age': 30}, [])
+        assert plan.startswith("生成训练方案时出错: 网络请求错误")
+        assert time.perf_counter() - start < 0.5
+        assert len(server.requests) == 1
+        print("✓ 读取超时立即返回且不重试")
+
+    server.requests.clear()
+    server.responses = [(200, {}, 0.2)]
+    with create_assistant(server) as assistant:
+        start = time.perf_counter()
+        future = assistant.generate_personalized_plan_async({'age': 30}, [{'movement_name': '深蹲', 'score': 2}])
+        assert time.perf_counter() - start < 0.1
+        plan = future.result(timeout=5)
+        assert plan.startswith("方案:") and "动作名称：深蹲" in plan
+        print("✓ 异步调用立即返回Future")
+    server.shutdown()
+
+
+def test_streaming_plan():
+    """测试SSE流式生成"""
+    print("\n流式生成测试")
+    print("=" * 30)
+
+    events = list(iter_sse_data([b": ping", b"data: a", b"data:b", b"", b"event: x", b"data: {\"k\": 1}"]))
+    assert events == ["a\nb", '{"k": 1}']
+    print("✓ SSE解析：多行data、注释行和末尾未结束的事件")
+
+    server = start_stub_server()
+    server.stream_delay = 0.2
+    with create_assistant(server) as assistant:
+        start = time.perf_counter()
+        arrivals = []
+        plan = assistant.generate_personalized_plan_stream(
+            {'age': 30}, [], on_delta=lambda delta: arrivals.append((delta, time.perf_counter() - start)))
+        total = time.perf_counter() - start
+        assert plan == "第一周：深蹲练习"
+        assert [delta for delta, _ in arrivals] == ["第一周：", "深蹲", "练习"]
+        assert server.requests[-1]['body']['stream'] is True
+        assert arrivals[0][1] < total - 0.3
+        print(f"✓ 首段文本 {arrivals[0][1]:.2f} 秒到达，完整方案 {total:.2f} 秒")
+
+        server.responses = [(503, {}, 0), (200, {}, 0)]
+        server.stream_delay = 0
+        assert list(assistant.iter_personalized_plan({'age': 30}, [])) == ["第一周：", "深蹲", "练习"]
+        print("✓ 流式请求同样在5xx后重试")
+
+        server.responses = [(400, {}, 0)]
+        assert assistant.generate_personalized_plan_stream({'age': 30}, []).startswith(
+            "生成训练方案时出错: API请求失败: 400")
+        print("✓ 请求失败时返回错误说明")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_connection_reuse()
+    test_lazy_session()
+    test_retry_with_backoff()
+    test_timeout_and_async()
+    test_streaming_plan()
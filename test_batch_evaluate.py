@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试离线视频批量评估工具（视频解码和姿态模型使用模拟对象）
+"""
+
+import sys
+import os
+import contextlib
+import tempfile
+import types
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import batch_evaluate
+from batch_evaluate import evaluate_video, infer_action_view, list_videos, run_batch
+from db_manager import DatabaseManager
+from fms_assessors import get_assessor
+from test_support import FAKE_CV2, fake_pose_modules, landmark_list, pose_result
+
+# 两次全蹲的膝角度序列（站立170°，最低80°）
+SQUAT_KNEE_ANGLES = [170] * 3 + [int(a) for a in np.linspace(170, 80, 8)] + [int(a) for a in np.linspace(80, 170, 8)] + \
+                    [int(a) for a in np.linspace(170, 80, 8)] + [int(a) for a in np.linspace(80, 170, 8)] + [170] * 3
+
+# 模拟视频：文件名 -> 帧列表（全黑帧模拟未检测到人体，像素值大于1时为该膝角度的深蹲姿态），
+# None表示无法打开，'crash' 表示读取时出错
+FPS = 10.0
+VIDEOS = {
+    'squat_front.mp4': [np.full((4, 4, 3), 1, np.uint8)] * 2 + [np.zeros((4, 4, 3), np.uint8)] +
+                       [np.full((4, 4, 3), 1, np.uint8)] * 2,
+    'hurdle_step_side.mp4': [np.full((4, 4, 3), 1, np.uint8)] * 3,
+    'squat_reps_front.mp4': [np.full((4, 4, 3), angle, np.uint8) for angle in SQUAT_KNEE_ANGLES],
+    'broken.mp4': None,
+    'crash.mp4': 'crash',
+}
+
+
+class FakeCapture:
+    """按 VIDEOS 返回帧的 cv2.VideoCapture"""
+
+    def __init__(self, path):
+        self.frames = VIDEOS[os.path.basename(path)]
+        self.index = 0
+        self.released = False
+
+    def isOpened(self):
+        return self.frames is not None
+
+    def get(self, prop):
+        return FPS
+
+    def grab(self):
+        self.index += 1
+        return self.index <= len(self.frames)
+
+    def read(self):
+        if self.frames == 'crash':
+            raise IOError("解码失败")
+        if self.index >= len(self.frames):
+            return False, None
+        self.index += 1
+        return True, self.frames[self.index - 1]
+
+    def release(self):
+        self.released = True
+
+
+def squat_points(knee_angle):
+    """双膝角度为 knee_angle、髋角度比膝角度大5°的对称深蹲关键点（屈曲在y-z平面内，两脚与肩同宽）"""
+    points = np.full((33, 3), 0.5)
+    thigh = np.radians(175 - knee_angle)  # 大腿向前偏离竖直方向的角度
+    shin = np.radians(-5)  # 小腿保持接近竖直
+    for shoulder, hip, knee, ankle, x in ((11, 23, 25, 27, 0.4), (12, 24, 26, 28, 0.6)):
+        points[shoulder] = (x, 0.1, 0.0)
+        points[hip] = (x, 0.3, 0.0)
+        points[knee] = points[hip] + 0.2 * np.array([0.0, np.cos(thigh), np.sin(thigh)])
+        points[ankle] = points[knee] + 0.2 * np.array([0.0, np.cos(shin), np.sin(shin)])
+    return points
+
+
+class FakePose:
+    """画面非全黑时返回人体关键点：像素值为1时为固定姿态，大于1时为该膝角度的深蹲姿态"""
+
+    def __init__(self, **options):
+        rng = np.random.default_rng(0)
+        self.landmarks = landmark_list(rng.uniform(0.2, 0.8, (33, 3)))
+
+    def process(self, image):
+        value = int(image.flat[0])
+        if not value:
+            return pose_result()
+        return pose_result(self.landmarks if value == 1 else landmark_list(squat_points(value)))
+
+
+@contextlib.contextmanager
+def fake_video_stack():
+    """替换视频解码和姿态模型，退出时恢复并清除工作进程的姿态估计器"""
+    fake_cv2 = types.SimpleNamespace(VideoCapture=FakeCapture, CAP_PROP_FPS=5, COLOR_BGR2RGB=4,
+                                     cvtColor=FAKE_CV2.cvtColor)
+    try:
+        with fake_pose_modules(FakePose, cv2=fake_cv2, cv2_users=(batch_evaluate,)):
+            yield
+    finally:
+        batch_evaluate._estimator = None
+
+
+def create_videos(tmp_dir):
+    """创建与 VIDEOS 同名的空文件（用于修改时间），返回 {文件名: 路径}"""
+    paths = {}
+    for name in VIDEOS:
+        paths[name] = os.path.join(tmp_dir, name)
+        open(paths[name], 'w').close()
+    return paths
+
+
+def test_infer_action_view():
+    """测试从文件名推断动作和视图"""
+    print("文件名推断测试")
+    print("=" * 30)
+
+    assert infer_action_view("/data/squat_front_001.mp4") == ('squat', 'front')
+    assert infer_action_view("split_squat-side.avi") == ('split_squat', 'side')
+    assert infer_action_view("Hurdle_Step_45_user3.mov") == ('hurdle_step', '45')
+    assert infer_action_view("record_20250808.mp4", 'push_up', 'side') == ('push_up', 'side')
+    print("✓ 动作和视图推断正确，未识别时使用默认值")
+
+
+def test_list_videos():
+    """测试列出视频文件"""
+    print("\n视频文件列表测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, "sub"))
+        for name in ("b.mp4", "a.AVI", "notes.txt", os.path.join("sub", "c.mov")):
+            open(os.path.join(tmp_dir, name), 'w').close()
+
+        assert [os.path.basename(p) for p in list_videos(tmp_dir)] == ["a.AVI", "b.mp4"]
+        assert len(list_videos(tmp_dir, recursive=True)) == 3
+    print("✓ 只列出视频文件，可选包含子目录")
+
+
+def test_evaluate_video():
+    """测试单个视频的逐帧处理"""
+    print("\n单视频评估测试")
+    print("=" * 30)
+
+    with fake_video_stack():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = create_videos(tmp_dir)
+            batch_evaluate._init_worker(None)
+            base_time = os.path.getmtime(paths['squat_front.mp4'])
+
+            result = evaluate_video((paths['squat_front.mp4'], 'squat', 'front', 1, None))
+            assert result['error'] is None and result['frames'] == 5 and result['detected'] == 4
+            assert result['matrix'].shape == (4, len(result['names'])) and 'left_knee_angle' in result['names']
+            assert np.allclose(result['timestamps'], [base_time + i / FPS for i in (0, 1, 3, 4)])
+            assert result['evaluation'] is not None and result['evaluation']['score'] in (0, 1, 2, 3)
+            assert result['reps'] == 0 and 'score_counts' in result['evaluation']['metrics']['assessment']
+            print("✓ 逐帧处理，未检测到人体的帧不计入角度矩阵，时间戳按帧率换算")
+
+            result = evaluate_video((paths['squat_reps_front.mp4'], 'squat', 'front', 1, None))
+            assert result['reps'] == 2 and result['detected'] == len(SQUAT_KNEE_ANGLES)
+            assert result['evaluation']['metrics']['assessment']['rep_scores'] == [3, 3]
+            assert result['evaluation']['score'] == 3
+            assert batch_evaluate._estimator.rep_scores == (3, 3)  # 界面显示的各次评分
+            # 按全部帧评分时，下蹲过程中膝角度经过90°以下的帧会被判为屈曲不足
+            frame_scores = get_assessor('squat').score_matrix(result['names'], result['matrix'])['scores']
+            assert frame_scores.min() == 2
+            print("✓ 完整动作按次评分，视频评分取各次中的最高分")
+
+            result = evaluate_video((paths['squat_front.mp4'], 'squat', 'front', 2, None))
+            assert result['frames'] == 3 and result['detected'] == 2  # 第2帧未检测到人体
+            assert np.allclose(result['timestamps'], [base_time + i / FPS for i in (0, 4)])
+            result = evaluate_video((paths['hurdle_step_side.mp4'], 'hurdle_step', 'side', 1, 2))
+            assert result['frames'] == 2 and len(result['matrix']) == 2
+            assert batch_evaluate._estimator.rep_scores is None  # 跨栏步不计数
+            print("✓ 按帧间隔跳帧，按最大帧数截断，视频之间不保留角度历史")
+
+            assert evaluate_video((paths['broken.mp4'], 'squat', 'front', 1, None))['error'] == "无法打开视频文件"
+            assert evaluate_video((paths['crash.mp4'], 'squat', 'front', 1, None))['error'] == "解码失败"
+            print("✓ 无法打开或解码出错的视频返回错误信息")
+
+
+def test_run_batch():
+    """测试批量评估并写入数据库"""
+    print("\n批量评估测试")
+    print("=" * 30)
+
+    with fake_video_stack():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = create_videos(tmp_dir)
+            db_path = os.path.join(tmp_dir, "batch.db")
+            stats = run_batch(list(paths.values()), workers=1, db_path=db_path, commit_every=1)
+            frames = 8 + len(SQUAT_KNEE_ANGLES)
+            assert list(stats.values()) == [{'videos': 3, 'frames': frames, 'elapsed': stats[os.getpid()]['elapsed']}]
+            print("✓ 单进程模式处理全部视频，失败的视频不计入统计")
+
+            db = DatabaseManager(db_path)
+            try:
+                sessions = db.get_session_history()
+                assert sorted((s[2], s[3]) for s in sessions) == [
+                    ('hurdle_step', 'side'), ('squat', 'front'), ('squat', 'front')]
+                assert all(s[7] is not None for s in sessions)
+                rows = sorted(len(db.get_session_matrix(s[0])[2]) for s in sessions)
+                assert rows == [3, 4, len(SQUAT_KNEE_ANGLES)]
+            finally:
+                db.close()
+            print("✓ 每个视频保存为一个会话，包含帧数据和评估结果")
+
+            # 命令行指定用户后，会话和评估结果可按用户读取
+            db = DatabaseManager(db_path)
+            try:
+                user_id = db.add_user("athlete")
+            finally:
+                db.close()
+            argv = sys.argv
+            sys.argv = ["batch_evaluate.py", tmp_dir, "--workers", "1", "--db_path", db_path,
+                        "--user_id", str(user_id)]
+            try:
+                batch_evaluate.main()
+            finally:
+                sys.argv = argv
+            db = DatabaseManager(db_path)
+            try:
+                assert len(db.get_session_history(user_id=user_id)) == 3
+                assert {e['action_type'] for e in db.get_latest_evaluations(user_id)} == {'squat', 'hurdle_step'}
+            finally:
+                db.close()
+            print("✓ 命令行 --user_id 把会话关联到用户")
+
+
+if __name__ == "__main__":
+    test_infer_action_view()
+    test_list_videos()
+    test_evaluate_video()
+    test_run_batch()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试批量训练方案生成
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager import DatabaseManager
+from batch_plan_generation import TokenBucket, generate_plans, build_assessment_results
+from test_ai_assistant import start_stub_server, create_assistant
+
+
+class FakeAssistant:
+    """记录并发数的模拟AI助手，可指定失败的用户"""
+    model = "fake-model"
+
+    def __init__(self, fail_ages=()):
+        self.fail_ages = set(fail_ages)
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request_personalized_plan(self, user_profile, assessment_results):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.calls.append(user_profile['age'])
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        if user_profile['age'] in self.fail_ages:
+            raise Exception("API请求失败: 500")
+        return f"方案:{user_profile['age']}:{len(assessment_results)}"
+
+
+def create_group(db, count):
+    """创建一组带用户信息和评估结果的用户"""
+    user_ids = []
+    for i in range(count):
+        user_id = db.add_user(f"athlete{i}")
+        db.save_user_profile(user_id, {'age': 20 + i, 'gender': '男', 'goals': '提高深蹲深度'})
+        for action, score in (('squat', 2), ('squat', 3), ('hurdle_step', 1)):
+            session_id = db.start_session(action, 'front', user_id=user_id)
+            db.save_evaluation(session_id, score, "原因", 100.0, ["膝外翻明显"], {'knee_angle': 95.0, 'phase': 'x'})
+        user_ids.append(user_id)
+    return user_ids
+
+
+def test_token_bucket():
+    """测试令牌桶限速"""
+    print("令牌桶测试")
+    print("=" * 30)
+
+    bucket = TokenBucket(rate=50, capacity=2)
+    start = time.perf_counter()
+    for _ in range(7):
+        bucket.acquire()
+    elapsed = time.perf_counter() - start
+    assert 0.09 <= elapsed < 0.5
+    print(f"✓ 突发2个后按50次/秒放行，7次耗时 {elapsed:.2f} 秒")
+
+
+def test_latest_evaluations():
+    """测试读取每个动作最近一次评估"""
+    print("\n最近评估读取测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        user_id = create_group(db, 1)[0]
+        evaluations = db.get_latest_evaluations(user_id)
+        assert [(e['action_type'], e['score']) for e in evaluations] == [('hurdle_step', 1), ('squat', 3)]
+        results = build_assessment_results(evaluations)
+        assert results[1] == {'movement_name': '深蹲', 'score': 3, 'feedback': ["膝外翻明显"],
+                              'angles': {'knee_angle': 95.0}}
+        print("✓ 每个动作取最近一次评估并转换为提示词格式")
+        db.close()
+
+
+def test_generate_and_resume():
+    """测试并发上限、批量写入和断点续跑"""
+    print("\n批量生成与断点续跑测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        user_ids = create_group(db, 12)
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+
+        assistant = FakeAssistant(fail_ages={23, 27})
+        summary = generate_plans(db, assistant, concurrency=3, rate=1000, checkpoint_path=checkpoint_path,
+                                 write_every=4, progress=None)
+        assert summary['generated'] == 10 and sorted(summary['failed']) == [user_ids[3], user_ids[7]]
+        assert assistant.max_active <= 3
+        assert db.get_latest_training_plan(user_ids[0]) == "方案:20:2"
+        assert db.get_latest_training_plan(user_ids[3]) is None
+        with open(checkpoint_path, encoding='utf-8') as f:
+            assert len(json.load(f)['completed']) == 10
+        print(f"✓ 10个成功、2个失败，最大并发 {assistant.max_active}")
+
+        assistant = FakeAssistant()
+        summary = generate_plans(db, assistant, concurrency=3, rate=1000, checkpoint_path=checkpoint_path,
+                                 progress=None)
+        assert sorted(assistant.calls) == [23, 27]
+        assert (summary['generated'], summary['skipped'], summary['failed']) == (2, 10, {})
+        count = db.cursor.execute("SELECT COUNT(*) FROM training_plans").fetchone()[0]
+        assert count == 12
+        assert not os.path.exists(checkpoint_path)
+        print("✓ 续跑只重试失败的用户，每个用户只写入一个方案，全部完成后删除检查点")
+        db.close()
+
+
+def test_checkpoint_invalidation():
+    """测试有新评估或换用数据库时不跳过用户"""
+    print("\n检查点失效测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        user_ids = create_group(db, 4)
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+
+        summary = generate_plans(db, FakeAssistant(fail_ages={23}), rate=1000,
+                                 checkpoint_path=checkpoint_path, progress=None)
+        assert summary['generated'] == 3 and os.path.exists(checkpoint_path)
+
+        # 中断后用户0有了新的评估结果：续跑时重新生成用户0和失败的用户3
+        session_id = db.start_session('squat', 'front', user_id=user_ids[0])
+        db.save_evaluation(session_id, 1, "原因", 80.0, ["躯干前倾"], {'knee_angle': 120.0})
+        assistant = FakeAssistant()
+        summary = generate_plans(db, assistant, rate=1000, checkpoint_path=checkpoint_path, progress=None)
+        assert sorted(assistant.calls) == [20, 23] and summary['skipped'] == 2
+        print("✓ 有新评估结果的用户重新生成方案")
+
+        # 下一次筛查（检查点已删除）重新生成全部用户
+        assistant = FakeAssistant()
+        summary = generate_plans(db, assistant, rate=1000, checkpoint_path=checkpoint_path, progress=None)
+        assert sorted(assistant.calls) == [20, 21, 22, 23] and summary['skipped'] == 0
+        print("✓ 上次运行全部成功时不跳过任何用户")
+
+        # 另一个数据库不使用这个检查点
+        generate_plans(db, FakeAssistant(fail_ages={21}), rate=1000, checkpoint_path=checkpoint_path,
+                       progress=None)
+        other = DatabaseManager(os.path.join(tmp_dir, "other.db"))
+        create_group(other, 4)
+        assistant = FakeAssistant()
+        summary = generate_plans(other, assistant, rate=1000, checkpoint_path=checkpoint_path, progress=None)
+        assert sorted(assistant.calls) == [20, 21, 22, 23] and summary['skipped'] == 0
+        print("✓ 换用其他数据库时忽略原有检查点")
+        other.close()
+        db.close()
+
+
+def test_skip_users_without_evaluations():
+    """测试没有评估结果的用户不发送请求"""
+    print("\n无评估结果用户测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        user_ids = create_group(db, 2)
+        new_user = db.add_user("newcomer")
+        db.save_user_profile(new_user, {'age': 40, 'gender': '女', 'goals': '改善灵活性'})
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+
+        assistant = FakeAssistant()
+        messages = []
+        summary = generate_plans(db, assistant, rate=1000, checkpoint_path=checkpoint_path, progress=messages.append)
+        assert sorted(assistant.calls) == [20, 21] and summary['generated'] == 2
+        assert summary['no_evaluations'] == [new_user] and summary['skipped'] == 0
+        assert db.get_latest_training_plan(new_user) is None
+        assert any(str(new_user) in message and "没有评估结果" in message for message in messages)
+        print("✓ 没有评估结果的用户跳过并在汇总中列出")
+
+        # 有了评估结果后正常生成
+        session_id = db.start_session('squat', 'front', user_id=new_user)
+        db.save_evaluation(session_id, 2, "原因", 90.0, [], {'knee_angle': 100.0})
+        assistant = FakeAssistant()
+        summary = generate_plans(db, assistant, rate=1000, user_ids=[new_user], progress=None)
+        assert assistant.calls == [40] and summary['no_evaluations'] == []
+        print("✓ 完成评估后生成方案")
+        db.close()
+
+
+def test_generate_with_http():
+    """测试通过本地模拟服务器批量生成"""
+    print("\nHTTP批量生成测试")
+    print("=" * 30)
+
+    server = start_stub_server()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        user_ids = create_group(db, 4)
+        with create_assistant(server) as assistant:
+            summary = generate_plans(db, assistant, concurrency=2, rate=1000, progress=None)
+        assert summary['generated'] == 4
+        plan = db.get_latest_training_plan(user_ids[2])
+        assert plan.startswith("方案:") and "年龄：22岁" in plan and "动作名称：深蹲" in plan
+        print("✓ 方案按用户写入数据库")
+        db.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_latest_evaluations()
+    test_generate_and_resume()
+    test_checkpoint_invalidation()
+    test_skip_users_without_evaluations()
+    test_generate_with_http()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试数据库管理器
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager import DatabaseManager, AsyncFrameWriter
+
+
+def test_async_frame_writer():
+    """测试后台批量写入和结束会话时的刷新"""
+    print("异步帧写入测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        db.start_frame_writer(batch_size=16, flush_interval=10.0)
+        session_id = db.start_session("squat", "front")
+
+        for i in range(100):
+            assert db.log_frame_data_async(session_id, {'left_knee_angle': float(i)})
+        db.stop_session(session_id)
+
+        frames = db.get_session_data(session_id)['frame_data']
+        assert len(frames) == 100
+        assert [f['data']['left_knee_angle'] for f in frames] == [float(i) for i in range(100)]
+        assert db.frame_writer.written_frames == 100
+        print("✓ 结束会话时全部帧已写入且顺序正确")
+
+        # 未攒满一批的帧在时间上限到达后写入
+        db.frame_writer.flush_interval = 0.05
+        session_id = db.start_session("squat", "side")
+        db.log_frame_data_async(session_id, {'left_knee_angle': 1.0})
+        deadline = time.time() + 2.0
+        while db.frame_writer.written_frames < 101 and time.time() < deadline:
+            time.sleep(0.01)
+        assert db.frame_writer.written_frames == 101
+        print("✓ 按时间上限写入未满批次")
+
+        db.close()
+        assert db.frame_writer is None
+
+
+def test_frame_writer_backpressure():
+    """测试队列满时的背压和丢帧计数"""
+    print("\n写入队列背压测试")
+    print("=" * 30)
+
+    writer = AsyncFrameWriter(":memory:", max_queue_size=2, put_timeout=0.01)
+    # 未启动写入线程，队列无法被消费
+    assert writer.submit(1, {'a': 1.0})
+    assert writer.submit(1, {'a': 2.0})
+    start = time.time()
+    assert not writer.submit(1, {'a': 3.0})
+    assert time.time() - start >= 0.01
+    assert writer.dropped_frames == 1
+    print("✓ 队列满时阻塞等待后丢弃")
+
+
+def test_wal_and_thread_connections():
+    """测试WAL模式和按线程分配的连接"""
+    print("\nWAL与连接池测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        assert db.connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert db.connection.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        print("✓ 已启用WAL和synchronous=NORMAL")
+
+        session_id = db.start_session("squat", "front")
+        main_connection = db.connection
+        seen = {}
+
+        def worker():
+            seen['connection'] = db.connection
+            seen['history'] = db.get_session_history()
+            db.release_connection()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert seen['connection'] is not main_connection
+        assert seen['history'][0][0] == session_id
+        assert db.connection is main_connection
+        print("✓ 各线程使用独立连接，释放后可复用")
+
+        # 写事务未提交时读线程仍可查询已提交数据
+        db.connection.execute("BEGIN IMMEDIATE")
+        db.cursor.execute("INSERT INTO sessions (action_type, view_type) VALUES ('squat', 'side')")
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert len(seen['history']) == 1
+        db.connection.commit()
+        print("✓ 写事务进行中读取不被阻塞")
+
+        db.close()
+
+
+def test_binary_frame_storage():
+    """测试二进制帧块存储、矩阵读取和JSON迁移"""
+    print("\n二进制帧存储测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        session_id = db.start_session("squat", "front")
+
+        # 旧格式JSON行（早于新写入的帧）
+        for i in range(3):
+            db.cursor.execute(
+                "INSERT INTO frame_data (session_id, timestamp, data_json) VALUES (?, ?, ?)",
+                (session_id, f"2025-01-01 10:00:0{i}.000",
+                 json.dumps({'视图': 'front', 'left_knee_angle': 100.0 + i}))
+            )
+        db.connection.commit()
+
+        frames = [{'视图': 'front', 'left_knee_angle': 90.0 + i, 'trunk_angle': None if i == 1 else 5.0}
+                  for i in range(4)]
+        db.log_batch_frame_data(session_id, frames)
+        db.log_frame_data(session_id, {'right_knee_angle': 80.0, 'phase': 'bottom'})
+
+        names, timestamps, matrix = db.get_session_matrix(session_id)
+        assert names == ['left_knee_angle', 'trunk_angle', 'right_knee_angle']
+        assert matrix.dtype == np.float32 and matrix.shape == (8, 3)
+        assert np.all(np.diff(timestamps) >= 0)
+        assert matrix[:3, 0].tolist() == [100.0, 101.0, 102.0]
+        assert np.isnan(matrix[4, 1]) and matrix[7, 2] == 80.0
+        print("✓ 新旧格式合并为按时间排序的float32矩阵")
+
+        data = db.get_session_data(session_id)['frame_data']
+        assert data[0] == {'timestamp': "2025-01-01 10:00:00.000",
+                           'data': {'视图': 'front', 'left_knee_angle': 100.0}}
+        assert data[4]['data'] == {'视图': 'front', 'left_knee_angle': 91.0, 'trunk_angle': None}
+        assert data[7]['data'] == {'right_knee_angle': 80.0, 'phase': 'bottom'}
+        print("✓ get_session_data 保持原有字典格式")
+
+        summary = db.migrate_json_frames()
+        assert summary == {'sessions': 1, 'frames': 3, 'chunks': 1}
+        assert db.cursor.execute("SELECT COUNT(*) FROM frame_data").fetchone()[0] == 0
+        assert db.get_session_data(session_id)['frame_data'] == data
+        migrated_names, _, migrated = db.get_session_matrix(session_id)
+        assert migrated_names == ['left_knee_angle', 'trunk_angle', 'right_knee_angle']
+        np.testing.assert_array_equal(migrated, matrix)
+        print("✓ JSON帧迁移后数据不变")
+
+        db.close()
+
+
+def test_streaming_session_reader():
+    """测试流式读取会话数据"""
+    print("\n流式读取测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        session_id = db.start_session("squat", "side")
+        db.cursor.execute(
+            "INSERT INTO frame_data (session_id, timestamp, data_json) VALUES (?, ?, ?)",
+            (session_id, "2025-01-01 10:00:00.000", json.dumps({'knee_angle': 1.0, 'extra': 'x'}))
+        )
+        db.connection.commit()
+        for i in range(9):
+            db.log_batch_frame_data(session_id, [{'knee_angle': float(i * 10 + j), 'hip_angle': 2.0}
+                                                 for j in range(10)])
+
+        frames = list(db.iter_session_frames(session_id, batch_size=4))
+        assert frames == db.get_session_data(session_id)['frame_data']
+        print("✓ 逐帧迭代结果与 get_session_data 相同")
+
+        assert db.get_session_metric_names(session_id) == ['knee_angle', 'hip_angle']
+        chunks = list(db.iter_session_chunks(session_id, chunk_size=32))
+        assert [len(matrix) for _, _, matrix in chunks] == [32, 32, 27]
+        assert all(names == ['knee_angle', 'hip_angle'] for names, _, _ in chunks)
+        names, timestamps, matrix = db.get_session_matrix(session_id)
+        np.testing.assert_array_equal(np.concatenate([m for _, _, m in chunks]), matrix)
+        np.testing.assert_array_equal(np.concatenate([t for _, t, _ in chunks]), timestamps)
+        print("✓ 固定大小分块拼接后与完整矩阵一致")
+
+        # 迭代过程中执行其他查询不影响迭代
+        iterator = db.iter_session_frames(session_id)
+        next(iterator)
+        db.get_session_history()
+        assert len(list(iterator)) == 90
+        print("✓ 迭代使用独立游标")
+
+        db.close()
+
+
+def test_save_session_results():
+    """测试批量写入完整会话"""
+    print("\n批量写入会话测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+        matrix = np.arange(2500 * 2, dtype=np.float32).reshape(2500, 2)
+        results = [
+            {'action_type': 'squat', 'view_type': 'side', 'names': ['knee_angle', 'hip_angle'],
+             'timestamps': 1.7e9 + np.arange(2500) / 30.0, 'matrix': matrix,
+             'evaluation': {'score': 2, 'reason': '基本完成', 'similarity': 90.0,
+                            'compensations': ['躯干前倾过度'], 'metrics': {'frames': 2500}}},
+            {'action_type': 'hurdle_step', 'view_type': 'front', 'names': [],
+             'timestamps': [], 'matrix': np.empty((0, 0)), 'evaluation': None},
+        ]
+        session_ids = db.save_session_results(results)
+        assert len(session_ids) == 2
+
+        names, timestamps, loaded = db.get_session_matrix(session_ids[0])
+        assert names == ['knee_angle', 'hip_angle']
+        np.testing.assert_array_equal(loaded, matrix)
+        assert db.cursor.execute("SELECT COUNT(*) FROM frame_chunks WHERE session_id = ?",
+                                 (session_ids[0],)).fetchone()[0] == 3
+        evaluation = db.get_session_data(session_ids[0])['evaluation']
+        assert evaluation[2] == 2 and json.loads(evaluation[5]) == ['躯干前倾过度']
+        assert db.get_session_data(session_ids[1])['frame_data'] == []
+        print("✓ 会话、帧数据和评估结果在一个事务中写入")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    test_async_frame_writer()
+    test_frame_writer_backpressure()
+    test_wal_and_thread_connections()
+    test_binary_frame_storage()
+    test_streaming_session_reader()
+    test_save_session_results()
@@ -7,6 +7,7 @@
 
 import sys
 import os
+import numpy as np
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -19,7 +20,12 @@ from fms_assessors import (
     ActiveLegRaiseAssessor,
     TrunkPushupAssessor,
     RotaryStabilityAssessor,
-    BaseAssessor
+    BaseAssessor,
+    ASSESSORS,
+    get_assessor,
+    Condition,
+    Rule,
+    RuleSet
 )
 
 def test_imports():
@@ -106,7 +112,159 @@ def test_squat_assessor():
     except Exception as e:
         print(f"✗ 深蹲评估器测试失败: {e}")
 
+def test_assess_stream():
+    """测试分块流式评估"""
+    print("\n流式评估测试")
+    print("=" * 50)
+
+    assessor = SquatAssessor()
+    names = ['left_hip_angle', 'right_hip_angle', 'left_knee_angle', 'right_knee_angle', 'knee_valgus']
+    good = [130.0, 130.0, 100.0, 100.0, 5.0]
+    shallow = [130.0, 130.0, 80.0, 100.0, 5.0]
+    valgus = [130.0, 130.0, 100.0, 100.0, 20.0]
+    chunks = [
+        (names, np.arange(3.0), np.array([good, good, shallow], dtype=np.float32)),
+        (names, np.arange(3.0, 5.0), np.array([good, valgus], dtype=np.float32)),
+    ]
+
+    result = assessor.assess_stream(iter(chunks), min_fraction=0.0)
+    assert result['score'] == 1
+    assert result['parameters']['frames'] == 5
+    assert result['parameters']['score_counts'] == {3: 3, 2: 1, 1: 1}
+    assert result['compensations'] == ["膝关节屈曲不足", "膝外翻明显"]
+    assert len(assessor.get_history()) == 1
+    print("✓ 汇总评分与代偿计数正确，历史记录只保留汇总结果")
+
+    result = assessor.assess_stream(iter(chunks), min_fraction=0.5)
+    assert result['score'] == 3
+    assert result['compensations'] == []
+    print("✓ min_fraction 忽略偶发帧")
+
+    # 默认忽略孤立的噪声帧：900帧中1帧异常不应把评分拉到1分
+    noisy = np.array([good] * 899 + [valgus], dtype=np.float32)
+    result = assessor.assess_stream([(names, None, noisy)])
+    assert result['score'] == 3 and result['parameters']['score_counts'] == {3: 899, 1: 1}
+    print("✓ 默认忽略孤立的噪声帧")
+
+def test_assessor_registry():
+    """测试动作键到评估器的注册表"""
+    print("\n评估器注册表测试")
+    print("=" * 50)
+
+    assert isinstance(get_assessor('squat'), SquatAssessor)
+    assert isinstance(get_assessor('split_squat'), InlineLungeAssessor)
+    assert all(issubclass(cls, BaseAssessor) for cls in ASSESSORS.values())
+    try:
+        get_assessor('unknown')
+        assert False, "未知动作应抛出ValueError"
+    except ValueError:
+        pass
+    print("✓ 注册表覆盖全部动作，未知动作抛出ValueError")
+
+def test_assess_reps():
+    """测试逐次评估与会话汇总"""
+    print("\n逐次评估测试")
+    print("=" * 50)
+
+    assessor = SquatAssessor()
+    names = ['trunk_angle', 'hip_angle', 'knee_angle', 'ankle_angle', 'heel_lift']
+    knee = np.concatenate([np.linspace(170, 80, 20), np.linspace(80, 170, 20)])
+
+    def rep(trunk_peak, heel_peak, bottom=80):
+        depth = np.interp(knee, [80, 170], [bottom, 170])
+        trunk = np.interp(knee, [80, 170], [trunk_peak, 5])
+        return np.column_stack([trunk, depth + 10, depth, np.interp(depth, [80, 170], [60, 90]),
+                                np.interp(knee, [80, 170], [heel_peak, 0])])
+
+    reduced = assessor.reduce_rep(names, rep(40, 2))
+    assert reduced['knee_angle'] == 80.0 and reduced['trunk_angle'] == 40.0
+    print("✓ 膝角度取最大屈曲，躯干前倾取最大值")
+
+    # 最后一帧回到站立位，只看最后一帧会漏掉底部的代偿
+    assert assessor.assess(dict(zip(names, rep(40, 2)[-1])), {})['score'] == 3
+    result = assessor.assess_reps([(names, rep(10, 2)), (names, rep(40, 2)), (names, rep(10, 8))])
+    assert result['parameters']['rep_scores'] == [3, 2, 1]
+    assert result['score'] == 3 and result['parameters']['min_score'] == 1
+    assert result['parameters']['compensation_counts'] == {"躯干前倾过度": 1, "脚跟离地明显": 1}
+    assert result['reps'][1]['parameters']['rep_metrics']['trunk_angle'] == 40.0
+    print(f"✓ 每次评分 {result['parameters']['rep_scores']}，会话评分取最高分 {result['score']}")
+
+    # 逐次评估看一次动作中达到的最大屈曲：蹲得越深评分不应越低
+    deep = assessor.assess_rep(names, rep(10, 2))
+    shallow = assessor.assess_rep(names, rep(10, 2, bottom=115))
+    assert deep['score'] == 3 and shallow['score'] == 2 and deep['score'] >= shallow['score']
+    assert shallow['compensations'] == ["髋关节屈曲不足", "膝关节屈曲不足", "踝关节背屈不足"]
+    front = ['left_hip_angle', 'right_hip_angle', 'left_knee_angle', 'right_knee_angle']
+    # 全蹲（膝80°、髋85°）与半蹲（膝115°、髋125°）
+    full_depth = assessor.assess_rep(front, np.linspace([170, 170, 170, 170], [85, 85, 80, 80], 20))
+    half_depth = assessor.assess_rep(front, np.linspace([170, 170, 170, 170], [125, 125, 115, 115], 20))
+    assert full_depth['score'] == 3 and half_depth['score'] == 2
+    print(f"✓ 深蹲评分 {deep['score']} ≥ 半蹲评分 {shallow['score']}（正面视角 {full_depth['score']} ≥ {half_depth['score']}）")
+
+    hurdle = HurdleStepAssessor()
+    hurdle_names = ['hip_angle', 'knee_angle', 'ankle_dorsiflexion', 'trunk_inclination']
+    high_step = hurdle.assess_rep(hurdle_names, np.linspace([170, 170, 15, 2], [80, 80, 15, 2], 20))
+    low_step = hurdle.assess_rep(hurdle_names, np.linspace([170, 170, 15, 2], [120, 120, 15, 2], 20))
+    assert high_step['score'] == 3 and low_step['score'] == 2
+    print(f"✓ 跨栏步逐次评估同样按最大屈曲评分（{high_step['score']} ≥ {low_step['score']}）")
+
+    matrix = rep(10, 2)
+    matrix[:, 4] = np.nan
+    assert 'heel_lift' not in assessor.reduce_rep(names, matrix)
+    print("✓ 整段缺失的指标不参与评估")
+
+def test_rule_engine():
+    """测试规则引擎的逐帧与向量化评分"""
+    print("\n规则引擎测试")
+    print("=" * 50)
+
+    rules = RuleSet([
+        Rule((Condition('a', '<', 10), Condition('b', '>', 5, 0)), 2, "a或b异常"),
+        Rule((Condition('c', 'abs>', 3),), 1, "c偏差: {c:.1f}"),
+    ], reasons={3: "良好", 2: "轻微代偿", 1: "明显代偿"})
+    assert rules.evaluate({'a': 20}) == (3, ["良好"], [])
+    assert rules.evaluate({'a': 20, 'b': 6}) == (2, ["轻微代偿"], ["a或b异常"])
+    assert rules.evaluate({'c': -4}) == (1, ["明显代偿"], ["a或b异常", "c偏差: -4.0"])
+    scores, triggered = rules.evaluate_matrix(['a', 'b', 'c'], np.array([
+        [20, np.nan, 0], [20, 6, 0], [np.nan, np.nan, -4]]))
+    assert scores.tolist() == [3, 2, 1]
+    assert triggered.tolist() == [[False, False], [True, False], [True, True]]
+    print("✓ 条件取“或”，NaN使用默认值，评分取各规则上限的最小值")
+
+    # 主动直腿上抬：大腿角度分档和带数值的代偿描述
+    result = ActiveLegRaiseAssessor().assess({'thigh_angle': 65.0, 'pelvis_tilt': -12.0}, {})
+    assert result['score'] == 2
+    assert result['compensations'] == ["大腿抬升角度不足: 65.0°", "骨盆倾斜过度"]
+    assert result['reasons'] == ["主动直腿上抬动作基本完成，大腿抬升角度为65.0°，存在轻微代偿"]
+    assert ActiveLegRaiseAssessor().assess({'thigh_angle': 55.0}, {})['score'] == 1
+    assert SquatAssessor().assess({'knee_angle': 80.0}, {}) == {
+        'score': 3, 'reasons': [], 'compensations': [], 'similarity': 100.0}
+    print("✓ 分档规则、数值模板和无法判断视角时的结果与原实现一致")
+
+    # 1万帧会话：向量化评分与逐帧评估一致
+    rng = np.random.default_rng(0)
+    for action in ASSESSORS:
+        assessor = get_assessor(action)
+        names = sorted({c.metric for rule_set in getattr(assessor, 'VIEW_RULES', {None: assessor.RULES}).values()
+                        for rule in rule_set.rules for c in rule.conditions})
+        matrix = rng.uniform(-30, 200, (10000, len(names)))
+        matrix[rng.random(matrix.shape) < 0.2] = np.nan
+        scored = assessor.score_matrix(names, matrix)
+        expected = [assessor.assess({n: v for n, v in zip(names, row) if v == v}, {})['score']
+                    for row in matrix.tolist()]
+        assert scored['scores'].tolist() == expected, action
+
+        chunks = [(names, None, matrix[i:i + 2048]) for i in range(0, len(matrix), 2048)]
+        fast = assessor.assess_stream(chunks, min_fraction=0.05)
+        assessor.matrix_rule_sets = lambda names, matrix: None  # 强制逐帧评估
+        assert assessor.assess_stream(chunks, min_fraction=0.05) == fast, action
+    print("✓ 1万帧会话的向量化评分与逐帧评估结果一致")
+
 if __name__ == "__main__":
     test_imports()
     test_squat_assessor()
+    test_assess_stream()
+    test_assessor_registry()
+    test_assess_reps()
+    test_rule_engine()
     print("\n测试完成")
\ No newline at end of file
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试采集/推理流水线
+"""
+
+import sys
+import os
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from frame_pipeline import DropOldestQueue, FramePipeline
+
+
+class FakeCapture:
+    """模拟摄像头，按固定间隔返回递增的帧编号"""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.index = 0
+
+    def read(self):
+        time.sleep(self.interval)
+        self.index += 1
+        return True, self.index
+
+
+def test_drop_oldest_queue():
+    """测试队满时丢弃最旧元素"""
+    print("有界队列测试")
+    print("=" * 30)
+
+    queue = DropOldestQueue(maxsize=2)
+    for i in range(5):
+        queue.put(i)
+    assert len(queue) == 2
+    assert queue.dropped == 3
+    assert queue.get(timeout=0) == 3
+    print("✓ 队满丢弃最旧元素")
+
+    queue.put(5)
+    queue.put(6)
+    assert queue.get_latest() == 6
+    assert len(queue) == 0
+    assert queue.get(timeout=0) is None
+    print("✓ 获取最新元素并清空队列")
+
+
+def test_frame_pipeline():
+    """测试流水线各阶段协作和延迟计数"""
+    print("\n采集/推理流水线测试")
+    print("=" * 30)
+
+    def processor(frame):
+        # 模拟较慢的推理，迫使采集队列丢帧
+        time.sleep(0.01)
+        return frame * 10, {'frame': frame}
+
+    pipeline = FramePipeline(FakeCapture(), processor, queue_size=2)
+    pipeline.start()
+
+    packets = []
+    deadline = time.time() + 2.0
+    while len(packets) < 5 and time.time() < deadline:
+        packet = pipeline.poll()
+        if packet is not None:
+            pipeline.record_ui_latency(packet, 0.001)
+            packets.append(packet)
+        time.sleep(0.005)
+    pipeline.stop()
+
+    assert len(packets) >= 5, "流水线未产生足够的结果"
+    assert all(p.image == p.angles['frame'] * 10 for p in packets)
+    assert [p.frame_id for p in packets] == sorted(p.frame_id for p in packets)
+    print(f"✓ UI阶段获取结果数: {len(packets)}")
+
+    stats = pipeline.stats()
+    assert stats['inference']['count'] >= 5
+    assert stats['ui']['count'] == len(packets)
+    assert stats['capture']['dropped'] > 0
+    assert not pipeline.is_running
+    print(f"✓ 延迟统计: {stats}")
+
+
+def test_landmark_packets():
+    """测试处理函数返回关键点时随结果一起交给UI阶段"""
+    print("\n关键点传递测试")
+    print("=" * 30)
+
+    pipeline = FramePipeline(FakeCapture(), lambda frame: (frame, None, [frame] * 3))
+    pipeline.start()
+    packet = None
+    deadline = time.time() + 2.0
+    while packet is None and time.time() < deadline:
+        packet = pipeline.poll()
+        time.sleep(0.005)
+    pipeline.stop()
+
+    assert packet is not None and packet.landmarks == [packet.image] * 3
+    print("✓ 结果包携带关键点")
+
+    pipeline = FramePipeline(FakeCapture(), lambda frame: (frame, None))
+    pipeline.start()
+    packet = None
+    deadline = time.time() + 2.0
+    while packet is None and time.time() < deadline:
+        packet = pipeline.poll()
+        time.sleep(0.005)
+    pipeline.stop()
+    assert packet is not None and packet.landmarks is None and packet.reps is None
+    print("✓ 只返回图像和角度时关键点为None")
+
+    pipeline = FramePipeline(FakeCapture(), lambda frame: (frame, None, None, (3, 2)))
+    pipeline.start()
+    packet = None
+    deadline = time.time() + 2.0
+    while packet is None and time.time() < deadline:
+        packet = pipeline.poll()
+        time.sleep(0.005)
+    pipeline.stop()
+    assert packet is not None and packet.reps == (3, 2)
+    print("✓ 结果包携带各次评分")
+
+
+if __name__ == "__main__":
+    test_drop_oldest_queue()
+    test_frame_pipeline()
+    test_landmark_packets()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试自适应推理调度
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from inference_scheduler import InferenceScheduler, InferenceWindow
+from test_support import fake_pose_modules, landmark_list, pose_result
+
+
+def person(x0, y0, x1, y1, count=33):
+    """生成分布在给定矩形内的归一化关键点"""
+    t = np.linspace(0, 1, count)
+    return np.column_stack([x0 + (x1 - x0) * t, y0 + (y1 - y0) * t[::-1], np.zeros(count)])
+
+
+def test_window_and_roi():
+    """测试推理区域计算和ROI跟踪"""
+    print("推理区域与ROI测试")
+    print("=" * 30)
+
+    window = InferenceWindow(100, 50, 300, 450, 640, 480, scale=0.5)
+    assert window.input_size == (100, 200) and not window.is_full_frame
+    mapped = window.to_frame(np.array([[0.0, 0.0, 0.1], [1.0, 1.0, 0.0], [0.5, 0.5, 0.0]]))
+    assert np.allclose(mapped[0], [100 / 640, 50 / 480, 0.1 * 200 / 640])
+    assert np.allclose(mapped[1, :2], [300 / 640, 450 / 480])
+    assert np.allclose(mapped[2, :2], [200 / 640, 250 / 480])
+    print("✓ 裁剪输入中的坐标换算回原始帧")
+
+    scheduler = InferenceScheduler(inference_size=320, roi_margin=0.25, min_roi_fraction=0.2)
+    window = scheduler.plan(1280, 720)
+    assert window.is_full_frame and window.scale == 0.25 and window.input_size == (320, 180)
+    print("✓ 没有ROI时使用完整画面并按长边缩小")
+
+    scheduler.update(person(0.4, 0.2, 0.6, 0.8), timestamp=0.0)
+    roi = scheduler.stats()['roi']
+    assert roi is not None and roi[0] < 0.4 and roi[2] > 0.6 and roi[1] < 0.2 and roi[3] > 0.8
+    window = scheduler.plan(1280, 720)
+    assert not window.is_full_frame
+    assert window.scale == 320 / max(window.x1 - window.x0, window.y1 - window.y0) > 0.25
+    print(f"✓ 按关键点包围盒裁剪: {tuple(round(v, 3) for v in roi)}")
+
+    scheduler.update(person(0.42, 0.22, 0.62, 0.82), timestamp=0.03)
+    assert scheduler.stats()['roi'] == roi
+    scheduler.update(person(0.1, 0.2, 0.3, 0.8), timestamp=0.06)
+    moved = scheduler.stats()['roi']
+    assert moved != roi and moved[0] < 0.1
+    print("✓ 小幅移动时裁剪框不变，离开裁剪框后重新定位")
+
+    scheduler.update(person(0.0, 0.0, 1.0, 1.0), timestamp=0.09)
+    assert scheduler.stats()['roi'] is None
+    scheduler.update(person(0.4, 0.2, 0.6, 0.8), timestamp=0.12)
+    scheduler.update(None, timestamp=0.15)
+    assert scheduler.stats()['roi'] is None and scheduler.predict(0.18) is None
+    print("✓ 人物占满画面或未检测到时回到完整画面")
+
+    frame = np.arange(48 * 64 * 3, dtype=np.uint8).reshape(48, 64, 3)
+    scheduler = InferenceScheduler(inference_size=None)
+    image, window = scheduler.prepare(frame)
+    assert image is frame and window.is_full_frame
+    scheduler.update(person(0.5, 0.5, 0.7, 0.9), timestamp=0.0)
+    image, window = scheduler.prepare(frame)
+    assert np.shares_memory(image, frame) and image.shape == (window.y1 - window.y0, window.x1 - window.x0, 3)
+    print("✓ 裁剪使用原图像的视图，不复制")
+
+
+def test_frame_skipping():
+    """测试按推理耗时跳帧和关键点外推"""
+    print("\n跳帧与外推测试")
+    print("=" * 30)
+
+    scheduler = InferenceScheduler(latency_budget=0.030, smoothing=1.0, max_skip_interval=3)
+    scheduler.record_latency(0.020)
+    assert scheduler.skip_interval == 1
+    assert [scheduler.should_infer() for _ in range(3)] == [True, True, True]
+    print("✓ 耗时在预算内时每帧推理")
+
+    scheduler.update(person(0.4, 0.2, 0.6, 0.8), timestamp=0.0)
+    scheduler.record_latency(0.050)
+    assert scheduler.skip_interval == 2
+    # 刚推理过一帧，下一帧跳过
+    assert [scheduler.should_infer() for _ in range(4)] == [False, True, False, True]
+    scheduler.record_latency(0.200)
+    assert scheduler.skip_interval == 3
+    print("✓ 超出预算时隔帧推理，跳帧间隔不超过上限")
+
+    scheduler.record_latency(0.055)
+    assert scheduler.skip_interval == 3  # 接近需要2帧时保持不变
+    scheduler.record_latency(0.040)
+    assert scheduler.skip_interval == 2
+    scheduler.record_latency(0.020)
+    assert scheduler.skip_interval == 1
+    print("✓ 耗时明显下降后逐步减少跳帧，直至逐帧推理")
+
+    scheduler.update(person(0.4, 0.2, 0.6, 0.8), timestamp=0.0)
+    scheduler.update(person(0.5, 0.2, 0.7, 0.8), timestamp=0.1)
+    predicted = scheduler.predict(0.15)
+    assert np.allclose(predicted, person(0.55, 0.2, 0.75, 0.8))
+    assert np.allclose(scheduler.predict(1.0), person(0.6, 0.2, 0.8, 0.8))
+    print("✓ 跳过的帧按最近两次结果线性外推，外推距离有上限")
+
+    visible = np.column_stack([person(0.4, 0.2, 0.6, 0.8), np.full(33, 0.3)])
+    scheduler.update(visible, timestamp=0.2)
+    scheduler.update(np.column_stack([person(0.5, 0.2, 0.7, 0.8), np.full(33, 0.8)]), timestamp=0.3)
+    predicted = scheduler.predict(0.35)
+    assert predicted.shape == (33, 4) and np.allclose(predicted[:, 3], 0.8)
+    assert np.allclose(predicted[:, :3], person(0.55, 0.2, 0.75, 0.8))
+    print("✓ 外推只作用于坐标，可见度沿用最近一次推理")
+
+
+def test_pose_estimator_scheduling():
+    """测试姿态估计器使用调度器裁剪和跳帧"""
+    print("\n姿态估计器调度测试")
+    print("=" * 30)
+
+    inputs = []
+
+    class FakePose:
+        def __init__(self, **kwargs):
+            pass
+
+        def process(self, image):
+            inputs.append(image.shape)
+            points = person(0.4, 0.2, 0.6, 0.8) if len(inputs) == 1 else person(0.0, 0.0, 1.0, 1.0)
+            return pose_result(landmark_list(points))
+
+    with fake_pose_modules(FakePose) as pose_estimator:
+        scheduler = InferenceScheduler(latency_budget=None)
+        # heavy档位不缩小推理输入（档位的推理输入尺寸会覆盖调度器的设置）
+        estimator = pose_estimator.PoseEstimator(scheduler=scheduler, profile='heavy')
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        image, angles = estimator.process_frame(frame, draw=False, timestamp=0.0)
+        assert image is frame and inputs[0] == (480, 640, 3) and angles
+        _, cropped_angles = estimator.process_frame(frame, draw=False, timestamp=0.033)
+        assert inputs[1][:2] < (480, 640) and scheduler.stats()['cropped'] == 1
+        # 裁剪输入中占满画面的关键点换算回原始帧后与第一帧基本相同（裁剪框取整到像素）
+        assert all(abs(cropped_angles[name] - angles[name]) < 0.01 for name in angles)
+        print("✓ 第二帧按ROI裁剪推理，关键点换算回原始帧")
+
+        scheduler.latency_budget = 0.001
+        scheduler.latency = None
+        scheduler.record_latency(0.0015)
+        assert scheduler.skip_interval == 2
+        _, skipped_angles = estimator.process_frame(frame, draw=False, timestamp=0.066)
+        _, inferred_angles = estimator.process_frame(frame, draw=False, timestamp=0.1)
+        assert len(inputs) == 3 and scheduler.stats()['skipped'] == 1
+        assert skipped_angles and inferred_angles and len(estimator.angle_history) == 4
+        assert all(abs(skipped_angles[name] - angles[name]) < 0.01 for name in angles)
+        print("✓ 跳过的帧不调用模型，仍输出角度并记录历史")
+
+
+if __name__ == "__main__":
+    test_window_and_roi()
+    test_frame_skipping()
+    test_pose_estimator_scheduling()
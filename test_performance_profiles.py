@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试性能档位选择和校准
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pose_estimator
+from inference_scheduler import InferenceScheduler
+from performance_profiles import PROFILES, ProfileStore, calibrate, choose_profile, device_id, get_profile
+from test_support import fake_pose_modules, pose_result
+
+# 各模型复杂度每帧的模拟推理耗时（秒）
+MODEL_DELAYS = {0: 0.002, 1: 0.012, 2: 0.04}
+
+
+class FakePose:
+    """按模型复杂度模拟推理耗时的姿态模型"""
+
+    created = []
+
+    def __init__(self, **options):
+        self.options = options
+        self.closed = False
+        FakePose.created.append(self)
+
+    def process(self, image):
+        time.sleep(MODEL_DELAYS[self.options['model_complexity']])
+        return pose_result()
+
+    def close(self):
+        self.closed = True
+
+
+class UnavailablePose(FakePose):
+    """部分模型复杂度无法创建的姿态模型（模拟离线时无法下载的模型）"""
+
+    unavailable = {2}
+
+    def __init__(self, **options):
+        if options['model_complexity'] in UnavailablePose.unavailable:
+            raise OSError("模型文件下载失败")
+        super().__init__(**options)
+
+
+def test_profiles():
+    """测试档位参数和切换"""
+    print("性能档位测试")
+    print("=" * 30)
+
+    assert [PROFILES[name].model_complexity for name in ('lite', 'full', 'heavy')] == [0, 1, 2]
+    assert get_profile(PROFILES['lite']) is PROFILES['lite']
+    try:
+        get_profile('ultra')
+        assert False, "未知档位应抛出异常"
+    except ValueError:
+        pass
+    print("✓ lite / full / heavy 对应模型复杂度 0 / 1 / 2")
+
+    FakePose.created.clear()
+    scheduler = InferenceScheduler(inference_size=None)
+    with fake_pose_modules(FakePose):
+        estimator = pose_estimator.PoseEstimator(scheduler=scheduler, profile='lite')
+        assert FakePose.created[0].options == PROFILES['lite'].pose_options()
+        assert scheduler.inference_size == PROFILES['lite'].inference_size
+        print("✓ 按档位创建模型并设置推理输入尺寸")
+
+        estimator.set_profile('heavy')
+        assert FakePose.created[0].closed and not estimator.model_ready
+        assert scheduler.inference_size is None
+        estimator.warm_up()
+        assert FakePose.created[-1].options['model_complexity'] == 2
+        estimator.set_profile(PROFILES['heavy'])
+        assert estimator.model_ready and len(FakePose.created) == 2
+        print("✓ 切换档位时重建模型，参数相同时保留模型")
+
+
+def test_calibration_and_store():
+    """测试校准和按设备保存"""
+    print("\n性能校准测试")
+    print("=" * 30)
+
+    frames = [np.zeros((48, 64, 3), dtype=np.uint8)] * 8
+    with fake_pose_modules(FakePose):
+        estimator = pose_estimator.PoseEstimator(scheduler=InferenceScheduler())
+        result = calibrate(estimator, frames, target_fps=40)
+        assert result['profile'] == 'full' and list(result['fps']) == ['heavy', 'full']
+        assert result['fps']['heavy'] < 40 <= result['fps']['full']
+        assert estimator.profile.name == 'full' and estimator.scheduler.latency_budget == 1 / 30
+        assert len(estimator.angle_history) == 0
+        print(f"✓ 选择达到目标帧率的最高档位: "
+              f"{', '.join(f'{k} {v:.0f} FPS' for k, v in result['fps'].items())}")
+
+        assert calibrate(estimator, frames, target_fps=10000)['profile'] == 'lite'
+        print("✓ 都达不到目标时选择最快的档位")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ProfileStore(os.path.join(tmp_dir, "profiles", "device.json"))
+            reads = []
+
+            def read_frames():
+                reads.append(1)
+                return frames
+
+            assert choose_profile(estimator, read_frames, store, target_fps=40) == ('full', True)
+            estimator.set_profile('lite')
+            assert choose_profile(estimator, read_frames, store, target_fps=40) == ('full', False)
+            assert estimator.profile.name == 'full' and len(reads) == 1
+            with open(store.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            assert saved[device_id()]['profile'] == 'full' and 'calibrated_at' in saved[device_id()]
+            print("✓ 校准结果按设备保存，下次直接使用")
+
+            assert choose_profile(estimator, read_frames, store, target_fps=10000) == ('lite', True)
+            assert len(reads) == 2
+            print("✓ 目标帧率改变时重新校准")
+
+            with open(store.path, 'w', encoding='utf-8') as f:
+                f.write("{损坏")
+            assert store.get() is None
+            print("✓ 档位文件损坏时视为未校准")
+
+
+def test_calibration_failures():
+    """测试档位不可用时的校准"""
+    print("\n档位不可用测试")
+    print("=" * 30)
+
+    frames = [np.zeros((48, 64, 3), dtype=np.uint8)] * 8
+    with fake_pose_modules(UnavailablePose):
+        estimator = pose_estimator.PoseEstimator(scheduler=InferenceScheduler(), profile='lite')
+        result = calibrate(estimator, frames, target_fps=40)
+        assert result['profile'] == 'full' and list(result['fps']) == ['full']
+        assert list(result['failed']) == ['heavy'] and "下载失败" in result['failed']['heavy']
+        assert estimator.profile.name == 'full'
+        estimator.process_frame(frames[0], draw=False)
+        print("✓ 无法创建模型的档位被跳过，选择下一个可用档位")
+
+        result = calibrate(estimator, frames, target_fps=10000, profiles=('heavy', 'full'))
+        assert result['profile'] == 'full' and list(result['failed']) == ['heavy']
+        print("✓ 都达不到目标时选择最快的可用档位")
+
+        estimator.set_profile('lite')
+        UnavailablePose.unavailable = {1, 2}
+        try:
+            calibrate(estimator, frames, profiles=('heavy', 'full'))
+            assert False, "所有档位都不可用时应抛出异常"
+        except RuntimeError:
+            pass
+        finally:
+            UnavailablePose.unavailable = {2}
+        assert estimator.profile.name == 'lite'
+        estimator.process_frame(frames[0], draw=False)
+        print("✓ 所有档位都不可用时恢复校准前的档位")
+
+
+if __name__ == "__main__":
+    test_profiles()
+    test_calibration_and_store()
+    test_calibration_failures()
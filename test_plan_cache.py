@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试训练方案缓存
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from plan_cache import PlanCache, make_cache_key, normalize_assessment_results
+from test_ai_assistant import start_stub_server, create_assistant
+
+
+def test_ttl_and_lru():
+    """测试过期和LRU淘汰"""
+    print("缓存过期与淘汰测试")
+    print("=" * 30)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = PlanCache(os.path.join(tmp_dir, "cache.db"), ttl=None, max_entries=2)
+        cache.put("a", "方案A")
+        cache.put("b", "方案B")
+        assert cache.get("a") == "方案A"  # a 成为最近访问
+        cache.put("c", "方案C")
+        assert cache.get("b") is None and cache.get("a") == "方案A" and cache.get("c") == "方案C"
+        assert cache.stats()['evictions'] == 1
+        print("✓ 超过上限时淘汰最久未访问的条目")
+
+        cache.ttl = 0.05
+        time.sleep(0.1)
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats['expirations'] == 1 and stats['hits'] == 3 and stats['misses'] == 2
+        print("✓ 过期条目视为未命中并被删除")
+        cache.close()
+
+        # 缓存持久保存在磁盘上
+        cache = PlanCache(os.path.join(tmp_dir, "cache.db"), ttl=None)
+        assert cache.get("c") == "方案C"
+        cache.close()
+        print("✓ 重新打开后缓存仍然有效")
+
+
+def test_cache_keys():
+    """测试缓存键的规范化和近似重复模式"""
+    print("\n缓存键测试")
+    print("=" * 30)
+
+    assert make_cache_key("m", "  第一行\n\n第二行 ") == make_cache_key("m", "第一行\n第二行")
+    assert make_cache_key("m1", "提示") != make_cache_key("m2", "提示")
+    print("✓ 缓存键忽略缩进和空行，区分模型")
+
+    results = [{'movement_name': '深蹲', 'score': 2, 'angles': {'knee': 92.4, 'hip': 101.0}}]
+    normalized = normalize_assessment_results(results, angle_step=5)
+    assert normalized[0]['angles'] == {'hip': 100.0, 'knee': 90.0}
+    assert list(normalized[0]['angles']) == ['hip', 'knee']
+    assert results[0]['angles'] == {'knee': 92.4, 'hip': 101.0}
+    print("✓ 角度按名称排序并按步长取整，不修改原数据")
+
+
+def test_assistant_cache():
+    """测试AI助手使用缓存"""
+    print("\nAI助手缓存测试")
+    print("=" * 30)
+
+    server = start_stub_server()
+    profile = {'age': 30, 'gender': '男'}
+    results = [{'movement_name': '深蹲', 'score': 2, 'feedback': [], 'angles': {'knee': 92.4, 'hip': 101.0}}]
+    with create_assistant(server, cache=PlanCache(":memory:", angle_step=5)) as assistant:
+        plan = assistant.generate_personalized_plan(profile, results)
+        assert assistant.generate_personalized_plan(profile, results) == plan
+        similar = [dict(results[0], angles={'hip': 99.0, 'knee': 91.0})]
+        assert assistant.generate_personalized_plan(profile, similar) == plan
+        assert len(server.requests) == 1
+        assert assistant.cache.stats()['hits'] == 2 and assistant.cache.stats()['misses'] == 1
+        print("✓ 相同和近似的输入命中缓存，只请求一次API")
+
+        server.responses = [(400, {}, 0)]
+        changed = dict(profile, age=40)
+        assert assistant.generate_personalized_plan(changed, results).startswith("生成训练方案时出错")
+        retried = assistant.generate_personalized_plan(changed, results)
+        assert retried.startswith("方案:") and len(server.requests) == 3
+        assert assistant.generate_personalized_plan(changed, results) == retried
+        assert len(server.requests) == 3
+        print("✓ 生成失败的结果不写入缓存")
+
+        streamed = assistant.generate_personalized_plan_stream(dict(profile, age=50), results)
+        assert assistant.generate_personalized_plan(dict(profile, age=50), results) == streamed
+        assert len(server.requests) == 4
+        print("✓ 流式生成的完整方案同样写入缓存")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_ttl_and_lru()
+    test_cache_keys()
+    test_assistant_cache()
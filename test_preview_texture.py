@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预览纹理复用
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from preview_texture import PreviewTexture
+
+
+class RecordingTexture:
+    """记录上传内容的纹理"""
+
+    def __init__(self, size, colorfmt):
+        self.size = size
+        self.colorfmt = colorfmt
+        self.flipped = False
+        self.uploads = []
+
+    def flip_vertical(self):
+        self.flipped = not self.flipped
+
+    def blit_buffer(self, buffer, colorfmt='rgb', bufferfmt='ubyte'):
+        self.uploads.append((buffer, colorfmt, bufferfmt))
+
+
+def test_texture_reuse():
+    """测试同一分辨率复用纹理"""
+    print("预览纹理复用测试")
+    print("=" * 30)
+
+    preview = PreviewTexture(colorfmt='rgb', texture_factory=RecordingTexture)
+    frame = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    texture = preview.update(frame)
+    assert preview.update(frame + 1) is texture
+    assert preview.allocations == 1 and texture.size == (6, 4) and texture.flipped
+    print("✓ 分辨率不变时复用同一纹理，创建时翻转纹理坐标")
+
+    buffer, colorfmt, bufferfmt = texture.uploads[0]
+    assert np.shares_memory(buffer, frame) and buffer.ndim == 1
+    assert (colorfmt, bufferfmt) == ('rgb', 'ubyte') and preview.copies == 0
+    print("✓ 连续数组直接上传，不复制、不在CPU上翻转")
+
+    strided = np.zeros((8, 10, 3), dtype=np.uint8)[:, ::2]
+    resized = preview.update(strided)
+    assert resized is not texture and preview.allocations == 2 and resized.size == (5, 8)
+    assert preview.copies == 1 and np.array_equal(resized.uploads[0][0], strided.reshape(-1))
+    print("✓ 分辨率变化时重新创建纹理，非连续数组复制一次")
+
+    for bad in (np.zeros((4, 6), dtype=np.uint8), np.zeros((4, 6, 3), dtype=np.float32)):
+        try:
+            preview.update(bad)
+            assert False, "不支持的图像应抛出异常"
+        except ValueError:
+            pass
+    print("✓ 拒绝非 (高, 宽, 3) uint8 图像")
+
+
+if __name__ == "__main__":
+    test_texture_reuse()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试姿态估计器的骨架叠加方式
+"""
+
+import sys
+import os
+import types
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import fake_pose_modules, landmark_list, pose_result
+
+
+def person(count=33, shift=0.0, visibility=0.9):
+    """在画面中央站立的人体关键点"""
+    return landmark_list([(0.4 + shift + 0.2 * i / count, 0.2 + 0.6 * i / count, 0.0) for i in range(count)],
+                         visibility)
+
+
+class FakePose:
+    """总是检测到同一个人体的姿态模型"""
+
+    def __init__(self, **options):
+        pass
+
+    def process(self, image):
+        return pose_result(person())
+
+
+def test_overlay_modes():
+    """测试 cpu / gpu / off 三种叠加方式"""
+    print("骨架叠加方式测试")
+    print("=" * 30)
+
+    drawn = []
+    fake_drawing = types.SimpleNamespace(draw_landmarks=lambda image, landmarks, *args, **kwargs: drawn.append(image))
+    with fake_pose_modules(FakePose, drawing=fake_drawing) as pose_estimator:
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        estimator = pose_estimator.PoseEstimator(overlay='cpu')
+        estimator._landmark_style = lambda fmt: None
+        estimator.process_frame(frame, timestamp=0.0)
+        assert len(drawn) == 1
+        print("✓ cpu: 在返回的图像上绘制骨架")
+
+        estimator.set_overlay('gpu')
+        image, angles = estimator.process_frame(frame, timestamp=0.033, output_format='rgb')
+        assert len(drawn) == 1 and angles
+        assert image.shape == frame.shape and estimator.latest_landmarks.shape[0] == 33
+        assert np.allclose(estimator.latest_landmarks[0, :2], [0.4, 0.2], atol=0.01)
+        print("✓ gpu: 不绘制骨架，关键点交给界面绘制")
+
+        estimator.set_overlay('off')
+        image, angles = estimator.process_frame(frame, timestamp=0.066)
+        assert len(drawn) == 1 and image is frame and angles
+        print("✓ off: 不绘制骨架，直接返回原始帧")
+
+        estimator.reset()
+        assert estimator.latest_landmarks is None
+        try:
+            estimator.set_overlay('opengl')
+            assert False, "未知叠加方式应抛出异常"
+        except ValueError:
+            pass
+        print("✓ 重置清除关键点，未知叠加方式抛出异常")
+
+
+def test_landmark_array():
+    """测试关键点提取到复用的数组并按可见度筛选"""
+    print("\n关键点数组测试")
+    print("=" * 30)
+
+    outputs = []
+
+    class ScriptedPose:
+        def __init__(self, **options):
+            pass
+
+        def process(self, image):
+            return pose_result(outputs.pop(0))
+
+    with fake_pose_modules(ScriptedPose) as pose_estimator:
+        estimator = pose_estimator.PoseEstimator(overlay='gpu')
+        buffer = estimator.extract_landmarks(person())
+        assert buffer.shape == (33, 4) and buffer.dtype == np.float32
+        assert np.allclose(buffer[:, 3], 0.9)
+        partial = estimator.extract_landmarks(person(count=20))
+        assert partial is buffer
+        assert np.isnan(buffer[20:, :3]).all() and (buffer[20:, 3] == 0).all()
+        print("✓ 提取到复用的 (33, 4) float32 缓冲区，缺失关键点为NaN")
+
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        outputs.extend([person(), person(shift=0.1)])
+        estimator.process_frame(frame, timestamp=0.0)
+        first = estimator.latest_landmarks
+        estimator.process_frame(frame, timestamp=0.033)
+        assert first is not estimator.latest_landmarks and first is not estimator._landmark_buffer
+        assert np.isclose(first[0, 0], 0.4) and np.isclose(estimator.latest_landmarks[0, 0], 0.5)
+        print("✓ 每帧结果独立于提取缓冲区，可交给界面线程")
+
+        estimator = pose_estimator.PoseEstimator(overlay='gpu', filter_mode='one_euro', min_visibility=0.5)
+        outputs.extend([person(), person(shift=0.1, visibility=0.2)])
+        estimator.process_frame(frame, timestamp=0.0)
+        estimator.process_frame(frame, timestamp=0.033)
+        landmarks = estimator.latest_landmarks
+        assert np.isclose(landmarks[0, 0], 0.4) and np.allclose(landmarks[:, 3], 0.2)
+        print("✓ 可见度低于阈值的关键点在滤波时保持之前的结果")
+
+        estimator = pose_estimator.PoseEstimator(overlay='gpu', min_visibility=0.5)
+        hidden_knee = person()
+        hidden_knee.landmark[25] = types.SimpleNamespace(x=0.5, y=0.6, z=0.0, visibility=0.1)
+        outputs.append(hidden_knee)
+        _, angles = estimator.process_frame(frame, timestamp=0.0)
+        assert np.isnan(estimator.latest_landmarks[25, :3]).all()
+        assert not np.isnan(estimator.latest_landmarks[26, :3]).any()
+        assert np.isnan(angles['left_knee_angle']) and not np.isnan(angles['right_knee_angle'])
+        print("✓ 不滤波时可见度低于阈值的关键点为NaN，相关角度为NaN")
+
+
+if __name__ == "__main__":
+    test_overlay_modes()
+    test_landmark_array()
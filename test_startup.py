@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试延迟导入和应用启动耗时
+"""
+
+import sys
+import os
+import threading
+import time
+import types
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import LazyModule, lazy_import, lazy_attribute
+from benchmark_startup import measure_startup, check_budget, DEFAULT_BUDGET
+from test_support import fake_pose_modules
+
+
+def test_lazy_module():
+    """测试延迟导入代理"""
+    print("延迟导入测试")
+    print("=" * 30)
+
+    calls = []
+
+    def loader():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return types.SimpleNamespace(value=42)
+
+    module = LazyModule("fake", loader)
+    assert not module.loaded and calls == []
+    print("✓ 创建代理时不加载模块")
+
+    threads = [threading.Thread(target=lambda: module.value) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert module.loaded and module.value == 42 and len(calls) == 1
+    print("✓ 多个线程同时访问只加载一次")
+
+    json_module = lazy_import('json')
+    assert json_module.loads("[1]") == [1]
+    assert lazy_attribute('os', 'path').join('a', 'b') == os.path.join('a', 'b')
+    print("✓ lazy_import 和 lazy_attribute 转发到实际对象")
+
+
+def test_pose_model_warmup():
+    """测试姿态模型延迟加载和后台预热"""
+    print("\n姿态模型预热测试")
+    print("=" * 30)
+
+    created = []
+
+    class FakePose:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)
+            created.append(kwargs)
+
+    with fake_pose_modules(FakePose) as pose_estimator:
+        estimator = pose_estimator.PoseEstimator(lazy_model=True)
+        assert not estimator.model_ready and created == []
+        print("✓ lazy_model=True 时构造不加载模型")
+
+        thread = estimator.start_warmup()
+        model = estimator.warm_up()  # 与后台线程同时请求模型
+        thread.join(timeout=5)
+        assert estimator.model_ready and estimator.pose is model and len(created) == 1
+        assert estimator.start_warmup() is None
+        print("✓ 后台预热与首帧同时请求时只创建一个模型")
+
+
+def test_startup_budget():
+    """测试启动时不导入重量级模块且在耗时预算内"""
+    print("\n启动耗时测试")
+    print("=" * 30)
+
+    result = measure_startup(repeat=1)
+    problems = check_budget(result, DEFAULT_BUDGET)
+    assert problems == [], problems
+    print(f"✓ 导入 {len(result['modules'])} 个启动模块耗时 {result['elapsed']:.3f} 秒，"
+          f"未导入 cv2/mediapipe/scipy/requests")
+
+    assert check_budget({'elapsed': 5.0, 'heavy_loaded': ['scipy']}, 1.0) == [
+        "启动导入耗时 5.00 秒，超过预算 1.00 秒", "scipy 在启动时被导入，应改为延迟导入"]
+    print("✓ 超出预算和提前导入都会报告")
+
+
+if __name__ == "__main__":
+    test_lazy_module()
+    test_pose_model_warmup()
+    test_startup_budget()
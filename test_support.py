@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试辅助模块
+
+在没有安装OpenCV和MediaPipe的环境中测试 PoseEstimator：把 pose_estimator 模块中
+延迟导入的 cv2 / mp_pose / mp_drawing 换成模拟对象，退出时恢复。
+
+使用示例:
+    class FakePose:
+        def __init__(self, **options):
+            pass
+
+        def process(self, image):
+            return pose_result(landmark_list(points))
+
+    with fake_pose_modules(FakePose):
+        estimator = pose_estimator.PoseEstimator()
+"""
+
+import contextlib
+import types
+
+from utils import LazyModule
+
+# 只提供颜色转换的 cv2
+FAKE_CV2 = types.SimpleNamespace(COLOR_BGR2RGB=4, COLOR_RGB2BGR=4,
+                                 cvtColor=lambda image, code: image[..., ::-1].copy())
+
+
+def landmark_list(points, visibility=0.9):
+    """
+    把关键点坐标转换为MediaPipe形式的关键点列表
+
+    Args:
+        points: [(x, y, z), ...] 或 [(x, y, z, 可见度), ...]
+        visibility: 没有可见度列时使用的可见度
+
+    Returns:
+        带 landmark 属性的对象
+    """
+    landmarks = []
+    for point in points:
+        x, y, z = point[:3]
+        landmarks.append(types.SimpleNamespace(x=x, y=y, z=z,
+                                               visibility=point[3] if len(point) > 3 else visibility))
+    return types.SimpleNamespace(landmark=landmarks)
+
+
+def pose_result(landmarks=None):
+    """mp_pose.Pose.process 的返回值，landmarks 为None表示未检测到人体"""
+    return types.SimpleNamespace(pose_landmarks=landmarks)
+
+
+@contextlib.contextmanager
+def fake_pose_modules(pose_class, cv2=FAKE_CV2, drawing=None, cv2_users=()):
+    """
+    替换 pose_estimator 使用的视觉库，退出时恢复
+
+    Args:
+        pose_class: 代替 mp_pose.Pose 的类
+        cv2: 代替 cv2 的对象
+        drawing: 代替 mp_drawing 的对象，None表示不替换
+        cv2_users: 同样延迟导入cv2的其他模块（如 batch_evaluate），其 cv2 一并替换
+
+    Yields:
+        pose_estimator 模块
+    """
+    import pose_estimator
+
+    fake_pose = types.SimpleNamespace(Pose=pose_class, POSE_CONNECTIONS=())
+    replacements = [
+        (pose_estimator, 'cv2', LazyModule("cv2", lambda: cv2)),
+        (pose_estimator, 'mp_pose', LazyModule("mediapipe.solutions.pose", lambda: fake_pose)),
+    ]
+    if drawing is not None:
+        replacements.append((pose_estimator, 'mp_drawing',
+                             LazyModule("mediapipe.solutions.drawing_utils", lambda: drawing)))
+    replacements.extend((module, 'cv2', LazyModule("cv2", lambda: cv2)) for module in cv2_users)
+
+    originals = [(module, name, getattr(module, name)) for module, name, _ in replacements]
+    for module, name, value in replacements:
+        setattr(module, name, value)
+    try:
+        yield pose_estimator
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
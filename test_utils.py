@@ -61,6 +61,123 @@ def test_angle_calculations():
         print(f"✗ 角度计算工具测试失败: {e}")
 
 
+def test_batch_angle_calculations():
+    """测试批量角度计算接口"""
+    print("\n批量角度计算测试")
+    print("=" * 30)
+    
+    from utils.angle_calculations import (
+        calculate_joint_angle,
+        calculate_distance,
+        calculate_joint_angles_batch,
+        calculate_distances_batch,
+        landmarks_to_array
+    )
+    
+    rng = np.random.default_rng(0)
+    landmarks = rng.random((20, 33, 3))
+    triples = [(23, 25, 27), (24, 26, 28), (11, 23, 25), (12, 24, 26)]
+    
+    angles = calculate_joint_angles_batch(landmarks, triples)
+    assert angles.shape == (20, 4)
+    for t in (0, 7, 19):
+        for k, (a, b, c) in enumerate(triples):
+            expected = calculate_joint_angle(landmarks[t, a], landmarks[t, b], landmarks[t, c])
+            assert abs(angles[t, k] - expected) < 1e-9
+    print(f"✓ 批量关节角度与逐点计算一致，结果形状: {angles.shape}")
+    
+    # 单帧输入与重合点（模长为0）
+    single = calculate_joint_angles_batch(landmarks[0], [(0, 0, 1)])
+    assert single.shape == (1,) and single[0] == 0.0
+    print("✓ 单帧输入与零长度向量处理正常")
+    
+    missing = landmarks[0].copy()
+    missing[25] = np.nan
+    result = calculate_joint_angles_batch(missing, [(23, 25, 27), (24, 26, 28)])
+    assert np.isnan(result[0]) and not np.isnan(result[1])
+    assert np.isnan(calculate_joint_angle(missing[23], missing[25], missing[27]))
+    print("✓ 关键点缺失时角度为NaN，而不是0度")
+    
+    distances = calculate_distances_batch(landmarks, [(11, 12), (27, 28)])
+    expected = calculate_distance(landmarks[3, 27], landmarks[3, 28])
+    assert distances.shape == (20, 2) and abs(distances[3, 1] - expected) < 1e-9
+    print("✓ 批量距离计算与逐点计算一致")
+    
+    # 带可见度列的 (T, 33, 4) 数组只使用前三列坐标
+    with_visibility = np.concatenate([landmarks, rng.random((20, 33, 1))], axis=-1).astype(np.float32)
+    assert np.allclose(calculate_joint_angles_batch(with_visibility, triples), angles, atol=1e-3)
+    assert np.allclose(calculate_distances_batch(with_visibility, [(11, 12), (27, 28)]), distances, atol=1e-6)
+    print("✓ 带可见度列的float32数组直接参与计算")
+    
+    array = landmarks_to_array({0: (0.5, 0.2, 0.8), 12: (0.4, 0.4, 0.9)})
+    assert array.shape == (33, 3) and array[12, 1] == 0.4 and np.isnan(array[1, 0])
+    print("✓ 关键点字典转换为数组")
+
+
+def test_angle_spec_plans():
+    """测试预编译角度规格计划"""
+    print("\n角度规格计划测试")
+    print("=" * 30)
+    
+    from utils.angle_calculations import (
+        calculate_joint_angle,
+        calculate_distance,
+        calculate_trunk_angle,
+        calculate_heel_lift,
+        calculate_trunk_rotation
+    )
+    from utils.angle_specs import get_angle_plan
+    
+    rng = np.random.default_rng(1)
+    frames = rng.random((8, 33, 3))
+    lm = frames[3]
+    
+    front = get_angle_plan('squat', 'front')
+    angles = front.evaluate_dict(lm)
+    left_knee = calculate_joint_angle(lm[23], lm[25], lm[27])
+    right_knee = calculate_joint_angle(lm[24], lm[26], lm[28])
+    ratio = calculate_distance(lm[27], lm[28]) / calculate_distance(lm[11], lm[12]) * 100
+    assert list(angles) == ['left_knee_angle', 'right_knee_angle', 'left_hip_angle',
+                            'right_hip_angle', 'foot_shoulder_ratio', 'knee_valgus']
+    assert abs(angles['left_knee_angle'] - left_knee) < 1e-9
+    assert abs(angles['foot_shoulder_ratio'] - ratio) < 1e-9
+    assert abs(angles['knee_valgus'] - abs(left_knee - right_knee)) < 1e-9
+    print("✓ 正面视图指标与逐点计算一致")
+    
+    side = get_angle_plan('squat', 'side').evaluate_dict(lm)
+    assert abs(side['trunk_angle'] - calculate_trunk_angle(lm[23], lm[11])) < 1e-9
+    assert abs(side['heel_lift'] - calculate_heel_lift(lm[29], lm[27])) < 1e-9
+    print("✓ 侧面视图指标与逐点计算一致")
+    
+    view45 = get_angle_plan('squat', '45').evaluate_dict(lm)
+    expected = calculate_trunk_rotation(lm[11], lm[12], lm[23], lm[24])
+    assert abs(view45['trunk_rotation'] - expected) < 1e-9
+    print("✓ 45度视图指标与逐点计算一致")
+    
+    matrix = front.evaluate_outputs(frames)
+    assert matrix.shape == (8, len(front.output_names))
+    assert np.allclose(matrix[3], list(angles.values()))
+    print(f"✓ 多帧批量计算，结果形状: {matrix.shape}")
+    
+    # 缺失的关键点（NaN）得到NaN，而不是0度
+    missing = lm.copy()
+    missing[25] = np.nan  # 左膝
+    angles = front.evaluate_dict(missing)
+    assert np.isnan(angles['left_knee_angle']) and np.isnan(angles['knee_valgus'])
+    assert abs(angles['right_knee_angle'] - right_knee) < 1e-9
+    assert all(np.isnan(v) for v in front.evaluate_dict(np.full((33, 4), np.nan)).values())
+    side = get_angle_plan('squat', 'side').evaluate_dict(np.full((33, 3), np.nan))
+    assert np.isnan(side['trunk_angle'])
+    view45 = get_angle_plan('squat', '45').evaluate_dict(np.full((33, 3), np.nan))
+    assert np.isnan(view45['trunk_rotation'])
+    print("✓ 关键点缺失时指标为NaN")
+    
+    hurdle = get_angle_plan('hurdle_step', 'side')
+    assert 'ankle_dorsiflexion' in hurdle.output_names
+    assert get_angle_plan('push_up', 'front') is front
+    print("✓ 跨栏步规格与默认回退计划正常")
+
+
 def test_landmark_filter():
     """测试关键点滤波器"""
     print("\n关键点滤波器测试")
@@ -92,6 +209,122 @@ def test_landmark_filter():
         print(f"✗ 关键点滤波器测试失败: {e}")
 
 
+def test_landmark_filter_ring_buffer():
+    """测试环形缓冲区滤波器与逐点移动平均结果一致"""
+    print("\n环形缓冲区滤波器测试")
+    print("=" * 30)
+    
+    from utils.landmark_filter import LandmarkFilter
+    
+    rng = np.random.default_rng(2)
+    frames = rng.random((40, 33, 3))
+    window = 4
+    
+    landmark_filter = LandmarkFilter(window_size=window)
+    for t, frame in enumerate(frames):
+        filtered = landmark_filter.filter(frame)
+        expected = frames[max(0, t - window + 1):t + 1].mean(axis=0)
+        assert filtered.shape == (33, 3)
+        assert np.allclose(filtered, expected)
+    print("✓ 数组接口与移动平均一致")
+    
+    # 掩码：无效关键点不参与平均
+    landmark_filter.reset()
+    landmark_filter.filter(np.ones((33, 3)))
+    mask = np.ones(33, dtype=bool)
+    mask[5] = False
+    filtered = landmark_filter.filter(np.full((33, 3), 3.0), mask)
+    assert np.allclose(filtered[0], 2.0) and np.allclose(filtered[5], 1.0)
+    print("✓ 掩码处理正常")
+    
+    # 字典兼容接口
+    landmark_filter.reset()
+    landmark_filter.filter_landmarks({0: (0.0, 0.0, 0.0), 12: (1.0, 1.0, 1.0)})
+    result = landmark_filter.filter_landmarks({0: (1.0, 1.0, 1.0), 12: (1.0, 1.0, 1.0)})
+    assert set(result) == {0, 12}
+    assert np.allclose(result[0], (0.5, 0.5, 0.5)) and np.allclose(result[12], (1.0, 1.0, 1.0))
+    print("✓ 字典兼容接口正常")
+
+
+def test_one_euro_filter():
+    """测试One Euro滤波模式"""
+    print("\nOne Euro滤波器测试")
+    print("=" * 30)
+    
+    from utils.landmark_filter import LandmarkFilter, ONE_EURO_PRESETS
+    
+    landmark_filter = LandmarkFilter.for_action('squat')
+    assert landmark_filter.mode == 'one_euro'
+    assert landmark_filter._one_euro.beta == ONE_EURO_PRESETS['squat']['beta']
+    print("✓ 按动作创建One Euro滤波器")
+    
+    # 静止时抑制噪声
+    rng = np.random.default_rng(3)
+    base = rng.random((33, 3))
+    noisy = base + rng.normal(0, 0.005, (60, 33, 3))
+    filtered = np.array([landmark_filter.filter(frame, timestamp=t / 30.0)
+                         for t, frame in enumerate(noisy)])
+    raw_error = np.abs(noisy[30:] - base).mean()
+    filtered_error = np.abs(filtered[30:] - base).mean()
+    assert filtered_error < raw_error
+    print(f"✓ 静止噪声抑制: {raw_error:.5f} -> {filtered_error:.5f}")
+    
+    # 无效关键点保持上一帧结果，首帧直接输出原值
+    landmark_filter.reset()
+    first = landmark_filter.filter(np.ones((33, 3)))
+    assert np.allclose(first, 1.0)
+    mask = np.ones(33, dtype=bool)
+    mask[0] = False
+    second = landmark_filter.filter(np.full((33, 3), 5.0), mask)
+    assert np.allclose(second[0], 1.0) and np.all(second[1] > 1.0)
+    print("✓ 首帧与掩码处理正常")
+
+
+def test_metric_history():
+    """测试列式指标历史存储"""
+    print("\n指标历史存储测试")
+    print("=" * 30)
+    
+    import tempfile
+    from utils.metric_history import MetricHistory
+    
+    # 不限容量：按倍数扩容
+    history = MetricHistory(initial_capacity=4)
+    for i in range(10):
+        history.append({'knee': float(i), 'hip': float(i * 2)})
+    assert len(history) == 10
+    assert np.array_equal(history['knee'], np.arange(10, dtype=np.float32))
+    assert history.latest() == {'knee': 9.0, 'hip': 18.0}
+    print("✓ 扩容模式追加与读取正常")
+    
+    # 环形缓冲区：视图连续且零拷贝，溢出数据写入磁盘
+    with tempfile.TemporaryDirectory() as spill_dir:
+        ring = MetricHistory(capacity=5, spill_dir=spill_dir)
+        for i in range(13):
+            values = {'knee': float(i)}
+            if i >= 6:
+                values['hip'] = float(-i)
+            ring.append(values)
+        
+        knee = ring.column('knee')
+        assert np.array_equal(knee, np.arange(8, 13, dtype=np.float32))
+        assert np.shares_memory(knee, ring._columns['knee'])
+        assert not knee.flags.writeable
+        print("✓ 环形缓冲区零拷贝视图正常")
+        
+        assert ring.spilled_rows == 8
+        assert np.array_equal(ring.full_column('knee'), np.arange(13, dtype=np.float32))
+        hip = ring.full_column('hip')
+        assert np.all(np.isnan(hip[:6])) and np.array_equal(hip[6:], -np.arange(6, 13, dtype=np.float32))
+        print("✓ 溢出到磁盘与完整历史读取正常")
+        
+        matrix = ring.matrix(['knee', 'hip'])
+        assert matrix.shape == (5, 2)
+        ring.clear()
+        assert len(ring) == 0 and not os.listdir(spill_dir)
+        print("✓ 清空历史并删除溢出文件")
+
+
 def test_movement_analysis():
     """测试动作轨迹分析工具"""
     print("\n动作轨迹分析工具测试")
@@ -140,6 +373,104 @@ def test_movement_analysis():
         print(f"✗ 动作轨迹分析工具测试失败: {e}")
 
 
+def test_kinematics_arrays():
+    """测试数组版本的速度和加速度计算"""
+    print("\n运动学数组计算测试")
+    print("=" * 30)
+
+    from utils.movement_analysis import calculate_kinematics, calculate_velocity_array
+
+    # 非均匀时间戳上的解析轨迹
+    rng = np.random.default_rng(0)
+    times = np.concatenate([[0.0], np.sort(rng.uniform(0, 2, 199))])
+    positions = np.stack([np.sin(2 * times), times ** 2, np.zeros_like(times)], axis=1)
+    expected_velocity = np.stack([2 * np.cos(2 * times), 2 * times, np.zeros_like(times)], axis=1)
+    expected_acceleration = np.stack([-4 * np.sin(2 * times), np.full_like(times, 2.0),
+                                      np.zeros_like(times)], axis=1)
+
+    kinematics = calculate_kinematics(positions, times)
+    assert np.abs(kinematics['velocity'] - expected_velocity)[1:-1].max() < 1e-2
+    assert np.abs(kinematics['acceleration'] - expected_acceleration)[2:-2].max() < 0.1
+    print("✓ 非均匀时间戳中心差分结果正确")
+
+    # 所有关键点一次计算
+    landmarks = np.repeat(positions[:, None, :], 33, axis=1) * np.linspace(0.5, 1.5, 33)[None, :, None]
+    all_kinematics = calculate_kinematics(landmarks, times)
+    assert all_kinematics['velocity'].shape == (200, 33, 3)
+    assert all_kinematics['speed'].shape == (200, 33)
+    np.testing.assert_allclose(all_kinematics['velocity'][:, 16], kinematics['velocity'], atol=1e-12)
+    print("✓ (T, 33, 3) 数组一次得到全部关键点的运动学量")
+
+    # 带噪声的均匀采样数据，Savitzky-Golay求导误差小于直接差分
+    uniform_times = np.arange(120) / 30.0
+    clean = np.sin(2 * uniform_times)
+    noisy = (clean + rng.normal(0, 0.002, 120))[:, None]
+    truth = 2 * np.cos(2 * uniform_times)
+    gradient_error = np.abs(calculate_velocity_array(noisy, uniform_times)[:, 0] - truth)[5:-5].mean()
+    savgol_error = np.abs(calculate_velocity_array(noisy, uniform_times, method='savgol')[:, 0] - truth)[5:-5].mean()
+    assert savgol_error < gradient_error
+    print(f"✓ Savitzky-Golay求导误差 {savgol_error:.4f} < 中心差分 {gradient_error:.4f}")
+
+    try:
+        calculate_kinematics(positions[:3], [0.0, 0.1, 0.1])
+        assert False, "时间戳不递增时应抛出ValueError"
+    except ValueError:
+        pass
+    print("✓ 时间戳不递增时抛出ValueError")
+
+
+def test_rep_counter():
+    """测试在线重复次数计数与逐次评分"""
+    print("\n重复次数计数测试")
+    print("=" * 30)
+
+    from utils.rep_counter import RepCounter, RepSegmenter
+    from fms_assessors import SquatAssessor
+
+    # 站立170°，5次深蹲到约80°，中间夹一次只蹲到135°的浅蹲，叠加噪声
+    rng = np.random.default_rng(1)
+    phase = np.linspace(0, 1, 60)
+    dip = lambda depth: 170 - depth * 0.5 * (1 - np.cos(2 * np.pi * phase))
+    series = [np.full(20, 170.0)]
+    for i in range(5):
+        series.append(dip(90))
+        if i == 2:
+            series.append(dip(35))
+    series.append(np.full(20, 170.0))
+    knee = np.concatenate(series) + rng.normal(0, 1.5, sum(len(x) for x in series))
+
+    counter = RepCounter(top_threshold=150, bottom_threshold=120, hysteresis=5)
+    events = [e for value in knee for e in counter.update(float(value))]
+    kinds = [e.kind for e in events]
+    assert counter.count == 5
+    assert kinds.count('rep') == 5 and kinds.count('abort') == 1
+    assert kinds[:4] == ['descent', 'bottom', 'ascent', 'rep']
+    bottoms = [e for e in events if e.kind == 'bottom']
+    assert all(e.value < 100 for e in bottoms)
+    print(f"✓ 计数 {counter.count} 次，浅蹲被放弃，最低点: {[e.frame_index for e in bottoms]}")
+
+    # 用分割器把每一次的窗口交给深蹲评估器单独评分（侧面视角，第4次躯干前倾）
+    assessor = SquatAssessor()
+    segmenter = RepSegmenter(assessor=assessor)
+    windows = []
+    rep = 0
+    for t, value in enumerate(knee):
+        trunk = 40.0 if rep == 3 else 10.0
+        angles = {'trunk_angle': trunk, 'hip_angle': float(value) + 10, 'knee_angle': float(value),
+                  'ankle_angle': 60.0, 'heel_lift': 0.0}
+        for event in segmenter.update(angles, t / 30.0):
+            if event.kind == 'rep':
+                windows.append(event.window)
+                rep += 1
+    assert segmenter.count == 5 and len(windows) == 5
+    assert all(w.start_index < w.bottom_index < w.end_index for w in windows)
+    assert all(len(w.matrix) == w.end_index - w.start_index + 1 for w in windows)
+    assert [w.assessment['score'] for w in windows] == [3, 3, 3, 2, 3]
+    assert "躯干前倾过度" in windows[3].assessment['compensations']
+    assert "躯干前倾过度" not in windows[0].assessment['compensations']
+    print(f"✓ 逐次评分: {[w.assessment['score'] for w in windows]}")
+
+
 def test_symmetry_analysis():
     """测试对称性分析工具"""
     print("\n对称性分析工具测试")
@@ -185,6 +516,75 @@ def test_symmetry_analysis():
         print(f"✗ 对称性分析工具测试失败: {e}")
 
 
+def test_streaming_analysis():
+    """测试分块流式统计与整体计算一致"""
+    print("\n流式分析测试")
+    print("=" * 30)
+
+    from utils.movement_analysis import (
+        analyze_movement_stream, calculate_symmetry_stream,
+        calculate_movement_range, calculate_smoothness, calculate_symmetry
+    )
+    from utils.symmetry_analysis import detect_asymmetry_patterns, detect_asymmetry_patterns_stream
+
+    rng = np.random.default_rng(3)
+    names = ['left_knee_angle', 'right_knee_angle', 'trunk_angle']
+    matrix = np.column_stack([
+        90 + 30 * np.sin(np.linspace(0, 6, 500)) + rng.normal(0, 1, 500),
+        70 + 28 * np.sin(np.linspace(0.1, 6.1, 500)),
+        rng.normal(10, 2, 500)
+    ]).astype(np.float32)
+    chunks = [(names, None, matrix[i:i + 64]) for i in range(0, 500, 64)]
+
+    stats = analyze_movement_stream(iter(chunks))
+    for j, name in enumerate(names):
+        column = matrix[:, j].astype(np.float64).tolist()
+        expected = calculate_movement_range(column)
+        for key in ('min', 'max', 'range', 'mean'):
+            assert abs(stats[name][key] - expected[key]) < 1e-6
+        assert abs(stats[name]['smoothness'] - calculate_smoothness(column)) < 1e-6
+    print("✓ 动作范围与平滑度与整体计算一致")
+
+    symmetry = calculate_symmetry_stream(iter(chunks), 'left_knee_angle', 'right_knee_angle')
+    expected = calculate_symmetry(matrix[:, 0].tolist(), matrix[:, 1].tolist())
+    assert abs(symmetry - expected) < 1e-6
+    print(f"✓ 流式对称性得分: {symmetry:.2f}")
+
+    frames = [dict(zip(names, row)) for row in matrix.astype(np.float64).tolist()]
+    assert (sorted(detect_asymmetry_patterns_stream(iter(chunks))) ==
+            sorted(detect_asymmetry_patterns(frames)))
+    print("✓ 不对称模式检测与整体计算一致")
+
+
+def test_skeleton_geometry():
+    """测试骨架叠加层的坐标换算"""
+    print("\n骨架坐标换算测试")
+    print("=" * 30)
+
+    from utils.skeleton import POSE_CONNECTIONS, fit_image_rect, project_landmarks, visible_mask
+
+    assert len(POSE_CONNECTIONS) == 35
+    assert all(0 <= a < 33 and 0 <= b < 33 for a, b in POSE_CONNECTIONS)
+
+    # 640x480的图像放在800x400的控件中：按高度缩放，左右留边
+    rect = fit_image_rect((10, 20), (800, 400), (640, 480))
+    assert np.allclose(rect, (10 + (800 - 1600 / 3) / 2, 20, 1600 / 3, 400))
+    assert fit_image_rect((0, 0), (800, 400), (0, 0))[2:] == (0.0, 0.0)
+    print("✓ 保持宽高比的显示区域")
+
+    points = np.array([[0.0, 0.0, 0.1], [1.0, 1.0, 0.2], [0.5, 0.25, 0.0], [np.nan, 0.5, 0.0]])
+    projected = project_landmarks(points, (0, 0, 200, 100))
+    assert np.allclose(projected[:3], [[0, 100], [200, 0], [100, 75]])
+    print("✓ 归一化坐标换算为控件坐标（y轴翻转）")
+
+    assert visible_mask(points).tolist() == [True, True, True, False]
+    visibility = np.array([0.9, 0.3, 0.5, 1.0])
+    assert visible_mask(points, visibility).tolist() == [True, False, True, False]
+    with_visibility = np.column_stack([points, visibility])
+    assert visible_mask(with_visibility).tolist() == [True, False, True, False]
+    print("✓ 按坐标有效性和可见度筛选关键点")
+
+
 def test_module_imports():
     """测试模块导入"""
     print("工具模块导入测试")
@@ -213,7 +613,16 @@ def test_module_imports():
 if __name__ == "__main__":
     test_module_imports()
     test_angle_calculations()
+    test_batch_angle_calculations()
+    test_angle_spec_plans()
     test_landmark_filter()
+    test_landmark_filter_ring_buffer()
+    test_one_euro_filter()
+    test_metric_history()
     test_movement_analysis()
+    test_kinematics_arrays()
+    test_rep_counter()
     test_symmetry_analysis()
+    test_streaming_analysis()
+    test_skeleton_geometry()
     print("\n所有测试完成")
\ No newline at end of file
@@ -6,7 +6,9 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp, sp
+from kivy.clock import Clock
 import os
+import threading
 from datetime import datetime
 
 
@@ -16,6 +18,10 @@ class TrainingPlanScreen(Screen):
     def __init__(self, **kwargs):
         super(TrainingPlanScreen, self).__init__(**kwargs)
         self.plan_content = ""
+        self.streaming = False
+        self._pending_deltas = []  # 后台线程收到、尚未显示的文本增量
+        self._pending_lock = threading.Lock()
+        self._flush_event = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -63,10 +69,44 @@ class TrainingPlanScreen(Screen):
         self.add_widget(main_layout)
     
     def set_plan_content(self, content):
-        """设置训练方案内容"""
+        """设置训练方案内容（结束流式显示）"""
+        with self._pending_lock:
+            self._pending_deltas = []
+            if self._flush_event is not None:
+                self._flush_event.cancel()
+                self._flush_event = None
+        self.streaming = False
         self.plan_content = content
         self.plan_text.text = content
     
+    def begin_streaming(self, placeholder="正在生成训练方案..."):
+        """开始流式显示：清空内容，等待文本增量"""
+        self.set_plan_content("")
+        self.plan_text.hint_text = placeholder
+        self.streaming = True
+    
+    def append_plan_content(self, delta):
+        """
+        追加一段训练方案文本（可在任意线程调用）
+        
+        增量先放入缓冲区，在主线程的下一帧合并显示，
+        避免每个字都触发一次文本框重新排版。
+        """
+        with self._pending_lock:
+            self._pending_deltas.append(delta)
+            if self._flush_event is None:
+                self._flush_event = Clock.schedule_once(self._flush_pending_deltas)
+    
+    def _flush_pending_deltas(self, dt):
+        """在主线程中把缓冲的文本增量追加到界面"""
+        with self._pending_lock:
+            text = "".join(self._pending_deltas)
+            self._pending_deltas = []
+            self._flush_event = None
+        if text and self.streaming:
+            self.plan_content += text
+            self.plan_text.text = self.plan_content
+    
     def go_back(self, instance):
         """返回主界面"""
         self.manager.current = 'main'
@@ -1,3 +1,4 @@
+from kivy.app import App
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -7,8 +8,11 @@ from kivy.uix.button import Button
 from kivy.uix.spinner import Spinner
 from kivy.uix.popup import Popup
 from kivy.metrics import dp, sp
+from kivy.clock import Clock
+import os
 
 from ai_assistant import AIFitnessAssistant
+from plan_cache import PlanCache
 from user_profile import UserProfile
 
 
@@ -20,6 +24,9 @@ class UserProfileScreen(Screen):
         self.user_profile = UserProfile()
         self.assessment_results = []
         self.api_key = None
+        self.assistant = None  # 复用同一个AI助手（及其HTTP连接池）
+        self.plan_cache = None  # 训练方案缓存，首次生成方案时打开
+        self.pending_plan = None  # 正在生成的训练方案（Future）
         self.setup_ui()
     
     def setup_ui(self):
@@ -145,32 +152,70 @@ class UserProfileScreen(Screen):
             )
             popup.open()
     
-    def generate_training_plan(self, api_key=None):
-        """生成个性化训练方案"""
-        try:
-            # 创建AI助手实例
+    def get_assistant(self, api_key=None):
+        """获取AI助手实例，API密钥变化时重新创建"""
+        if self.assistant is None or (api_key and api_key != self.assistant.api_key):
+            if self.assistant is not None:
+                self.assistant.close()
+            if self.plan_cache is None:
+                # 与性能档位文件一样放在应用数据目录中（当前目录在Android等平台上不可写）
+                app = App.get_running_app()
+                self.plan_cache = PlanCache(os.path.join(app.user_data_dir if app else ".", "plan_cache.db"))
             if api_key:
-                assistant = AIFitnessAssistant(api_key=api_key)
+                self.assistant = AIFitnessAssistant(api_key=api_key, cache=self.plan_cache)
             else:
                 # 使用环境变量中的API密钥
-                assistant = AIFitnessAssistant()
+                self.assistant = AIFitnessAssistant(cache=self.plan_cache)
+        return self.assistant
+    
+    def generate_training_plan(self, api_key=None):
+        """生成个性化训练方案（后台流式请求，边生成边显示）"""
+        if self.pending_plan is not None and not self.pending_plan.done():
+            return
+        try:
+            assistant = self.get_assistant(api_key)
             
-            # 生成训练方案
-            plan = assistant.generate_personalized_plan(
+            # 先切换到方案界面，文本增量到达后逐步显示
+            plan_screen = self.manager.get_screen('training_plan')
+            plan_screen.begin_streaming()
+            self.manager.current = 'training_plan'
+            
+            self.pending_plan = assistant.generate_personalized_plan_async(
                 self.user_profile.get_profile(),
-                self.assessment_results
+                self.assessment_results,
+                on_delta=plan_screen.append_plan_content
+            )
+            self.save_btn.disabled = True
+            self.save_btn.text = "正在生成方案..."
+            # 回调在后台线程执行，界面更新交回主线程
+            self.pending_plan.add_done_callback(
+                lambda future: Clock.schedule_once(lambda dt: self.on_plan_ready(future))
             )
-            
-            # 显示训练方案
-            self.show_training_plan(plan)
             
         except Exception as e:
-            popup = Popup(
-                title='生成失败',
-                content=Label(text=f'生成训练方案时出错: {str(e)}'),
-                size_hint=(0.8, 0.4)
-            )
-            popup.open()
+            self.show_plan_error(e)
+    
+    def on_plan_ready(self, future):
+        """训练方案生成完成（在主线程中调用）"""
+        self.save_btn.disabled = False
+        self.save_btn.text = "保存并生成方案"
+        try:
+            plan = future.result()
+        except Exception as e:
+            self.show_plan_error(e)
+            return
+        
+        # 用完整结果替换流式内容（包括出错时的说明）
+        self.show_training_plan(plan)
+    
+    def show_plan_error(self, error):
+        """显示生成失败提示"""
+        popup = Popup(
+            title='生成失败',
+            content=Label(text=f'生成训练方案时出错: {str(error)}'),
+            size_hint=(0.8, 0.4)
+        )
+        popup.open()
     
     def show_training_plan(self, plan):
         """显示训练方案"""
@@ -12,7 +12,12 @@
 
 模块列表:
 - angle_calculations: 关节角度计算工具
+- angle_specs: 按动作和视图声明的预编译角度规格表
 - landmark_filter: 关键点滤波平滑处理
+- lazy_import: 延迟导入耗时较长的第三方模块
+- metric_history: 列式指标历史存储
+- rep_counter: 在线重复次数计数与动作阶段分割
+- skeleton: 骨架连线和关键点到屏幕坐标的换算
 - movement_analysis: 动作轨迹分析
 - symmetry_analysis: 左右对称性分析
 
@@ -20,6 +25,9 @@
     from utils.angle_calculations import calculate_joint_angle
     angle = calculate_joint_angle(landmark_a, landmark_b, landmark_c)
     
+    from utils import calculate_joint_angles_batch
+    angles = calculate_joint_angles_batch(landmark_array, [(23, 25, 27), (24, 26, 28)])
+    
     from utils import LandmarkFilter
     filter = LandmarkFilter()
     filtered_landmarks = filter.filter_landmarks(landmarks)
@@ -30,23 +38,48 @@ from .angle_calculations import (
     calculate_distance,
     calculate_trunk_angle,
     calculate_heel_lift,
-    calculate_trunk_rotation
+    calculate_trunk_rotation,
+    landmarks_to_array,
+    calculate_joint_angles_batch,
+    calculate_distances_batch
+)
+
+from .angle_specs import (
+    MetricSpec,
+    AnglePlan,
+    ANGLE_SPECS,
+    get_angle_plan
 )
 
-from .landmark_filter import LandmarkFilter
+from .landmark_filter import LandmarkFilter, OneEuroFilter, ONE_EURO_PRESETS
+
+from .lazy_import import LazyModule, lazy_import, lazy_attribute
+
+from .metric_history import MetricHistory
+
+from .rep_counter import RepCounter, RepSegmenter, RepEvent, RepWindow, REP_METRICS
+
+from .skeleton import POSE_CONNECTIONS, fit_image_rect, project_landmarks, visible_mask
 
 from .movement_analysis import (
     calculate_velocity,
     calculate_acceleration,
+    calculate_velocity_array,
+    calculate_acceleration_array,
+    calculate_kinematics,
     detect_movement_peaks,
     calculate_movement_range,
     calculate_smoothness,
-    calculate_symmetry
+    calculate_symmetry,
+    RunningStats,
+    analyze_movement_stream,
+    calculate_symmetry_stream
 )
 
 from .symmetry_analysis import (
     compare_bilateral_symmetry,
     calculate_symmetry_index,
     detect_asymmetry_patterns,
+    detect_asymmetry_patterns_stream,
     evaluate_movement_symmetry
 )
\ No newline at end of file
@@ -2,10 +2,16 @@
 角度计算工具模块
 
 该模块提供了计算人体关节角度的函数。
+
+除逐点计算的函数外，还提供了基于 (T, 33, 3) 关键点数组的批量计算接口，
+可以在一次NumPy运算中得到所有帧、所有关节的角度。
 """
 
 import numpy as np
-from typing import Tuple
+from typing import Dict, Sequence, Tuple
+
+# MediaPipe Pose关键点数量
+NUM_LANDMARKS = 33
 
 
 def calculate_joint_angle(a: Tuple[float, float, float], 
@@ -36,8 +42,8 @@ def calculate_joint_angle(a: Tuple[float, float, float],
     len_ba = np.linalg.norm(ba)
     len_bc = np.linalg.norm(bc)
     
-    # 计算余弦值
-    cosine_angle = dot_product / (len_ba * len_bc) if (len_ba * len_bc) > 0 else 1.0
+    # 计算余弦值，模长为0时取1.0；坐标缺失（NaN）时结果为NaN
+    cosine_angle = dot_product / (len_ba * len_bc) if (len_ba * len_bc) != 0 else 1.0
     cosine_angle = np.clip(cosine_angle, -1.0, 1.0)  # 防止数值误差
     
     # 转换为角度
@@ -140,4 +146,75 @@ def calculate_trunk_rotation(left_shoulder: Tuple[float, float, float],
     cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
     
     angle = np.degrees(np.arccos(cosine_angle))
-    return angle
\ No newline at end of file
+    return angle
+
+
+def landmarks_to_array(landmarks: Dict[int, Tuple[float, float, float]],
+                       num_landmarks: int = NUM_LANDMARKS) -> np.ndarray:
+    """
+    将关键点字典转换为数组
+    
+    Args:
+        landmarks: 关键点坐标字典 {索引: (x, y, z)}
+        num_landmarks: 关键点数量
+        
+    Returns:
+        形状为 (num_landmarks, 3) 的数组，缺失的关键点填充为NaN
+    """
+    array = np.full((num_landmarks, 3), np.nan)
+    for idx, point in landmarks.items():
+        array[idx] = point[:3]
+    return array
+
+
+def calculate_joint_angles_batch(landmarks: np.ndarray,
+                                 triples: Sequence[Tuple[int, int, int]]) -> np.ndarray:
+    """
+    批量计算关节角度（单位：度）
+    
+    与 calculate_joint_angle 的计算方式一致，但一次处理所有帧和所有关节三元组。
+    
+    Args:
+        landmarks: 关键点数组，形状为 (T, 33, >=3) 或 (33, >=3)，只使用前三列坐标
+        triples: 关节三元组列表 [(a, b, c), ...]，b为关节中心点的索引
+        
+    Returns:
+        角度数组，形状为 (T, K)；输入为单帧时形状为 (K,)
+    """
+    points = np.asarray(landmarks, dtype=np.float64)[..., :3]
+    idx = np.asarray(triples, dtype=np.intp).reshape(-1, 3)
+    
+    # 计算向量
+    b = points[..., idx[:, 1], :]
+    ba = points[..., idx[:, 0], :] - b
+    bc = points[..., idx[:, 2], :] - b
+    
+    # 计算点积和模长乘积
+    dot_product = np.einsum('...ij,...ij->...i', ba, bc)
+    norm_product = np.sqrt(np.einsum('...ij,...ij->...i', ba, ba) *
+                           np.einsum('...ij,...ij->...i', bc, bc))
+    
+    # 计算余弦值，模长为0时与逐点计算一致取1.0；关键点缺失（NaN）时结果为NaN
+    cosine_angle = np.ones_like(dot_product)
+    np.divide(dot_product, norm_product, out=cosine_angle, where=norm_product != 0)
+    np.clip(cosine_angle, -1.0, 1.0, out=cosine_angle)
+    
+    return np.degrees(np.arccos(cosine_angle))
+
+
+def calculate_distances_batch(landmarks: np.ndarray,
+                              pairs: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """
+    批量计算两点之间的距离
+    
+    Args:
+        landmarks: 关键点数组，形状为 (T, 33, >=3) 或 (33, >=3)，只使用前三列坐标
+        pairs: 关键点索引对列表 [(a, b), ...]
+        
+    Returns:
+        距离数组，形状为 (T, K)；输入为单帧时形状为 (K,)
+    """
+    points = np.asarray(landmarks, dtype=np.float64)[..., :3]
+    idx = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    diff = points[..., idx[:, 0], :] - points[..., idx[:, 1], :]
+    return np.sqrt(np.einsum('...ij,...ij->...i', diff, diff))
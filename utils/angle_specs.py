@@ -0,0 +1,313 @@
+"""
+角度规格表模块
+
+该模块以声明式的规格表描述每个动作、每个视图需要计算的指标
+（关节角度、距离、比例、躯干指标等），并在首次使用时编译为索引数组。
+编译后的计算计划（AnglePlan）由一个通用内核统一计算，每帧不再需要
+按视图分支逐个查找关键点。
+
+新增动作或视图的指标只需要在 ANGLE_SPECS 中添加规格，无需修改计算代码。
+
+使用示例:
+    from utils.angle_specs import get_angle_plan
+    plan = get_angle_plan('squat', 'front')
+    angles = plan.evaluate_dict(landmark_array)      # 单帧 (33, 3)
+    matrix = plan.evaluate(session_landmarks)        # 多帧 (T, 33, 3) -> (T, M)
+"""
+
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .angle_calculations import calculate_joint_angles_batch, calculate_distances_batch
+
+
+# MediaPipe Pose关键点索引（与 mp_pose.PoseLandmark 保持一致）
+LANDMARK_INDEX = {
+    'nose': 0,
+    'left_shoulder': 11,
+    'right_shoulder': 12,
+    'left_elbow': 13,
+    'right_elbow': 14,
+    'left_wrist': 15,
+    'right_wrist': 16,
+    'left_hip': 23,
+    'right_hip': 24,
+    'left_knee': 25,
+    'right_knee': 26,
+    'left_ankle': 27,
+    'right_ankle': 28,
+    'left_heel': 29,
+    'right_heel': 30,
+    'left_foot_index': 31,
+    'right_foot_index': 32
+}
+
+
+class MetricSpec(NamedTuple):
+    """
+    单个指标的规格
+
+    Attributes:
+        name: 指标名称
+        kind: 指标类型，见 POINT_KINDS 和 DERIVED_KINDS
+        args: 关键点名称（关键点类指标）或已定义的指标名称（派生类指标）
+        scale: 结果缩放系数
+        offset: 结果偏移量，最终值为 原始值 * scale + offset
+        output: 是否输出到结果中，False表示仅作为中间量
+    """
+    name: str
+    kind: str
+    args: Tuple[str, ...]
+    scale: float = 1.0
+    offset: float = 0.0
+    output: bool = True
+
+
+def _trunk_angles(points: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """起点->终点的二维向量与垂直向量 (0, 1) 的夹角（度），长度为0时为0，关键点缺失时为NaN"""
+    vector = points[..., idx[:, 1], :2] - points[..., idx[:, 0], :2]
+    length = np.sqrt(np.einsum('...ij,...ij->...i', vector, vector))
+    cosine_angle = np.ones_like(length)
+    np.divide(vector[..., 1], length, out=cosine_angle, where=length != 0)
+    np.clip(cosine_angle, -1.0, 1.0, out=cosine_angle)
+    return np.degrees(np.arccos(cosine_angle))
+
+
+def _line_angles(points: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """两条二维连线 (p0->p1, p2->p3) 之间的夹角（度），任一连线长度为0时为0，关键点缺失时为NaN"""
+    first = points[..., idx[:, 1], :2] - points[..., idx[:, 0], :2]
+    second = points[..., idx[:, 3], :2] - points[..., idx[:, 2], :2]
+    dot_product = np.einsum('...ij,...ij->...i', first, second)
+    norm_product = np.sqrt(np.einsum('...ij,...ij->...i', first, first) *
+                           np.einsum('...ij,...ij->...i', second, second))
+    valid = norm_product != 0
+    cosine_angle = np.ones_like(dot_product)
+    np.divide(dot_product, norm_product, out=cosine_angle, where=valid)
+    np.clip(cosine_angle, -1.0, 1.0, out=cosine_angle)
+    return np.where(valid, np.degrees(np.arccos(cosine_angle)), 0.0)
+
+
+def _vertical_offsets(points: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """两点之间的垂直（y方向）距离"""
+    return np.abs(points[..., idx[:, 0], 1] - points[..., idx[:, 1], 1])
+
+
+def _ratios(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """两个指标的比值，分母不大于0时为0，任一指标缺失（NaN）时为NaN"""
+    numerator = values[..., idx[:, 0]]
+    denominator = values[..., idx[:, 1]]
+    result = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=result, where=~(denominator <= 0) | np.isnan(numerator))
+    return result
+
+
+def _abs_differences(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """两个指标之差的绝对值"""
+    return np.abs(values[..., idx[:, 0]] - values[..., idx[:, 1]])
+
+
+# 关键点类指标：类型 -> (关键点数量, 批量计算函数)
+POINT_KINDS = {
+    'joint_angle': (3, calculate_joint_angles_batch),
+    'distance': (2, calculate_distances_batch),
+    'trunk_angle': (2, _trunk_angles),
+    'line_angle': (4, _line_angles),
+    'vertical_offset': (2, _vertical_offsets)
+}
+
+# 派生类指标：类型 -> (依赖指标数量, 批量计算函数)
+DERIVED_KINDS = {
+    'ratio': (2, _ratios),
+    'abs_difference': (2, _abs_differences)
+}
+
+
+_HURDLE_STEP_SPECS = (
+    MetricSpec('hip_angle', 'joint_angle', ('left_shoulder', 'left_hip', 'left_knee')),
+    MetricSpec('knee_angle', 'joint_angle', ('left_hip', 'left_knee', 'left_ankle')),
+    # 踝背屈 = 90° - 小腿与足部的夹角
+    MetricSpec('ankle_dorsiflexion', 'joint_angle', ('left_knee', 'left_ankle', 'left_foot_index'),
+               scale=-1.0, offset=90.0),
+    # 肩->髋向量与垂直向下方向的夹角，直立时为0
+    MetricSpec('trunk_inclination', 'trunk_angle', ('left_shoulder', 'left_hip'))
+)
+
+_SPLIT_SQUAT_SPECS = (
+    MetricSpec('front_leg_hip_angle', 'joint_angle', ('left_shoulder', 'left_hip', 'left_knee')),
+    MetricSpec('front_leg_knee_angle', 'joint_angle', ('left_hip', 'left_knee', 'left_ankle')),
+    MetricSpec('back_leg_knee_angle', 'joint_angle', ('right_hip', 'right_knee', 'right_ankle')),
+    MetricSpec('trunk_inclination', 'trunk_angle', ('left_shoulder', 'left_hip')),
+    MetricSpec('feet_separation', 'distance', ('left_ankle', 'right_ankle'), scale=100.0)
+)
+
+# 指标规格表，键为 (动作, 视图)，视图为None表示适用于所有视图
+ANGLE_SPECS: Dict[Tuple[str, Optional[str]], Tuple[MetricSpec, ...]] = {
+    ('squat', 'front'): (
+        MetricSpec('left_knee_angle', 'joint_angle', ('left_hip', 'left_knee', 'left_ankle')),
+        MetricSpec('right_knee_angle', 'joint_angle', ('right_hip', 'right_knee', 'right_ankle')),
+        MetricSpec('left_hip_angle', 'joint_angle', ('left_shoulder', 'left_hip', 'left_knee')),
+        MetricSpec('right_hip_angle', 'joint_angle', ('right_shoulder', 'right_hip', 'right_knee')),
+        MetricSpec('shoulder_width', 'distance', ('left_shoulder', 'right_shoulder'), output=False),
+        MetricSpec('ankle_width', 'distance', ('left_ankle', 'right_ankle'), output=False),
+        # 两脚间距与肩宽比例（百分比）
+        MetricSpec('foot_shoulder_ratio', 'ratio', ('ankle_width', 'shoulder_width'), scale=100.0),
+        # 膝外翻程度
+        MetricSpec('knee_valgus', 'abs_difference', ('left_knee_angle', 'right_knee_angle'))
+    ),
+    ('squat', 'side'): (
+        MetricSpec('trunk_angle', 'trunk_angle', ('left_hip', 'left_shoulder')),
+        MetricSpec('hip_angle', 'joint_angle', ('left_shoulder', 'left_hip', 'left_knee')),
+        MetricSpec('knee_angle', 'joint_angle', ('left_hip', 'left_knee', 'left_ankle')),
+        MetricSpec('ankle_angle', 'joint_angle', ('left_knee', 'left_ankle', 'left_heel')),
+        MetricSpec('heel_lift', 'vertical_offset', ('left_heel', 'left_ankle'), scale=100.0)
+    ),
+    ('squat', '45'): (
+        MetricSpec('side_hip_angle', 'joint_angle', ('left_shoulder', 'left_hip', 'left_knee')),
+        MetricSpec('side_knee_angle', 'joint_angle', ('left_hip', 'left_knee', 'left_ankle')),
+        MetricSpec('front_hip_width', 'distance', ('left_hip', 'right_hip')),
+        MetricSpec('front_ankle_width', 'distance', ('left_ankle', 'right_ankle')),
+        MetricSpec('trunk_rotation', 'line_angle',
+                   ('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip'))
+    ),
+    ('hurdle_step', None): _HURDLE_STEP_SPECS,
+    ('split_squat', None): _SPLIT_SQUAT_SPECS
+}
+
+
+class AnglePlan:
+    """
+    编译后的指标计算计划
+
+    规格中的关键点名称和指标依赖在构造时转换为索引数组，
+    evaluate() 对所有帧、所有指标只执行按类型分组的少量数组运算。
+    """
+
+    def __init__(self, action: str, view: Optional[str], specs: Sequence[MetricSpec]):
+        """
+        编译指标规格
+
+        Args:
+            action: 动作名称
+            view: 视图名称
+            specs: 指标规格序列，派生指标只能引用在其之前定义的指标
+        """
+        self.action = action
+        self.view = view
+        self.names = [spec.name for spec in specs]
+        self.output_names = [spec.name for spec in specs if spec.output]
+        self.output_columns = np.array([i for i, spec in enumerate(specs) if spec.output],
+                                       dtype=np.intp)
+        self.scale = np.array([spec.scale for spec in specs], dtype=np.float64)
+        self.offset = np.array([spec.offset for spec in specs], dtype=np.float64)
+
+        columns = {}
+        levels = {}
+        grouped: Dict[Tuple[int, str], List[Tuple[int, List[int]]]] = {}
+        for column, spec in enumerate(specs):
+            if spec.name in columns:
+                raise ValueError(f"重复的指标名称: {spec.name}")
+
+            if spec.kind in POINT_KINDS:
+                arity = POINT_KINDS[spec.kind][0]
+                try:
+                    refs = [LANDMARK_INDEX[point] for point in spec.args]
+                except KeyError as e:
+                    raise ValueError(f"指标 {spec.name} 引用了未知关键点: {e}")
+                level = 0
+            elif spec.kind in DERIVED_KINDS:
+                arity = DERIVED_KINDS[spec.kind][0]
+                try:
+                    refs = [columns[name] for name in spec.args]
+                except KeyError as e:
+                    raise ValueError(f"指标 {spec.name} 引用了未定义的指标: {e}")
+                level = 1 + max(levels[ref] for ref in refs)
+            else:
+                raise ValueError(f"未知的指标类型: {spec.kind}")
+
+            if len(refs) != arity:
+                raise ValueError(f"指标 {spec.name} 需要 {arity} 个参数")
+
+            columns[spec.name] = column
+            levels[column] = level
+            grouped.setdefault((level, spec.kind), []).append((column, refs))
+
+        # 按依赖层级排序，同一层级、同一类型的指标合并为一次批量计算
+        self._steps = []
+        for (level, kind), items in sorted(grouped.items()):
+            cols = np.array([column for column, _ in items], dtype=np.intp)
+            idx = np.array([refs for _, refs in items], dtype=np.intp)
+            self._steps.append((level == 0, kind, cols, idx))
+
+    def evaluate(self, landmarks: np.ndarray) -> np.ndarray:
+        """
+        计算所有指标
+
+        Args:
+            landmarks: 关键点数组，形状为 (T, 33, >=3) 或 (33, >=3)，只使用前三列坐标
+
+        Returns:
+            指标矩阵，形状为 (T, M) 或 (M,)，列顺序与 names 一致
+        """
+        points = np.asarray(landmarks, dtype=np.float64)[..., :3]
+        values = np.empty(points.shape[:-2] + (len(self.names),), dtype=np.float64)
+
+        for is_point_kind, kind, cols, idx in self._steps:
+            if is_point_kind:
+                result = POINT_KINDS[kind][1](points, idx)
+            else:
+                result = DERIVED_KINDS[kind][1](values, idx)
+            values[..., cols] = result * self.scale[cols] + self.offset[cols]
+
+        return values
+
+    def evaluate_outputs(self, landmarks: np.ndarray) -> np.ndarray:
+        """
+        计算需要输出的指标
+
+        Returns:
+            指标矩阵，列顺序与 output_names 一致
+        """
+        return self.evaluate(landmarks)[..., self.output_columns]
+
+    def evaluate_dict(self, landmarks: np.ndarray) -> Dict[str, float]:
+        """
+        计算单帧指标并以字典形式返回
+
+        Args:
+            landmarks: 单帧关键点数组，形状为 (33, >=3)
+
+        Returns:
+            指标字典 {指标名称: 数值}
+        """
+        values = self.evaluate_outputs(landmarks)
+        return dict(zip(self.output_names, values.tolist()))
+
+
+_PLAN_CACHE: Dict[Tuple[str, Optional[str]], AnglePlan] = {}
+
+
+def get_angle_plan(action: str, view: Optional[str]) -> AnglePlan:
+    """
+    获取 (动作, 视图) 对应的编译后计算计划
+
+    查找顺序为 (动作, 视图) -> (动作, None) -> ('squat', 视图)，
+    没有专门规格的动作沿用深蹲在该视图下的指标。编译结果会被缓存。
+
+    Args:
+        action: 动作名称，如 'squat'、'hurdle_step'
+        view: 视图名称，如 'front'、'side'、'45'
+
+    Returns:
+        编译后的计算计划
+    """
+    for key in ((action, view), (action, None), ('squat', view)):
+        if key in ANGLE_SPECS:
+            break
+    else:
+        raise KeyError(f"没有找到动作 {action} 在视图 {view} 下的指标规格")
+
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = AnglePlan(key[0], key[1], ANGLE_SPECS[key])
+        _PLAN_CACHE[key] = plan
+    return plan
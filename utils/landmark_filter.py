@@ -2,37 +2,244 @@
 关键点滤波工具模块
 
 该模块提供了对MediaPipe关键点数据进行滤波和平滑处理的函数。
+
+LandmarkFilter 支持两种模式：
+- moving_average: 滑动窗口移动平均，平滑效果稳定，但有约 window_size/2 帧的滞后
+- one_euro: One Euro自适应低通滤波，静止时抖动小，快速运动时滞后小
 """
 
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from collections import deque
+
+from .angle_calculations import NUM_LANDMARKS
+
+
+# 各动作的One Euro滤波参数（坐标为归一化图像坐标，速度单位为 坐标/秒）
+# min_cutoff越小静止时越平滑，beta越大快速运动时滞后越小
+ONE_EURO_PRESETS = {
+    'default': {'min_cutoff': 1.0, 'beta': 10.0, 'd_cutoff': 1.0},
+    'squat': {'min_cutoff': 1.0, 'beta': 10.0, 'd_cutoff': 1.0},
+    'split_squat': {'min_cutoff': 1.0, 'beta': 10.0, 'd_cutoff': 1.0},
+    'hurdle_step': {'min_cutoff': 1.5, 'beta': 20.0, 'd_cutoff': 1.0},
+    'active_leg_raise': {'min_cutoff': 1.5, 'beta': 20.0, 'd_cutoff': 1.0},
+    'shoulder_flex': {'min_cutoff': 0.5, 'beta': 5.0, 'd_cutoff': 1.0},
+    'push_up': {'min_cutoff': 1.0, 'beta': 10.0, 'd_cutoff': 1.0},
+    'trunk_rotation': {'min_cutoff': 1.0, 'beta': 15.0, 'd_cutoff': 1.0}
+}
+
+
+class OneEuroFilter:
+    """
+    向量化One Euro滤波器
+    
+    对所有关键点同时执行One Euro滤波：截止频率随速度自适应，
+    cutoff = min_cutoff + beta * |速度|，静止时强平滑，快速运动时低滞后。
+    """
+    
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 10.0, d_cutoff: float = 1.0,
+                 frequency: float = 30.0, num_landmarks: int = NUM_LANDMARKS):
+        """
+        初始化滤波器
+        
+        Args:
+            min_cutoff: 最小截止频率（Hz）
+            beta: 速度系数
+            d_cutoff: 速度估计的截止频率（Hz）
+            frequency: 未提供时间戳时假定的帧率（Hz）
+            num_landmarks: 关键点数量
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.frequency = frequency
+        self.num_landmarks = num_landmarks
+        self._value = np.zeros((num_landmarks, 3))
+        self._derivative = np.zeros((num_landmarks, 3))
+        self._initialized = np.zeros(num_landmarks, dtype=bool)
+        self._last_timestamp = None
+        
+    def reset(self):
+        """重置滤波器状态"""
+        self._value.fill(0.0)
+        self._derivative.fill(0.0)
+        self._initialized.fill(False)
+        self._last_timestamp = None
+        
+    @staticmethod
+    def _alpha(cutoff, dt: float):
+        """根据截止频率计算平滑系数"""
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+        
+    def filter(self, landmarks: np.ndarray, mask: Optional[np.ndarray] = None,
+               timestamp: Optional[float] = None) -> np.ndarray:
+        """
+        对一帧关键点数组进行滤波处理
+        
+        Args:
+            landmarks: 关键点数组，形状为 (33, >=3)，只使用前三列坐标
+            mask: 有效关键点掩码，形状为 (33,)，无效关键点保持上一帧的滤波结果
+            timestamp: 帧时间戳（秒），None表示按 frequency 推算
+            
+        Returns:
+            滤波后的关键点数组，形状为 (33, 3)
+        """
+        points = np.asarray(landmarks, dtype=np.float64)[:, :3]
+        valid = np.ones(self.num_landmarks, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        
+        dt = 1.0 / self.frequency
+        if timestamp is not None:
+            if self._last_timestamp is not None and timestamp > self._last_timestamp:
+                dt = timestamp - self._last_timestamp
+            self._last_timestamp = timestamp
+        
+        # 速度估计及其低通滤波
+        derivative = (points - self._value) / dt
+        alpha_d = self._alpha(self.d_cutoff, dt)
+        derivative = alpha_d * derivative + (1 - alpha_d) * self._derivative
+        
+        # 按速度自适应截止频率
+        speed = np.linalg.norm(derivative, axis=1, keepdims=True)
+        alpha = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        value = alpha * points + (1 - alpha) * self._value
+        
+        # 首次出现的关键点直接使用原值，无效关键点保持原状态
+        first = valid & ~self._initialized
+        value[first] = points[first]
+        derivative[first] = 0.0
+        update = valid[:, None]
+        np.copyto(self._value, value, where=update)
+        np.copyto(self._derivative, derivative, where=update)
+        self._initialized |= valid
+        
+        result = self._value.copy()
+        never_seen = ~self._initialized
+        result[never_seen] = points[never_seen]
+        return result
 
 
 class LandmarkFilter:
     """
     关键点滤波器类
     
-    使用移动平均法对关键点数据进行平滑处理，减少抖动。
+    使用移动平均法对关键点数据进行平滑处理，减少抖动；
+    mode='one_euro' 时改用自适应低滞后的One Euro滤波。
+    
+    移动平均模式内部使用形状为 (window_size, 33, 3) 的环形缓冲区并维护滑动窗口的累加和，
+    每帧只需减去被覆盖的旧数据、加上新数据，计算量与窗口大小无关。
     """
     
-    def __init__(self, window_size: int = 5):
+    MODES = ('moving_average', 'one_euro')
+    
+    # 每隔 window_size * RESYNC_INTERVAL 帧重新计算一次累加和，消除浮点累积误差
+    RESYNC_INTERVAL = 64
+    
+    def __init__(self, window_size: int = 5, num_landmarks: int = NUM_LANDMARKS,
+                 mode: str = 'moving_average', **one_euro_params):
         """
         初始化滤波器
         
         Args:
             window_size: 移动平均窗口大小
+            num_landmarks: 关键点数量
+            mode: 滤波模式，'moving_average' 或 'one_euro'
+            **one_euro_params: One Euro滤波参数（min_cutoff, beta, d_cutoff, frequency）
         """
+        if mode not in self.MODES:
+            raise ValueError(f"未知的滤波模式: {mode}")
+        self.mode = mode
         self.window_size = window_size
-        self.history: Dict[int, deque] = {}
+        self.num_landmarks = num_landmarks
+        self._one_euro = OneEuroFilter(num_landmarks=num_landmarks, **one_euro_params) \
+            if mode == 'one_euro' else None
+        self._buffer = np.zeros((window_size, num_landmarks, 3))
+        self._valid = np.zeros((window_size, num_landmarks), dtype=bool)
+        self._sum = np.zeros((num_landmarks, 3))
+        self._count = np.zeros(num_landmarks, dtype=np.int64)
+        self._index = 0
+        self._updates = 0
+        
+    @classmethod
+    def for_action(cls, action: str, mode: str = 'one_euro', window_size: int = 5,
+                   **overrides) -> 'LandmarkFilter':
+        """
+        按动作创建滤波器，One Euro参数取自 ONE_EURO_PRESETS
+        
+        Args:
+            action: 动作名称，如 'squat'
+            mode: 滤波模式
+            window_size: 移动平均窗口大小
+            **overrides: 覆盖预设的One Euro参数
+            
+        Returns:
+            滤波器实例
+        """
+        if mode != 'one_euro':
+            return cls(window_size=window_size, mode=mode)
+        params = dict(ONE_EURO_PRESETS.get(action, ONE_EURO_PRESETS['default']))
+        params.update(overrides)
+        return cls(window_size=window_size, mode=mode, **params)
         
     def reset(self):
         """重置滤波器历史数据"""
-        self.history.clear()
+        if self._one_euro is not None:
+            self._one_euro.reset()
+        self._buffer.fill(0.0)
+        self._valid.fill(False)
+        self._sum.fill(0.0)
+        self._count.fill(0)
+        self._index = 0
+        self._updates = 0
+        
+    def filter(self, landmarks: np.ndarray, mask: Optional[np.ndarray] = None,
+               timestamp: Optional[float] = None) -> np.ndarray:
+        """
+        对一帧关键点数组进行滤波处理
+        
+        Args:
+            landmarks: 关键点数组，形状为 (33, >=3)，只使用前三列坐标
+            mask: 有效关键点掩码，形状为 (33,)，None表示全部有效；
+                  无效的关键点不参与平均
+            timestamp: 帧时间戳（秒），仅One Euro模式使用
+            
+        Returns:
+            滤波后的关键点数组，形状为 (33, 3)
+        """
+        if self._one_euro is not None:
+            return self._one_euro.filter(landmarks, mask, timestamp)
+        
+        points = np.asarray(landmarks, dtype=np.float64)[:, :3]
+        valid = np.ones(self.num_landmarks, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        slot = self._buffer[self._index]
+        slot_valid = self._valid[self._index]
+        
+        # 移除即将被覆盖的旧数据（无效位置在缓冲区中保存为0）
+        self._sum -= slot
+        self._count -= slot_valid
+        
+        # 写入新数据
+        np.copyto(slot, points)
+        slot[~valid] = 0.0
+        slot_valid[:] = valid
+        self._sum += slot
+        self._count += valid
+        
+        self._index = (self._index + 1) % self.window_size
+        self._updates += 1
+        if self._updates % (self.window_size * self.RESYNC_INTERVAL) == 0:
+            self._buffer.sum(axis=0, out=self._sum)
+        
+        # 计算移动平均值，窗口内没有有效数据的关键点保持原值
+        filtered = points.copy()
+        has_data = self._count > 0
+        filtered[has_data] = self._sum[has_data] / self._count[has_data, None]
+        return filtered
         
     def filter_landmarks(self, landmarks: Dict[int, Tuple[float, float, float]]) -> Dict[int, Tuple[float, float, float]]:
         """
-        对关键点数据进行滤波处理
+        对关键点数据字典进行滤波处理（兼容接口）
+        
+        字典会被转换为数组后交给 filter() 处理，未出现的关键点视为该帧无效。
         
         Args:
             landmarks: 原始关键点数据字典
@@ -40,25 +247,17 @@ class LandmarkFilter:
         Returns:
             滤波后的关键点数据字典
         """
-        filtered_landmarks = {}
-        
-        for landmark_id, (x, y, z) in landmarks.items():
-            # 初始化历史记录
-            if landmark_id not in self.history:
-                self.history[landmark_id] = deque(maxlen=self.window_size)
-                
-            # 添加当前数据到历史记录
-            self.history[landmark_id].append((x, y, z))
-            
-            # 计算移动平均值
-            history_data = list(self.history[landmark_id])
-            avg_x = sum([pt[0] for pt in history_data]) / len(history_data)
-            avg_y = sum([pt[1] for pt in history_data]) / len(history_data)
-            avg_z = sum([pt[2] for pt in history_data]) / len(history_data)
-            
-            filtered_landmarks[landmark_id] = (avg_x, avg_y, avg_z)
-            
-        return filtered_landmarks
+        if not landmarks:
+            return {}
+        
+        ids = np.fromiter(landmarks.keys(), dtype=np.intp, count=len(landmarks))
+        points = np.zeros((self.num_landmarks, 3))
+        points[ids] = [point[:3] for point in landmarks.values()]
+        mask = np.zeros(self.num_landmarks, dtype=bool)
+        mask[ids] = True
+        
+        filtered = self.filter(points, mask)
+        return {landmark_id: tuple(point) for landmark_id, point in zip(landmarks.keys(), filtered[ids].tolist())}
 
 
 def exponential_moving_average(current_value: float, 
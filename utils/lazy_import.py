@@ -0,0 +1,95 @@
+"""
+延迟导入模块
+
+cv2、mediapipe 等模块导入耗时较长（Android上可达数秒），在模块顶层导入会推迟第一个界面的显示。
+该模块提供一个模块代理：首次访问属性时才真正导入，之后直接转发到已导入的模块。
+
+功能描述:
+- lazy_import: 延迟导入整个模块
+- lazy_attribute: 延迟获取模块中的子对象（如 mediapipe.solutions.pose）
+- 导入过程加锁，后台预热线程和界面线程同时访问时只导入一次
+
+使用示例:
+    cv2 = lazy_import('cv2')             # 此时尚未导入
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # 第一次使用时导入
+"""
+
+import functools
+import importlib
+import threading
+from typing import Any, Callable
+
+
+class LazyModule:
+    """首次访问属性时才加载的模块代理"""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        """
+        初始化模块代理
+
+        Args:
+            name: 模块名称（仅用于显示）
+            loader: 返回实际模块（或对象）的函数
+        """
+        self.__dict__['_name'] = name
+        self.__dict__['_loader'] = loader
+        self.__dict__['_target'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def load(self) -> Any:
+        """加载并返回实际模块（可在后台线程中调用以预热）"""
+        target = self.__dict__['_target']
+        if target is None:
+            with self.__dict__['_lock']:
+                target = self.__dict__['_target']
+                if target is None:
+                    target = self.__dict__['_loader']()
+                    self.__dict__['_target'] = target
+        return target
+
+    @property
+    def loaded(self) -> bool:
+        """是否已经加载"""
+        return self.__dict__['_target'] is not None
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.load(), attribute)
+
+    def __setattr__(self, attribute: str, value: Any) -> None:
+        setattr(self.load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def __repr__(self) -> str:
+        state = "已加载" if self.loaded else "未加载"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    延迟导入模块
+
+    Args:
+        name: 模块名称，例如 'cv2'
+
+    Returns:
+        LazyModule: 模块代理
+    """
+    return LazyModule(name, functools.partial(importlib.import_module, name))
+
+
+def lazy_attribute(module_name: str, path: str) -> LazyModule:
+    """
+    延迟获取模块中的子对象
+
+    Args:
+        module_name: 模块名称，例如 'mediapipe'
+        path: 以点分隔的属性路径，例如 'solutions.pose'
+
+    Returns:
+        LazyModule: 子对象代理
+    """
+    def loader():
+        return functools.reduce(getattr, path.split('.'), importlib.import_module(module_name))
+    return LazyModule(f"{module_name}.{path}", loader)
@@ -0,0 +1,244 @@
+"""
+指标历史存储模块
+
+该模块提供了列式的指标历史存储，用于替代 “字典列表 / 浮点数列表” 形式的历史记录。
+
+功能描述:
+- 每个指标使用一列连续的 float32 数组保存，内存占用约为Python浮点对象的1/8
+- 未设置容量时按倍数扩容（均摊O(1)追加）
+- 设置容量时作为环形缓冲区使用，只保留最近 capacity 帧
+- 可选溢出到磁盘：环形缓冲区淘汰的旧数据按列追加写入 spill_dir 下的二进制文件
+- column() 返回零拷贝的NumPy视图，可直接传给分析工具函数
+
+环形缓冲区内部按 “双写” 方式存储（每行同时写入 i 和 i + capacity 两个位置），
+因此任意时刻保留的最近 capacity 帧在内存中都是连续的，视图无需拷贝。
+
+使用示例:
+    history = MetricHistory(capacity=18000)
+    history.append({'left_knee_angle': 95.0, 'right_knee_angle': 93.0})
+    knee = history.column('left_knee_angle')   # np.ndarray 视图
+"""
+
+import os
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+class MetricHistory:
+    """列式指标历史存储"""
+
+    def __init__(self, capacity: Optional[int] = None, initial_capacity: int = 256,
+                 spill_dir: Optional[str] = None, dtype=np.float32):
+        """
+        初始化历史存储
+
+        Args:
+            capacity: 保留的最大帧数，None表示不限制（按倍数扩容）
+            initial_capacity: 不限容量时的初始分配帧数
+            spill_dir: 溢出目录，设置后环形缓冲区淘汰的数据会写入该目录
+            dtype: 存储数据类型
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity必须大于0")
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.dtype = np.dtype(dtype)
+        self._initial_capacity = max(1, initial_capacity)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._spill_files = {}
+        self._allocated = capacity if capacity is not None else self._initial_capacity
+        self._length = 0
+        self._total = 0
+        self.spilled_rows = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @property
+    def names(self) -> List[str]:
+        """按首次出现顺序排列的指标名称"""
+        return list(self._columns)
+
+    @property
+    def total_rows(self) -> int:
+        """累计追加的帧数（包括已被淘汰的帧）"""
+        return self._total
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.column(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def keys(self) -> List[str]:
+        """指标名称列表（兼容字典接口）"""
+        return self.names
+
+    def items(self):
+        """(指标名称, 数据视图) 迭代器（兼容字典接口）"""
+        return ((name, self.column(name)) for name in self._columns)
+
+    def _storage_size(self) -> int:
+        """每列底层数组的长度"""
+        return self._allocated * 2 if self.capacity is not None else self._allocated
+
+    def _add_column(self, name: str) -> np.ndarray:
+        """新增指标列，之前的帧填充为NaN"""
+        storage = np.full(self._storage_size(), np.nan, dtype=self.dtype)
+        self._columns[name] = storage
+        return storage
+
+    def _grow(self) -> None:
+        """不限容量模式下按倍数扩容"""
+        self._allocated *= 2
+        for name, storage in self._columns.items():
+            grown = np.full(self._allocated, np.nan, dtype=self.dtype)
+            grown[:self._length] = storage[:self._length]
+            self._columns[name] = grown
+
+    def _spill(self, position: int) -> None:
+        """把即将被覆盖的一行写入溢出文件"""
+        for name, storage in self._columns.items():
+            spill_file = self._spill_files.get(name)
+            if spill_file is None:
+                spill_file = open(os.path.join(self.spill_dir, f"{name}.f32"), 'wb')
+                # 新出现的指标补齐之前已溢出的行
+                if self.spilled_rows:
+                    np.full(self.spilled_rows, np.nan, dtype=self.dtype).tofile(spill_file)
+                self._spill_files[name] = spill_file
+            spill_file.write(storage[position].tobytes())
+        self.spilled_rows += 1
+
+    def append(self, values: Dict[str, float]) -> None:
+        """
+        追加一帧指标数据
+
+        Args:
+            values: 指标字典 {指标名称: 数值}，缺失的指标记为NaN
+        """
+        for name in values:
+            if name not in self._columns:
+                self._add_column(name)
+
+        if self.capacity is None:
+            if self._length == self._allocated:
+                self._grow()
+            position = self._length
+            for name, storage in self._columns.items():
+                storage[position] = values.get(name, np.nan)
+            self._length += 1
+        else:
+            position = self._total % self.capacity
+            if self._length == self.capacity and self.spill_dir:
+                self._spill(position)
+            for name, storage in self._columns.items():
+                value = values.get(name, np.nan)
+                storage[position] = value
+                storage[position + self.capacity] = value
+            self._length = min(self._length + 1, self.capacity)
+
+        self._total += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        获取指标在保留窗口内的数据（零拷贝视图，按时间顺序）
+
+        Args:
+            name: 指标名称
+
+        Returns:
+            形状为 (len(self),) 的只读视图
+        """
+        storage = self._columns[name]
+        if self.capacity is None:
+            view = storage[:self._length]
+        else:
+            start = (self._total - self._length) % self.capacity
+            view = storage[start:start + self._length]
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def matrix(self, names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        获取多个指标组成的矩阵（拷贝）
+
+        Args:
+            names: 指标名称列表，None表示全部指标
+
+        Returns:
+            形状为 (len(self), 指标数) 的数组
+        """
+        names = self.names if names is None else names
+        if not names:
+            return np.empty((self._length, 0), dtype=self.dtype)
+        return np.column_stack([self.column(name) for name in names])
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """
+        获取最近一帧的指标
+
+        Returns:
+            指标字典，没有数据时返回None
+        """
+        if self._length == 0:
+            return None
+        position = (self._total - 1) % self.capacity if self.capacity is not None else self._length - 1
+        return {name: float(storage[position]) for name, storage in self._columns.items()}
+
+    def read_spilled(self, name: str) -> np.ndarray:
+        """
+        读取已溢出到磁盘的指标数据
+
+        Args:
+            name: 指标名称
+
+        Returns:
+            按时间顺序排列的溢出数据，长度为 spilled_rows
+        """
+        spill_file = self._spill_files.get(name)
+        if spill_file is None:
+            return np.full(self.spilled_rows, np.nan, dtype=self.dtype)
+        spill_file.flush()
+        return np.fromfile(spill_file.name, dtype=self.dtype)
+
+    def full_column(self, name: str) -> np.ndarray:
+        """
+        获取指标的完整历史（溢出数据 + 保留窗口，拷贝）
+
+        Args:
+            name: 指标名称
+
+        Returns:
+            按时间顺序排列的完整数据
+        """
+        return np.concatenate([self.read_spilled(name), self.column(name)])
+
+    def clear(self) -> None:
+        """清空历史数据，并删除本存储写入的溢出文件"""
+        paths = [spill_file.name for spill_file in self._spill_files.values()]
+        self.close()
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self._columns = {}
+        self._allocated = self.capacity if self.capacity is not None else self._initial_capacity
+        self._length = 0
+        self._total = 0
+        self.spilled_rows = 0
+
+    def close(self) -> None:
+        """关闭溢出文件"""
+        for spill_file in self._spill_files.values():
+            spill_file.close()
+        self._spill_files = {}
+
+    def nbytes(self) -> int:
+        """内存中历史数据占用的字节数"""
+        return sum(storage.nbytes for storage in self._columns.values())
@@ -2,11 +2,15 @@
 动作轨迹分析工具模块
 
 该模块提供了分析人体动作轨迹的函数。
+calculate_kinematics 等 *_array 函数直接处理 (T, 3) 或 (T, 33, 3) 数组，
+支持非均匀时间戳，一次调用即可得到所有关键点的速度和加速度。
+RunningStats 和 *_stream 函数以分块方式累积统计量，
+可直接消费 DatabaseManager.iter_session_chunks 的输出，内存占用与会话长度无关。
+scipy 只在 savgol 求导和峰值检测中用到，在函数内导入以缩短应用启动时间。
 """
 
 import numpy as np
-from typing import List, Tuple, Dict
-from scipy.signal import find_peaks
+from typing import List, Tuple, Dict, Iterable, Optional, Sequence
 
 
 def calculate_velocity(positions: List[Tuple[float, float, float]], 
@@ -20,6 +24,10 @@ def calculate_velocity(positions: List[Tuple[float, float, float]],
         
     Returns:
         速度序列 [(vx, vy, vz), ...]
+        
+    注意:
+        使用后向差分，第i项为第i-1帧到第i帧的平均速度。
+        数组数据或需要加速度时请使用 calculate_kinematics。
     """
     velocities = []
     
@@ -51,6 +59,10 @@ def calculate_acceleration(velocities: List[Tuple[float, float, float]],
         
     Returns:
         加速度序列 [(ax, ay, az), ...]
+        
+    注意:
+        calculate_velocity 的结果对应相邻两帧的中点时刻，此处仍按帧时间间隔求差，
+        时间间隔不均匀时结果有偏差。新代码请使用 calculate_kinematics。
     """
     accelerations = []
     
@@ -71,6 +83,120 @@ def calculate_acceleration(velocities: List[Tuple[float, float, float]],
     return accelerations
 
 
+def _validate_times(positions: np.ndarray, frame_times) -> np.ndarray:
+    """检查时间戳与数据帧数一致且严格递增"""
+    times = np.asarray(frame_times, dtype=np.float64)
+    if times.ndim != 1 or len(times) != len(positions):
+        raise ValueError("frame_times 的长度必须与数据帧数相同")
+    if len(times) > 1 and np.any(np.diff(times) <= 0):
+        raise ValueError("frame_times 必须严格递增")
+    return times
+
+
+def _resample_linear(values: np.ndarray, source_times: np.ndarray, target_times: np.ndarray) -> np.ndarray:
+    """沿第0维对多列数据做线性插值（所有列共用同一组插值权重）"""
+    index = np.clip(np.searchsorted(source_times, target_times, side='right') - 1, 0, len(source_times) - 2)
+    t0 = source_times[index]
+    t1 = source_times[index + 1]
+    weight = ((target_times - t0) / (t1 - t0)).reshape((-1,) + (1,) * (values.ndim - 1))
+    return values[index] * (1 - weight) + values[index + 1] * weight
+
+
+def _savgol_derivatives(positions: np.ndarray, times: np.ndarray, window_length: int,
+                        polyorder: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    使用Savitzky-Golay滤波估计一阶和二阶导数
+    
+    时间戳不均匀时先线性插值到等间隔网格（帧数不变），求导后再插值回原时刻。
+    """
+    count = len(times)
+    window_length = min(window_length, count if count % 2 else count - 1)
+    if window_length <= polyorder:
+        return None
+    
+    grid = np.linspace(times[0], times[-1], count)
+    uniform = np.allclose(grid, times, rtol=0, atol=1e-9)
+    samples = positions if uniform else _resample_linear(positions, times, grid)
+    delta = grid[1] - grid[0]
+    
+    from scipy.signal import savgol_filter
+    
+    velocity = savgol_filter(samples, window_length, polyorder, deriv=1, delta=delta, axis=0)
+    acceleration = (savgol_filter(samples, window_length, polyorder, deriv=2, delta=delta, axis=0)
+                    if polyorder >= 2 else np.gradient(velocity, grid, axis=0))
+    if not uniform:
+        velocity = _resample_linear(velocity, grid, times)
+        acceleration = _resample_linear(acceleration, grid, times)
+    return velocity, acceleration
+
+
+def calculate_kinematics(positions, frame_times, method: str = 'gradient',
+                         window_length: int = 7, polyorder: int = 2) -> Dict[str, np.ndarray]:
+    """
+    计算关键点的速度、加速度和速率
+    
+    Args:
+        positions: 关键点位置数组，形状为 (T, 3) 或 (T, 33, 3)（也可为 (T,) 的单个标量序列）
+        frame_times: 帧时间戳 (T,)，单位秒，可不均匀但必须严格递增
+        method: 'gradient' 使用 np.gradient 的中心差分（非均匀时间戳下为二阶精度）；
+                'savgol' 使用Savitzky-Golay多项式拟合求导，同时起到平滑作用
+        window_length: Savitzky-Golay窗口长度（奇数，帧数不足时自动缩小）
+        polyorder: Savitzky-Golay多项式阶数
+        
+    Returns:
+        {
+            'velocity': 与 positions 形状相同的速度数组,
+            'acceleration': 与 positions 形状相同的加速度数组,
+            'speed': 速率（速度在最后一维上的模），形状为 positions.shape[:-1]
+        }
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    times = _validate_times(positions, frame_times)
+    if method not in ('gradient', 'savgol'):
+        raise ValueError(f"不支持的求导方法: {method}")
+    
+    if len(times) < 2:
+        velocity = np.zeros_like(positions)
+        acceleration = np.zeros_like(positions)
+    else:
+        derivatives = _savgol_derivatives(positions, times, window_length, polyorder) if method == 'savgol' else None
+        if derivatives is None:
+            # 帧数不足以进行Savitzky-Golay拟合时退回中心差分
+            velocity = np.gradient(positions, times, axis=0)
+            acceleration = np.gradient(velocity, times, axis=0)
+        else:
+            velocity, acceleration = derivatives
+    
+    speed = np.linalg.norm(velocity, axis=-1) if positions.ndim > 1 else np.abs(velocity)
+    return {'velocity': velocity, 'acceleration': acceleration, 'speed': speed}
+
+
+def calculate_velocity_array(positions, frame_times, method: str = 'gradient',
+                             window_length: int = 7, polyorder: int = 2) -> np.ndarray:
+    """
+    计算关键点速度（数组版本）
+    
+    参数含义见 calculate_kinematics。
+    
+    Returns:
+        与 positions 形状相同的速度数组
+    """
+    return calculate_kinematics(positions, frame_times, method, window_length, polyorder)['velocity']
+
+
+def calculate_acceleration_array(positions, frame_times, method: str = 'gradient',
+                                 window_length: int = 7, polyorder: int = 2) -> np.ndarray:
+    """
+    计算关键点加速度（数组版本，直接由位置求二阶导数）
+    
+    参数含义见 calculate_kinematics。
+    
+    Returns:
+        与 positions 形状相同的加速度数组
+    """
+    return calculate_kinematics(positions, frame_times, method, window_length, polyorder)['acceleration']
+
+
 def detect_movement_peaks(data: List[float], 
                          height: float = None, 
                          distance: int = 10) -> Tuple[List[int], Dict]:
@@ -85,6 +211,8 @@ def detect_movement_peaks(data: List[float],
     Returns:
         (峰值索引列表, 峰值信息字典)
     """
+    from scipy.signal import find_peaks
+    
     peaks, properties = find_peaks(data, height=height, distance=distance)
     return peaks.tolist(), properties
 
@@ -163,4 +291,151 @@ def calculate_symmetry(left_data: List[float],
     # 转换为0-100的得分
     symmetry_score = abs(correlation) * 100 if not np.isnan(correlation) else 0.0
     
-    return float(symmetry_score)
\ No newline at end of file
+    return float(symmetry_score)
+
+
+class RunningStats:
+    """
+    按列累积的流式统计量（忽略NaN）
+    
+    使用 Chan 等人的并行合并公式逐块更新均值和二阶中心矩，
+    结果与对完整数据直接计算一致（np.std 默认的总体标准差）。
+    """
+    
+    def __init__(self, num_columns: int):
+        """
+        初始化统计量
+        
+        Args:
+            num_columns: 列数
+        """
+        self.count = np.zeros(num_columns, dtype=np.int64)
+        self.mean = np.zeros(num_columns, dtype=np.float64)
+        self.m2 = np.zeros(num_columns, dtype=np.float64)
+        self.min = np.full(num_columns, np.inf)
+        self.max = np.full(num_columns, -np.inf)
+        
+    def update(self, matrix: np.ndarray) -> None:
+        """
+        合并一块数据
+        
+        Args:
+            matrix: 形状为 (帧数, 列数) 的数组
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        valid = ~np.isnan(matrix)
+        n_b = valid.sum(axis=0)
+        if not n_b.any():
+            return
+        filled = np.where(valid, matrix, 0.0)
+        safe_n_b = np.maximum(n_b, 1)
+        mean_b = filled.sum(axis=0) / safe_n_b
+        m2_b = (np.where(valid, matrix - mean_b, 0.0) ** 2).sum(axis=0)
+        
+        n = self.count + n_b
+        safe_n = np.maximum(n, 1)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / safe_n
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_n
+        self.count = n
+        self.min = np.minimum(self.min, np.where(valid, matrix, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(valid, matrix, -np.inf).max(axis=0))
+        
+    @property
+    def std(self) -> np.ndarray:
+        """各列的总体标准差（样本数不足2时为0）"""
+        return np.where(self.count > 1, np.sqrt(self.m2 / np.maximum(self.count, 1)), 0.0)
+
+
+def _chunk_matrices(chunks: Iterable) -> Iterable[Tuple[List[str], np.ndarray]]:
+    """从数据块迭代器中取出 (指标名称, 矩阵)，兼容 (names, timestamps, matrix) 和 (names, matrix) 两种形式"""
+    for chunk in chunks:
+        yield chunk[0], chunk[-1]
+
+
+def analyze_movement_stream(chunks: Iterable,
+                            names: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    流式计算各指标的动作范围和平滑度
+    
+    Args:
+        chunks: 数据块迭代器 [(指标名称列表, 时间戳数组, 矩阵), ...]，
+                各块的指标名称列表相同
+        names: 需要统计的指标，None表示全部
+        
+    Returns:
+        {指标名称: {'min', 'max', 'range', 'mean', 'smoothness'}}，
+        与 calculate_movement_range / calculate_smoothness 的结果一致
+    """
+    stats = None
+    columns = None
+    for chunk_names, matrix in _chunk_matrices(chunks):
+        if stats is None:
+            selected = list(chunk_names) if names is None else list(names)
+            columns = [list(chunk_names).index(name) for name in selected]
+            names = selected
+            stats = RunningStats(len(columns))
+        stats.update(np.asarray(matrix)[:, columns])
+    
+    results = {}
+    if stats is None:
+        return results
+    std = stats.std
+    for i, name in enumerate(names):
+        if stats.count[i] == 0:
+            results[name] = {'min': 0.0, 'max': 0.0, 'range': 0.0, 'mean': 0.0, 'smoothness': 0.0}
+            continue
+        results[name] = {
+            'min': float(stats.min[i]),
+            'max': float(stats.max[i]),
+            'range': float(stats.max[i] - stats.min[i]),
+            'mean': float(stats.mean[i]),
+            'smoothness': float(std[i])
+        }
+    return results
+
+
+def calculate_symmetry_stream(chunks: Iterable, left_name: str, right_name: str) -> float:
+    """
+    流式计算左右对称性（左右两列的相关系数）
+    
+    Args:
+        chunks: 数据块迭代器 [(指标名称列表, 时间戳数组, 矩阵), ...]
+        left_name: 左侧指标名称
+        right_name: 右侧指标名称
+        
+    Returns:
+        对称性得分（0-100，100为完全对称），只使用左右两侧均有数据的帧
+    """
+    n = 0
+    mean_x = mean_y = 0.0
+    m2_x = m2_y = c_xy = 0.0
+    for chunk_names, matrix in _chunk_matrices(chunks):
+        chunk_names = list(chunk_names)
+        if left_name not in chunk_names or right_name not in chunk_names:
+            continue
+        matrix = np.asarray(matrix, dtype=np.float64)
+        x = matrix[:, chunk_names.index(left_name)]
+        y = matrix[:, chunk_names.index(right_name)]
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        n_b = len(x)
+        if n_b == 0:
+            continue
+        mx, my = x.mean(), y.mean()
+        dx, dy = x - mx, y - my
+        total = n + n_b
+        delta_x, delta_y = mx - mean_x, my - mean_y
+        m2_x += (dx ** 2).sum() + delta_x ** 2 * n * n_b / total
+        m2_y += (dy ** 2).sum() + delta_y ** 2 * n * n_b / total
+        c_xy += (dx * dy).sum() + delta_x * delta_y * n * n_b / total
+        mean_x += delta_x * n_b / total
+        mean_y += delta_y * n_b / total
+        n = total
+    
+    if n == 0:
+        return 100.0
+    if m2_x == 0 or m2_y == 0:
+        return 0.0
+    correlation = c_xy / np.sqrt(m2_x * m2_y)
+    return float(abs(correlation) * 100)
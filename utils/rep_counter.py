@@ -0,0 +1,260 @@
+"""
+重复次数计数与动作阶段分割模块
+
+该模块提供了在线的重复次数计数器，逐帧接收关节角度（如膝角度），
+用带滞回的阈值和一个小状态机实时识别 下降 / 最低点 / 上升 阶段，每帧O(1)。
+
+功能描述:
+- RepCounter: 只处理单个标量序列，输出阶段事件
+- RepSegmenter: 组合计数器和角度缓冲区，每完成一次动作即得到该次的帧窗口，
+  并可交给评估器单独评分
+
+事件类型:
+- 'descent': 角度低于 top_threshold - hysteresis，开始下降
+- 'bottom': 角度从最低值回升超过 hysteresis 且最低值达到 bottom_threshold，
+  事件的帧索引和数值为最低点
+- 'ascent': 开始上升（与 'bottom' 同一帧产生）
+- 'rep': 角度回到 top_threshold + hysteresis 以上，完成一次
+- 'abort': 下降未达到 bottom_threshold 就回到站立位，或单次动作超过最大帧数
+
+使用示例:
+    counter = RepCounter(top_threshold=150, bottom_threshold=120)
+    for angle in knee_angles:
+        for event in counter.update(angle):
+            print(event.kind, event.rep)
+"""
+
+import math
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from .metric_history import MetricHistory
+
+
+class RepEvent(NamedTuple):
+    """动作阶段事件"""
+    kind: str              # 'descent' / 'bottom' / 'ascent' / 'rep' / 'abort'
+    rep: int               # 所属的第几次动作（从1开始）
+    frame_index: int       # 事件对应的帧索引
+    timestamp: Optional[float]
+    value: float           # 事件帧的角度值
+    window: Optional['RepWindow'] = None  # 'rep' 事件附带的本次动作窗口
+
+
+class RepWindow(NamedTuple):
+    """一次完整动作的帧窗口"""
+    rep: int
+    start_index: int
+    bottom_index: int
+    end_index: int
+    names: List[str]
+    timestamps: np.ndarray
+    matrix: np.ndarray     # (帧数, 指标数) float32
+    assessment: Optional[Dict] = None
+
+
+# 各动作用于计数的角度指标（按顺序取第一组可用的指标，多个指标取平均）
+REP_METRICS = {
+    'squat': (('knee_angle',), ('left_knee_angle', 'right_knee_angle'), ('side_knee_angle',)),
+    'split_squat': (('front_leg_knee_angle',),),
+}
+
+
+class RepCounter:
+    """带滞回阈值的在线重复次数计数器"""
+
+    STANDING = 'standing'
+    DESCENDING = 'descending'
+    ASCENDING = 'ascending'
+
+    def __init__(self, top_threshold: float = 150.0, bottom_threshold: float = 120.0,
+                 hysteresis: float = 5.0, max_rep_frames: Optional[int] = None):
+        """
+        初始化计数器
+
+        Args:
+            top_threshold: 站立位角度阈值
+            bottom_threshold: 计为一次有效动作所需达到的最低角度
+            hysteresis: 滞回带宽（度），用于抑制阈值附近的抖动
+            max_rep_frames: 单次动作最多帧数，超过则放弃本次，None表示不限制
+        """
+        if bottom_threshold >= top_threshold:
+            raise ValueError("bottom_threshold必须小于top_threshold")
+        self.top_threshold = top_threshold
+        self.bottom_threshold = bottom_threshold
+        self.hysteresis = hysteresis
+        self.max_rep_frames = max_rep_frames
+        self.reset()
+
+    def reset(self) -> None:
+        """重置计数器"""
+        self.state = self.STANDING
+        self.count = 0
+        self.frame_index = 0
+        self.rep_start = None
+        self.min_value = math.inf
+        self.min_index = None
+        self.min_timestamp = None
+
+    def update(self, value: float, timestamp: Optional[float] = None) -> List[RepEvent]:
+        """
+        输入一帧角度
+
+        Args:
+            value: 角度值，NaN或None表示本帧缺失（只推进帧索引）
+            timestamp: 帧时间戳
+
+        Returns:
+            本帧产生的事件列表（通常为空）
+        """
+        index = self.frame_index
+        self.frame_index += 1
+        if value is None or value != value:
+            return []
+
+        events = []
+        rep = self.count + 1
+        if self.state == self.STANDING:
+            if value < self.top_threshold - self.hysteresis:
+                self.state = self.DESCENDING
+                self.rep_start = index
+                self.min_value, self.min_index, self.min_timestamp = value, index, timestamp
+                events.append(RepEvent('descent', rep, index, timestamp, value))
+            return events
+
+        if self.max_rep_frames is not None and index - self.rep_start >= self.max_rep_frames:
+            self.state = self.STANDING
+            events.append(RepEvent('abort', rep, index, timestamp, value))
+            return events
+
+        if self.state == self.DESCENDING:
+            if value < self.min_value:
+                self.min_value, self.min_index, self.min_timestamp = value, index, timestamp
+            elif value > self.min_value + self.hysteresis:
+                if self.min_value <= self.bottom_threshold:
+                    self.state = self.ASCENDING
+                    events.append(RepEvent('bottom', rep, self.min_index, self.min_timestamp, self.min_value))
+                    events.append(RepEvent('ascent', rep, index, timestamp, value))
+                elif value > self.top_threshold + self.hysteresis:
+                    # 下蹲深度不足就回到站立位
+                    self.state = self.STANDING
+                    events.append(RepEvent('abort', rep, index, timestamp, value))
+        elif value > self.top_threshold + self.hysteresis:
+            self.state = self.STANDING
+            self.count += 1
+            events.append(RepEvent('rep', rep, index, timestamp, value))
+        return events
+
+
+def select_rep_value(angles: Dict[str, float], metric_groups: Sequence[Sequence[str]]) -> float:
+    """
+    从角度字典中取出用于计数的数值
+
+    Args:
+        angles: 角度字典
+        metric_groups: 候选指标组，取第一组全部存在的指标的平均值
+
+    Returns:
+        计数用的角度值，没有可用指标时为NaN
+    """
+    for group in metric_groups:
+        values = [angles.get(name) for name in group]
+        if all(v is not None and v == v for v in values):
+            return sum(values) / len(values)
+    return math.nan
+
+
+class RepSegmenter:
+    """
+    按重复次数分割角度数据
+
+    只缓存当前这一次动作的帧（从 'descent' 开始），完成后生成 RepWindow，
+    若提供了评估器则用 assess_rep 对该次动作单独评分。
+    """
+
+    def __init__(self, counter: Optional[RepCounter] = None, assessor=None,
+                 metric_groups: Sequence[Sequence[str]] = REP_METRICS['squat'],
+                 max_rep_frames: int = 1800):
+        """
+        初始化分割器
+
+        Args:
+            counter: 计数器，None表示使用默认参数创建
+            assessor: 评估器实例（BaseAssessor子类），None表示不评分
+            metric_groups: 计数用的候选指标组，见 select_rep_value
+            max_rep_frames: 单次动作最多缓存的帧数（默认约1分钟@30FPS）
+        """
+        self.counter = counter or RepCounter()
+        if self.counter.max_rep_frames is None:
+            self.counter.max_rep_frames = max_rep_frames
+        self.assessor = assessor
+        self.metric_groups = metric_groups
+        self.buffer = MetricHistory(initial_capacity=64)
+        self.timestamps = []
+        self.rep_start = None
+        self.bottom_index = None
+        self.reps: List[RepWindow] = []
+
+    @property
+    def count(self) -> int:
+        """已完成的次数"""
+        return self.counter.count
+
+    @property
+    def phase(self) -> str:
+        """当前阶段（站立 / 下降 / 上升）"""
+        return self.counter.state
+
+    def reset(self) -> None:
+        """重置分割器"""
+        self.counter.reset()
+        self.buffer.clear()
+        self.timestamps = []
+        self.rep_start = None
+        self.bottom_index = None
+        self.reps = []
+
+    def update(self, angles: Dict[str, float], timestamp: Optional[float] = None) -> List[RepEvent]:
+        """
+        输入一帧角度字典
+
+        Args:
+            angles: 角度字典
+            timestamp: 帧时间戳
+
+        Returns:
+            本帧产生的事件列表，'rep' 事件的 window 字段为本次动作窗口
+        """
+        index = self.counter.frame_index
+        events = self.counter.update(select_rep_value(angles, self.metric_groups), timestamp)
+
+        if self.counter.state != RepCounter.STANDING or any(e.kind == 'rep' for e in events):
+            if any(e.kind == 'descent' for e in events):
+                self.rep_start = index
+            self.buffer.append(angles)
+            self.timestamps.append(timestamp if timestamp is not None else float(index))
+
+        results = []
+        for event in events:
+            if event.kind == 'bottom':
+                self.bottom_index = event.frame_index
+            elif event.kind == 'rep':
+                event = event._replace(window=self._finish_rep(event))
+            if event.kind in ('rep', 'abort'):
+                self.buffer.clear()
+                self.timestamps = []
+            results.append(event)
+        return results
+
+    def _finish_rep(self, event: RepEvent) -> RepWindow:
+        """生成本次动作窗口并评分"""
+        names = self.buffer.names
+        timestamps = np.asarray(self.timestamps, dtype=np.float64)
+        matrix = self.buffer.matrix()
+        assessment = None
+        if self.assessor is not None and len(matrix):
+            assessment = self.assessor.assess_rep(names, matrix)
+        window = RepWindow(event.rep, self.rep_start, self.bottom_index, event.frame_index,
+                           names, timestamps, matrix, assessment)
+        self.reps.append(window)
+        return window
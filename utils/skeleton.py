@@ -0,0 +1,89 @@
+"""
+骨架几何工具模块
+
+把关键点数组换算为屏幕坐标，供不依赖图像光栅化的骨架叠加层使用（如 skeleton_overlay 中的
+Kivy画布绘制）。只使用 numpy，不需要导入 MediaPipe。
+
+功能描述:
+- POSE_CONNECTIONS: MediaPipe姿态模型33个关键点之间的骨骼连线
+- fit_image_rect: 计算保持宽高比的图像在控件中的实际显示区域
+- project_landmarks: 把归一化关键点（y轴向下）换算为控件坐标（y轴向上）
+- visible_mask: 按可见度和坐标有效性筛选关键点
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 与 mediapipe.solutions.pose.POSE_CONNECTIONS 相同的连线（关键点索引对）
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+)
+
+
+def fit_image_rect(widget_pos: Tuple[float, float], widget_size: Tuple[float, float],
+                   image_size: Tuple[float, float]) -> Tuple[float, float, float, float]:
+    """
+    计算保持宽高比缩放后居中显示的图像区域
+
+    Args:
+        widget_pos: 控件左下角坐标 (x, y)
+        widget_size: 控件尺寸 (宽, 高)
+        image_size: 图像尺寸 (宽, 高)
+
+    Returns:
+        (x, y, 宽, 高)：图像在控件坐标系中的显示区域
+    """
+    widget_width, widget_height = widget_size
+    image_width, image_height = image_size
+    if image_width <= 0 or image_height <= 0 or widget_width <= 0 or widget_height <= 0:
+        return (widget_pos[0], widget_pos[1], 0.0, 0.0)
+    scale = min(widget_width / image_width, widget_height / image_height)
+    width = image_width * scale
+    height = image_height * scale
+    return (widget_pos[0] + (widget_width - width) / 2,
+            widget_pos[1] + (widget_height - height) / 2,
+            width, height)
+
+
+def project_landmarks(points: np.ndarray, rect: Tuple[float, float, float, float]) -> np.ndarray:
+    """
+    把归一化关键点换算为控件坐标
+
+    Args:
+        points: (N, 2+) 数组，前两列为图像归一化坐标 x, y（y轴向下）
+        rect: fit_image_rect 返回的显示区域
+
+    Returns:
+        (N, 2) 数组，控件坐标（y轴向上）
+    """
+    x, y, width, height = rect
+    projected = np.empty((len(points), 2))
+    projected[:, 0] = x + points[:, 0] * width
+    projected[:, 1] = y + (1.0 - points[:, 1]) * height
+    return projected
+
+
+def visible_mask(points: np.ndarray, visibility: Optional[np.ndarray] = None,
+                 threshold: float = 0.5) -> np.ndarray:
+    """
+    关键点是否应当绘制
+
+    Args:
+        points: (N, 2+) 关键点数组
+        visibility: (N,) 可见度，None表示使用 points 的第四列（没有时视为全部可见）
+        threshold: 可见度阈值
+
+    Returns:
+        (N,) 布尔数组：坐标有效且可见度不低于阈值
+    """
+    mask = np.isfinite(points[:, :2]).all(axis=1)
+    if visibility is None and points.shape[1] > 3:
+        visibility = points[:, 3]
+    if visibility is not None:
+        mask &= visibility >= threshold
+    return mask
@@ -5,7 +5,9 @@
 """
 
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
+
+from .movement_analysis import RunningStats
 
 
 def compare_bilateral_symmetry(left_angles: Dict[str, float], 
@@ -129,6 +131,52 @@ def detect_asymmetry_patterns(angles_history: List[Dict[str, float]],
     return asymmetries
 
 
+def detect_asymmetry_patterns_stream(chunks: Iterable, threshold: float = 15.0) -> List[str]:
+    """
+    流式检测不对称模式（与 detect_asymmetry_patterns 的判定相同）
+    
+    Args:
+        chunks: 数据块迭代器 [(指标名称列表, 时间戳数组, 矩阵), ...]，各块的指标名称列表相同
+        threshold: 不对称阈值（度）
+        
+    Returns:
+        检测到的不对称模式列表（按指标名称顺序）
+    """
+    names = None
+    stats = None
+    frames = 0
+    for chunk in chunks:
+        if stats is None:
+            names = list(chunk[0])
+            stats = RunningStats(len(names))
+        matrix = np.asarray(chunk[-1])
+        stats.update(matrix)
+        frames += len(matrix)
+        
+    if stats is None or frames < 2:
+        return []
+        
+    index = {name: i for i, name in enumerate(names)}
+    asymmetries = []
+    for key in names:
+        if key.startswith('left_'):
+            right_key = key.replace('left_', 'right_', 1)
+        elif key.startswith('right_'):
+            right_key = key.replace('right_', 'left_', 1)
+        else:
+            continue
+        if right_key not in index:
+            continue
+        i, j = index[key], index[right_key]
+        if stats.count[i] == 0 or stats.count[j] == 0:
+            continue
+        diff = abs(stats.mean[i] - stats.mean[j])
+        if diff > threshold:
+            asymmetries.append(f"{key.replace('left_', '').replace('right_', '')}不对称({diff:.1f}°)")
+            
+    return asymmetries
+
+
 def evaluate_movement_symmetry(angles: Dict[str, float]) -> Dict[str, float]:
     """
     评估动作对称性